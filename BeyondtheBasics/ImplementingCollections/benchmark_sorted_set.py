@@ -0,0 +1,257 @@
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+import timeit
+from bisect import bisect_left
+from collections import deque
+
+from sorted_set import SortedSet
+
+"""
+Benchmarks for SortedSet against the two obvious alternatives:
+the builtin frozenset (no order) and a plain sorted list searched with
+bisect (no set semantics).
+
+    python benchmark_sorted_set.py --sizes 10 1000 100000 --output after.json
+    python benchmark_sorted_set.py --output after.json --compare before.json
+
+Sizes go as high as you like (--sizes 10000000 takes a while).
+Every result is the best of --repeat runs, in seconds per call.
+Lookups (contains, index, count) are timed as a batch of --probes
+lookups per call, so divide by "batch" for the cost of a single one.
+Operations a baseline simply doesn't have (index on a frozenset...)
+are left out for it.
+"""
+
+SIZES = (10, 1000, 100000)
+PROBES = 1000
+
+
+def _consume(iterable):
+    # run an iterator to the end as fast as python can
+    deque(iterable, maxlen=0)
+
+
+def make_data(size, probes, seed):
+    rng = random.Random(seed)
+    # 4x as many possible values as items: roughly half of the
+    # lookups hit and the two sets overlap partially
+    universe = 4 * size
+    a = [rng.randrange(universe) for _ in range(size)]
+    b = [rng.randrange(universe) for _ in range(size)]
+    lookups = [rng.randrange(universe) for _ in range(probes)]
+    return a, b, lookups
+
+
+def sorted_set_cases(a, b, lookups):
+    s, t = SortedSet(a), SortedSet(b)
+    in_order = sorted(set(a))
+    present = [x for x in lookups if x in s]
+    n = len(s)
+    return {
+        'construct_random': (lambda: SortedSet(a), 1),
+        'construct_sorted': (lambda: SortedSet(in_order), 1),
+        'contains': (lambda: [x in s for x in lookups], len(lookups)),
+        'index': (lambda: [s.index(x) for x in present], len(present)),
+        'count': (lambda: [s.count(x) for x in lookups], len(lookups)),
+        'slice': (lambda: s[n // 4:3 * n // 4], 1),
+        'slice_copy': (lambda: s[n // 4:3 * n // 4].copy(), 1),
+        'iterate': (lambda: _consume(s), 1),
+        'reversed': (lambda: _consume(reversed(s)), 1),
+        'and': (lambda: s & t, 1),
+        'or': (lambda: s | t, 1),
+        'xor': (lambda: s ^ t, 1),
+        'sub': (lambda: s - t, 1),
+        'le': (lambda: s <= t, 1),
+        'lt': (lambda: s < t, 1),
+        'ge': (lambda: s >= t, 1),
+        'gt': (lambda: s > t, 1),
+        'issubset': (lambda: s.issubset(b), 1),
+        'issuperset': (lambda: s.issuperset(b), 1),
+        'isdisjoint': (lambda: s.isdisjoint(b), 1),
+        'intersection': (lambda: s.intersection(b), 1),
+        'union': (lambda: s.union(b), 1),
+        'symmetric_difference': (lambda: s.symmetric_difference(b), 1),
+        'difference': (lambda: s.difference(b), 1),
+    }
+
+
+def frozenset_cases(a, b, lookups):
+    s, t = frozenset(a), frozenset(b)
+    in_order = sorted(s)
+    return {
+        'construct_random': (lambda: frozenset(a), 1),
+        'construct_sorted': (lambda: frozenset(in_order), 1),
+        'contains': (lambda: [x in s for x in lookups], len(lookups)),
+        'iterate': (lambda: _consume(s), 1),
+        'and': (lambda: s & t, 1),
+        'or': (lambda: s | t, 1),
+        'xor': (lambda: s ^ t, 1),
+        'sub': (lambda: s - t, 1),
+        'le': (lambda: s <= t, 1),
+        'lt': (lambda: s < t, 1),
+        'ge': (lambda: s >= t, 1),
+        'gt': (lambda: s > t, 1),
+        'issubset': (lambda: s.issubset(b), 1),
+        'issuperset': (lambda: s.issuperset(b), 1),
+        'isdisjoint': (lambda: s.isdisjoint(b), 1),
+        'intersection': (lambda: s.intersection(b), 1),
+        'union': (lambda: s.union(b), 1),
+        'symmetric_difference': (lambda: s.symmetric_difference(b), 1),
+        'difference': (lambda: s.difference(b), 1),
+    }
+
+
+def sorted_list_cases(a, b, lookups):
+    # what you'd write by hand: sorted(set(...)) plus bisect, and set()
+    # round trips for the set algebra
+    s, t = sorted(set(a)), sorted(set(b))
+    members = set(s)
+    present = [x for x in lookups if x in members]
+    n = len(s)
+
+    def contains(x):
+        i = bisect_left(s, x)
+        return i != n and s[i] == x
+
+    return {
+        'construct_random': (lambda: sorted(set(a)), 1),
+        'construct_sorted': (lambda: sorted(set(s)), 1),
+        'contains': (lambda: [contains(x) for x in lookups], len(lookups)),
+        'index': (lambda: [bisect_left(s, x) for x in present], len(present)),
+        'count': (lambda: [int(contains(x)) for x in lookups], len(lookups)),
+        'slice': (lambda: s[n // 4:3 * n // 4], 1),
+        'slice_copy': (lambda: s[n // 4:3 * n // 4], 1),
+        'iterate': (lambda: _consume(s), 1),
+        'reversed': (lambda: _consume(reversed(s)), 1),
+        'and': (lambda: sorted(set(s) & set(t)), 1),
+        'or': (lambda: sorted(set(s) | set(t)), 1),
+        'xor': (lambda: sorted(set(s) ^ set(t)), 1),
+        'sub': (lambda: sorted(set(s) - set(t)), 1),
+        'le': (lambda: set(s) <= set(t), 1),
+        'lt': (lambda: set(s) < set(t), 1),
+        'ge': (lambda: set(s) >= set(t), 1),
+        'gt': (lambda: set(s) > set(t), 1),
+        'issubset': (lambda: set(s).issubset(b), 1),
+        'issuperset': (lambda: set(s).issuperset(b), 1),
+        'isdisjoint': (lambda: set(s).isdisjoint(b), 1),
+        'intersection': (lambda: sorted(set(s).intersection(b)), 1),
+        'union': (lambda: sorted(set(s).union(b)), 1),
+        'symmetric_difference': (lambda: sorted(set(s).symmetric_difference(b)), 1),
+        'difference': (lambda: sorted(set(s).difference(b)), 1),
+    }
+
+
+IMPLEMENTATIONS = {
+    'SortedSet': sorted_set_cases,
+    'frozenset': frozenset_cases,
+    'sorted_list': sorted_list_cases,
+}
+
+
+def time_case(function, repeat):
+    timer = timeit.Timer(function)
+    # autorange picks a loop count that runs for at least 0.2s
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number
+
+
+def run(sizes, implementations, operations, repeat, probes, seed, progress=None):
+    results = []
+    for size in sizes:
+        a, b, lookups = make_data(size, probes, seed)
+        for name in implementations:
+            cases = IMPLEMENTATIONS[name](a, b, lookups)
+            for operation, (function, batch) in cases.items():
+                if operations and operation not in operations:
+                    continue
+                seconds = time_case(function, repeat)
+                result = {'implementation': name, 'operation': operation,
+                          'size': size, 'seconds': seconds, 'batch': batch}
+                results.append(result)
+                if progress is not None:
+                    progress(result)
+    return results
+
+
+def metadata():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'python': sys.version,
+        'platform': platform.platform(),
+        'commit': commit,
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+    }
+
+
+def compare(results, baseline, threshold):
+    # -> list of (implementation, operation, size, old, new, ratio),
+    # and the ones slower than the threshold
+    old = {(r['implementation'], r['operation'], r['size']): r['seconds']
+           for r in baseline['results']}
+    rows, regressions = [], []
+    for r in results:
+        key = (r['implementation'], r['operation'], r['size'])
+        if key not in old:
+            continue
+        ratio = r['seconds'] / old[key] if old[key] else float('inf')
+        row = key + (old[key], r['seconds'], ratio)
+        rows.append(row)
+        if ratio > threshold:
+            regressions.append(row)
+    return rows, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Benchmark SortedSet against frozenset and a sorted list')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(SIZES))
+    parser.add_argument('--implementations', nargs='+', choices=sorted(IMPLEMENTATIONS),
+                        default=list(IMPLEMENTATIONS))
+    parser.add_argument('--operations', nargs='+', default=None,
+                        help='only run these operations (default: all)')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--probes', type=int, default=PROBES)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--compare', help='JSON file from an earlier run to compare against')
+    parser.add_argument('--threshold', type=float, default=1.10,
+                        help='new/old ratio above which --compare reports a regression')
+    args = parser.parse_args(argv)
+
+    def progress(result):
+        print('{implementation:>12} {operation:>22} {size:>10} {seconds:12.3e}'.format(**result),
+              file=sys.stderr)
+
+    results = run(args.sizes, args.implementations, args.operations,
+                  args.repeat, args.probes, args.seed, progress)
+    report = {'metadata': metadata(), 'results': results}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        rows, regressions = compare(results, baseline, args.threshold)
+        for implementation, operation, size, old, new, ratio in rows:
+            flag = '  <-- slower' if ratio > args.threshold else ''
+            print('{:>12} {:>22} {:>10} {:12.3e} {:12.3e} {:6.2f}x{}'.format(
+                implementation, operation, size, old, new, ratio, flag), file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,181 @@
+from hashlib import blake2b
+from math import ceil, log
+from numbers import Number
+from struct import Struct
+
+"""
+Bloom filter: a few bits per item that can say "definitely not in the
+set" without looking at the set at all
+
+Every item sets k bits of an m bit array (picked by hashing it).  To
+test a value, check its k bits: if any of them is clear the value was
+never added.  If they're all set it probably was, but those bits could
+also have been set by other items, that's the false-positive rate,
+which goes down as m per item goes up:
+
+    error_rate 1%     ~9.6 bits (1.2 bytes) per item, k = 7
+    error_rate 0.1%   ~14.4 bits (1.8 bytes) per item, k = 10
+
+Checking the filter costs about as much as bisecting an in memory
+SortedSet of ints or strs (both are done in a microsecond or two), so
+on its own a filter there mostly breaks even.  It pays off where a miss
+costs more: batches (contains_many() only sorts what gets through), sets
+with key functions, and sets read from disk, where a bisect that misses
+still touches a page for every step:
+
+    bloom = BloomFilter.from_items(mapped)
+    found = x in bloom and x in mapped
+
+The bit positions have to come out the same in every process, so that
+a filter written out by one still works in another.  hash() of a
+number is like that (on 64 bit builds), and is the same for equal
+numbers of any type (1 == 1.0 == True == Decimal(1) == numpy.int64(1))
+as membership requires, but hash() of a str or bytes changes from one
+run to the next, so those go through blake2b instead.  Other types
+can't be hashed either way.  The filter answers "maybe" for them, and
+adding one sets every bit: it could be equal to anything, so from then
+on the filter answers "maybe" to everything and the set does the work.
+"""
+
+# magic, number of bits, number of hashes
+_HEADER = Struct('<8sQI')
+_MAGIC = b'BLOOM001'
+_MASK = 0xFFFFFFFFFFFFFFFF
+
+
+def _mixed(h):
+    # hash() of a number, mixed up (splitmix64) into two 64 bit hashes
+    h &= _MASK
+    h = (h ^ h >> 30) * 0xBF58476D1CE4E5B9 & _MASK
+    h = (h ^ h >> 27) * 0x94D049BB133111EB & _MASK
+    h ^= h >> 31
+    return h, h >> 32 | 1
+
+
+def _hashes(item):
+    # two 64 bit hashes for double hashing, the k bit positions are
+    # h1, h1 + h2, h1 + 2 * h2, ... (None for items we can't hash)
+    if isinstance(item, (int, float)):
+        return _mixed(hash(item))
+    if isinstance(item, str):
+        data, person = item.encode('utf-8', 'surrogatepass'), b's'
+    elif isinstance(item, (bytes, bytearray)):
+        data, person = item, b'b'
+    elif isinstance(item, Number):
+        # Decimal, Fraction, numpy scalars, ... hash() agrees across all
+        # of them for equal values
+        try:
+            return _mixed(hash(item))
+        except TypeError:
+            # Decimal('sNaN') refuses
+            return None
+    else:
+        return None
+    digest = int.from_bytes(blake2b(data, digest_size=16, person=person).digest(), 'little')
+    return digest & _MASK, digest >> 64 | 1
+
+
+class BloomFilter:
+    """
+    Approximate membership: `value in bloom` is False only for values
+    that were never added
+    """
+    __slots__ = ('_bits', '_size', '_hashes')
+
+    def __init__(self, capacity, error_rate=0.01):
+        # sized for `capacity` items at `error_rate` false positives
+        if not 0 < error_rate < 1:
+            raise ValueError('error_rate must be between 0 and 1, not {!r}'.format(error_rate))
+        capacity = max(1, capacity)
+        size = ceil(-capacity * log(error_rate) / log(2) ** 2)
+        hashes = max(1, round(size / capacity * log(2)))
+        self._set(bytearray((size + 7) // 8), size, hashes)
+
+    def _set(self, bits, size, hashes):
+        self._bits = bits
+        self._size = size
+        self._hashes = hashes
+
+    @classmethod
+    def from_items(cls, items, error_rate=0.01):
+        items = items if hasattr(items, '__len__') else list(items)
+        result = cls(len(items), error_rate)
+        result.update(items)
+        return result
+
+    def add(self, item):
+        self._add(_hashes(item))
+
+    def _add(self, hashes):
+        if hashes is None:
+            # the item might be equal to anything, so nothing can be ruled out
+            self._saturate()
+            return
+        bits, size = self._bits, self._size
+        position, step = hashes
+        for _ in range(self._hashes):
+            position %= size
+            bits[position >> 3] |= 1 << (position & 7)
+            position += step
+
+    def _saturate(self):
+        self._bits[:] = b'\xff' * len(self._bits)
+
+    def saturated(self):
+        # True when the filter answers "maybe" to everything
+        return self._bits.count(0xFF) == len(self._bits)
+
+    def update(self, items):
+        for item in items:
+            hashes = _hashes(item)
+            self._add(hashes)
+            if hashes is None:
+                # nothing added after this can change any answer
+                return
+
+    def __contains__(self, item):
+        hashes = _hashes(item)
+        if hashes is None:
+            # can't tell
+            return True
+        # a miss usually stops at the first or second bit
+        bits, size = self._bits, self._size
+        position, step = hashes
+        for _ in range(self._hashes):
+            position %= size
+            if not bits[position >> 3] >> (position & 7) & 1:
+                return False
+            position += step
+        return True
+
+    def copy(self):
+        result = type(self).__new__(type(self))
+        result._set(bytearray(self._bits), self._size, self._hashes)
+        return result
+
+    def nbytes(self):
+        return len(self._bits)
+
+    def __repr__(self):
+        return 'BloomFilter(bits={}, hashes={})'.format(self._size, self._hashes)
+
+    # ======= serialization =======
+    # a 20 byte header and the bit array, to write next to the set
+
+    def to_bytes(self):
+        return _HEADER.pack(_MAGIC, self._size, self._hashes) + bytes(self._bits)
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, size, hashes = _HEADER.unpack_from(data)
+        if magic != _MAGIC:
+            raise ValueError('not a bloom filter: bad magic {!r}'.format(magic))
+        bits = bytearray(data[_HEADER.size:_HEADER.size + (size + 7) // 8])
+        if len(bits) != (size + 7) // 8:
+            raise ValueError('bloom filter data is truncated')
+        result = cls.__new__(cls)
+        result._set(bits, size, hashes)
+        return result
+
+    def __reduce__(self):
+        return type(self).from_bytes, (self.to_bytes(),)
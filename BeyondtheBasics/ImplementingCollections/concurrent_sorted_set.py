@@ -0,0 +1,152 @@
+from contextlib import contextmanager
+from threading import Lock
+
+from sorted_set import SortedSet
+
+"""
+A SortedSet shared between writer threads and reader threads
+
+A SortedSet never changes, which is exactly what readers want: once a
+reader holds one, nobody can change it under its feet.  So the shared
+object is just a reference to the current SortedSet.  Writers build a
+new SortedSet next to it (copy-on-write) and then swap the reference,
+readers grab whatever the reference points to right now:
+
+    shared = ConcurrentSortedSet([1, 2, 3])
+
+    # reader: no lock, and a consistent view for as long as it's needed
+    s = shared.snapshot()
+    if 2 in s and s.floor(10) == 3: ...
+
+    # writer: every change publishes a new version ...
+    shared.add(4)
+    # ... or batch them, one copy for the whole lot
+    with shared.batch() as batch:
+        batch.add(5)
+        batch.discard(1)
+
+Replacing a reference is atomic, so readers never take the lock at
+all, the lock only keeps two writers from both publishing a version
+built from the same old one (and losing one of the changes).
+
+add() and discard() don't copy the set: the new version shares all
+but one chunk of its items with the old one (see with_added() in
+sorted_set.py), and in, len(), iteration, indexing and index() read
+those chunks as they are.  So nothing is copied on the read path
+either.  Range queries, slices and set algebra on a snapshot do put
+its items together into one list, once per version.  Every other
+write (update(), a batch, ...) copies the set, so batch writes up when
+there are lots.
+"""
+
+
+class _Batch:
+    # the changes of one batch, in order: the last add or discard
+    # of a value wins
+    __slots__ = ('_changes',)
+
+    def __init__(self):
+        self._changes = {}
+
+    def add(self, value):
+        self._changes[value] = True
+
+    def discard(self, value):
+        self._changes[value] = False
+
+    def update(self, iterable):
+        for value in iterable:
+            self._changes[value] = True
+
+    def difference_update(self, iterable):
+        for value in iterable:
+            self._changes[value] = False
+
+    def apply(self, s):
+        added = [value for value, keep in self._changes.items() if keep]
+        removed = [value for value, keep in self._changes.items() if not keep]
+        if removed:
+            s = s - s._from_iterable(removed)
+        if added:
+            s = s | s._from_iterable(added)
+        return s
+
+
+class ConcurrentSortedSet:
+    """
+    Shared SortedSet: lock-free snapshot() for readers, copy-on-write
+    updates for writers
+    """
+    __slots__ = ('_current', '_version', '_lock')
+
+    def __init__(self, items=None, key=None):
+        self._current = SortedSet(items, key=key)
+        self._version = 0
+        self._lock = Lock()
+
+    def snapshot(self):
+        # the SortedSet that is current right now, it won't change
+        return self._current
+
+    @property
+    def version(self):
+        # goes up by one with every change that gets published
+        return self._version
+
+    # ======= reads =======
+    # each of these looks at one snapshot, to do several reads
+    # against the same version take a snapshot() and use that
+
+    def __contains__(self, item):
+        return item in self._current
+
+    def __len__(self):
+        return len(self._current)
+
+    def __iter__(self):
+        return iter(self._current)
+
+    def __getitem__(self, index):
+        return self._current[index]
+
+    def __repr__(self):
+        return 'ConcurrentSortedSet({!r})'.format(self._current)
+
+    # ======= writes =======
+
+    def _publish(self, change):
+        # change: old SortedSet -> new SortedSet
+        with self._lock:
+            current = self._current
+            new = change(current)
+            if new is not current:
+                self._current = new
+                self._version += 1
+            return new
+
+    def add(self, value):
+        self._publish(lambda s: s.with_added(value))
+
+    def discard(self, value):
+        self._publish(lambda s: s.with_removed(value))
+
+    def update(self, iterable):
+        values = list(iterable)
+        self._publish(lambda s: s | s._from_iterable(values))
+
+    def difference_update(self, iterable):
+        values = list(iterable)
+        self._publish(lambda s: s - s._from_iterable(values))
+
+    def replace(self, items):
+        # publish a whole new set, e.g. one rebuilt from scratch
+        new = items if isinstance(items, SortedSet) else SortedSet(items, key=self._current._key)
+        self._publish(lambda s: new)
+
+    @contextmanager
+    def batch(self):
+        # collect changes and publish them as one version on the way out
+        # (nothing at all if the block raises)
+        batch = _Batch()
+        yield batch
+        self._publish(batch.apply)
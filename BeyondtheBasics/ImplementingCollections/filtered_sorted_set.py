@@ -0,0 +1,121 @@
+from bloom_filter import BloomFilter
+from sorted_set import SortedSet
+
+"""
+SortedSet with a Bloom filter in front of it
+
+When most lookups miss, most of the time goes into bisecting for
+values that aren't there.  The filter answers the great majority of
+those misses after hashing the value once, and only the values that
+might be in the set go on to the bisect:
+
+    s = FilteredSortedSet(ids, error_rate=0.001)
+    x in s, s.count(x), s.contains_many(xs), s.isdisjoint(xs)
+
+The answers are always exact, the filter only decides how much work
+they take.  Items the filter can't hash (tuples, say) turn it into a
+pass through that answers "maybe" to everything, see bloom_filter.py.
+
+Set algebra results are plain SortedSets (a filter for them would have
+to be built from scratch anyway); with_added() and with_removed() keep
+a filter.
+
+The filter pickles along with the set, or can be written next to it
+with filter.to_bytes() and put back with FilteredSortedSet.with_filter().
+"""
+
+
+class FilteredSortedSet(SortedSet):
+    """
+    SortedSet that checks a Bloom filter before bisecting
+    """
+    __slots__ = ('_filter',)
+
+    def __init__(self, items=None, key=None, compact=True, error_rate=0.01):
+        super().__init__(items, key, compact)
+        self._filter = BloomFilter.from_items(self._items, error_rate)
+
+    @classmethod
+    def with_filter(cls, s, bloom=None, error_rate=0.01):
+        # s (a SortedSet) with a filter in front, sharing its storage.
+        # bloom must have had every item of s added to it
+        result = cls.__new__(cls)
+        result._chunks = s._chunks
+        if s._chunks is None:
+            result._items = s._items
+            result._keys = s._keys
+        # (otherwise the flat storage is put together when it's needed)
+        result._key = s._key
+        result._hash_accumulator = s._hash_accumulator
+        result._filter = bloom if bloom is not None else BloomFilter.from_items(s._items, error_rate)
+        return result
+
+    @classmethod
+    def from_sorted(cls, items, copy=True, key=None, error_rate=0.01):
+        return cls.with_filter(SortedSet.from_sorted(items, copy, key), error_rate=error_rate)
+
+    @classmethod
+    def _from_sorted(cls, items, keys=None, key=None):
+        # new sets made from this one (slices with a step, set algebra)
+        # don't come with a filter, so they are plain SortedSets
+        return SortedSet._from_sorted(items, keys, key)
+
+    @classmethod
+    def _from_chunks(cls, chunks, key=None):
+        return SortedSet._from_chunks(chunks, key)
+
+    @property
+    def filter(self):
+        return self._filter
+
+    def memory_usage(self):
+        usage = super().memory_usage()
+        usage['filter'] = self._filter.nbytes()
+        usage['total'] += usage['filter']
+        return usage
+
+    def __reduce__(self):
+        keys = None if self._key is None else self._keys
+        return type(self).with_filter, (SortedSet._from_sorted(self._items, keys, self._key),
+                                        self._filter)
+
+    # ======= lookups go through the filter first =======
+    # count() is int(value in self), so it goes through __contains__
+
+    def __contains__(self, item):
+        if item not in self._filter:
+            return False
+        return super().__contains__(item)
+
+    def _positions(self, values):
+        # contains_many() and index_many(): only the values that get
+        # past the filter are sorted and walked through the set
+        values = list(values)
+        maybe = [i for i, value in enumerate(values) if value in self._filter]
+        positions = [-1] * len(values)
+        found = super()._positions([values[i] for i in maybe])
+        for i, position in zip(maybe, found):
+            positions[i] = position
+        return positions
+
+    def isdisjoint(self, other):
+        if self._can_walk(other):
+            # a merge walk already settles this without any lookups
+            return super().isdisjoint(other)
+        return super().isdisjoint([value for value in other if value in self._filter])
+
+    # ======= persistent updates keep a filter =======
+
+    def with_added(self, value):
+        result = super().with_added(value)
+        if result is self:
+            return self
+        bloom = self._filter.copy()
+        bloom.add(value)
+        return self.with_filter(result, bloom)
+
+    def with_removed(self, value):
+        # bits can't be taken out of a Bloom filter, but a filter with
+        # one item too many still never says no to an item that's there
+        result = super().with_removed(value)
+        return self if result is self else self.with_filter(result, self._filter)
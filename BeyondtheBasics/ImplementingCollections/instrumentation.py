@@ -0,0 +1,352 @@
+import threading
+from collections.abc import Set, Sized
+from functools import wraps
+from struct import calcsize
+from time import perf_counter
+
+from sorted_set import SortedSet, SortedSetView
+
+"""
+Opt-in instrumentation for SortedSet
+
+Counts calls and cumulative time of the hot methods, plus the
+comparisons each one actually made and a rough number of bytes copied,
+so you can see which call sites keep rebuilding sets.  Counting the
+comparisons means running every recorded call twice (see below), so
+the times are right but the program runs about twice as slow while
+this is on.
+
+Nothing in sorted_set.py knows about any of this, so when it's off the
+fast path is exactly the code you'd get without this module:
+
+    stats = instrument(s)   # just this instance (and the sets made from it)
+    stats = enable()        # every SortedSet in the process
+    ...
+    stats.as_dict()
+    disable() / uninstrument(s)
+
+A callback(name, elapsed, counters) can be passed to get every call as
+it happens instead of (or as well as) reading the totals afterwards.
+"""
+
+_POINTER_SIZE = calcsize('P')
+
+# the methods that get wrapped
+_TRACKED = (
+    '__init__', '__contains__', '__getitem__', 'index', 'count',
+    'contains_many', 'index_many',
+    '__and__', '__or__', '__xor__', '__sub__',
+    '__le__', '__lt__', '__ge__', '__gt__', 'isdisjoint',
+    'issubset', 'issuperset', 'intersection', 'union',
+    'symmetric_difference', 'difference',
+)
+
+_SET_OPERATIONS = frozenset(_TRACKED[7:])
+
+
+# ======= counting comparisons =======
+# bisect and the merge loops compare items in C, where nothing can be
+# counted without slowing them down for everybody.  So a recorded call
+# is run a second time on a shadow of the set whose items are wrapped
+# in _Counted, which counts every comparison made with it and otherwise
+# acts like the item it wraps.  Items are only wrapped as they're read,
+# so the shadow of a lookup costs O(log n) like the lookup itself, and a
+# merge that gallops past most of a set doesn't wrap the rest of it.
+# Shadows are plain SortedSets, a subclass's own shortcuts (the filter in
+# front of a FilteredSortedSet, say) don't show up in the count
+
+# the methods as SortedSet has them, before enable() swaps in wrappers
+_PLAIN = {name: getattr(SortedSet, name) for name in _TRACKED}
+
+# .active is set while a shadow call runs, so the wrappers it goes
+# through don't record (or shadow) anything themselves.  .time adds up
+# the time spent replaying, so that a call which makes recorded calls
+# of its own (union() goes through __or__) isn't charged for their replays
+_replaying = threading.local()
+
+
+def _plain(value):
+    return value.value if type(value) is _Counted else value
+
+
+class _Counted:
+    __slots__ = ('value', 'tally')
+
+    def __init__(self, value, tally):
+        self.value = value
+        self.tally = tally
+
+    def __lt__(self, other):
+        self.tally[0] += 1
+        return self.value < _plain(other)
+
+    def __le__(self, other):
+        self.tally[0] += 1
+        return self.value <= _plain(other)
+
+    def __gt__(self, other):
+        self.tally[0] += 1
+        return self.value > _plain(other)
+
+    def __ge__(self, other):
+        self.tally[0] += 1
+        return self.value >= _plain(other)
+
+    def __eq__(self, other):
+        self.tally[0] += 1
+        return self.value == _plain(other)
+
+    def __ne__(self, other):
+        self.tally[0] += 1
+        return self.value != _plain(other)
+
+    def __hash__(self):
+        return hash(self.value)
+
+
+class _CountedItems:
+    # items wrapped as they're read, a bisect over a million of them
+    # only wraps the twenty or so it looks at
+    __slots__ = ('items', 'tally')
+
+    def __init__(self, items, tally):
+        self.items = items
+        self.tally = tally
+
+    def __len__(self):
+        return len(self.items)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [_Counted(item, self.tally) for item in self.items[index]]
+        return _Counted(self.items[index], self.tally)
+
+    def __iter__(self):
+        return (_Counted(item, self.tally) for item in self.items)
+
+
+class _Shadow:
+    # everything one replayed call needs, sharing one tally
+    def __init__(self):
+        self.tally = [0]
+        self._keys = {}
+
+    def wrap(self, value):
+        return _Counted(value, self.tally)
+
+    def wrap_all(self, values):
+        return [_Counted(value, self.tally) for value in values]
+
+    def key(self, key):
+        # the same wrapped function for the same key function, or the
+        # shadows wouldn't merge with each other the way the sets do
+        if key is None:
+            return None
+        wrapped = self._keys.get(id(key))
+        if wrapped is None:
+            def wrapped(value):
+                return self.wrap(key(_plain(value)))
+            self._keys[id(key)] = wrapped
+        return wrapped
+
+    def lazy(self, s):
+        keys = None if s._key is None else _CountedItems(s._keys, self.tally)
+        return SortedSet._from_sorted(_CountedItems(s._items, self.tally), keys, self.key(s._key))
+
+    def operand(self, other):
+        if isinstance(other, SortedSetView):
+            return SortedSetView(self.lazy(other._parent), other._start, other._stop)
+        if isinstance(other, SortedSet):
+            return self.lazy(other)
+        if isinstance(other, Set):
+            return frozenset(self.wrap_all(other))
+        return self.wrap_all(other)
+
+
+_ITERABLE_ARGUMENTS = _SET_OPERATIONS | {'__init__', 'contains_many', 'index_many'}
+
+
+def _replayable(name, args):
+    # iterables that can only be read once are put in a list first, so
+    # the shadow call gets to see them too
+    if name in _ITERABLE_ARGUMENTS and args and args[0] is not None and not isinstance(args[0], Sized):
+        return (list(args[0]),) + args[1:]
+    return args
+
+
+def _comparisons(name, s, args, kwargs):
+    if name == '__getitem__':
+        # positions and slices never compare anything
+        return 0
+    shadow = _Shadow()
+    if name == '__init__':
+        # only items and key matter here, subclasses' extra arguments
+        # (a FilteredSortedSet's error_rate) are left behind
+        items = args[0] if args else kwargs.get('items')
+        key = args[1] if len(args) > 1 else kwargs.get('key')
+        target = SortedSet.__new__(SortedSet)
+        args = [None if items is None else shadow.wrap_all(items), shadow.key(key)]
+        kwargs = {}
+    elif name in _SET_OPERATIONS:
+        target = shadow.lazy(s)
+        args = [shadow.operand(args[0])] if args else []
+    else:
+        target = shadow.lazy(s)
+        if name in ('contains_many', 'index_many'):
+            args = [shadow.wrap_all(args[0])] + list(args[1:])
+        else:
+            args = [shadow.wrap(args[0])] + list(args[1:])
+    start = perf_counter()
+    _replaying.active = True
+    try:
+        _PLAIN[name](target, *args, **kwargs)
+    except Exception:
+        # it stops where the real call did (index() of a missing value),
+        # what was compared up to there still counts
+        pass
+    finally:
+        _replaying.active = False
+        _replaying.time = getattr(_replaying, 'time', 0.0) + perf_counter() - start
+    return shadow.tally[0]
+
+
+def _bytes_copied(name, s, result):
+    if name == '__init__':
+        # the item list, plus the key list when there is a key function
+        if s._key is None:
+            return len(s) * getattr(s._items, 'itemsize', _POINTER_SIZE)
+        return len(s) * _POINTER_SIZE * 2
+    if isinstance(result, SortedSet) and result is not s:
+        # array storage copies the values themselves, a list copies pointers
+        return len(result) * getattr(result._items, 'itemsize', _POINTER_SIZE)
+    return 0
+
+
+class SortedSetStats:
+    """
+    Running totals per method: calls, time, comparisons, bytes_copied
+
+    comparisons are counted, bytes_copied is estimated from the size of
+    what was built (pointers for lists, item size for arrays)
+    """
+    def __init__(self, callback=None):
+        self.callback = callback
+        self._counters = {}
+        # per-instance instrumentation needs one subclass per base class
+        self._classes = {}
+
+    def record(self, name, elapsed, comparisons, bytes_copied):
+        counters = self._counters.get(name)
+        if counters is None:
+            counters = self._counters[name] = {
+                'calls': 0, 'time': 0.0, 'comparisons': 0, 'bytes_copied': 0}
+        counters['calls'] += 1
+        counters['time'] += elapsed
+        counters['comparisons'] += comparisons
+        counters['bytes_copied'] += bytes_copied
+        if self.callback is not None:
+            self.callback(name, elapsed, {'comparisons': comparisons,
+                                          'bytes_copied': bytes_copied})
+
+    def as_dict(self):
+        return {name: dict(counters) for name, counters in self._counters.items()}
+
+    def reset(self):
+        self._counters.clear()
+
+    def __repr__(self):
+        return 'SortedSetStats({!r})'.format(self.as_dict())
+
+
+def _wrap(name, method, stats):
+    # records into stats, the one it was made for.  A call on an
+    # instrument()ed set while enable() is on goes into the process
+    # stats as well, so each of them sees it exactly once
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if getattr(_replaying, 'active', False):
+            return method(self, *args, **kwargs)
+        args = _replayable(name, args)
+        replayed = getattr(_replaying, 'time', 0.0)
+        start = perf_counter()
+        result = method(self, *args, **kwargs)
+        elapsed = perf_counter() - start - (getattr(_replaying, 'time', 0.0) - replayed)
+        comparisons = _comparisons(name, self, args, kwargs)
+        bytes_copied = _bytes_copied(name, self, result)
+        stats.record(name, elapsed, comparisons, bytes_copied)
+        if _process_stats is not None and stats is not _process_stats:
+            _process_stats.record(name, elapsed, comparisons, bytes_copied)
+        return result
+    wrapper._unwrapped = method
+    return wrapper
+
+
+def _wrapped_methods(cls, stats):
+    # from the methods as they are without any wrapper: after enable()
+    # getattr(SortedSet, name) is the process-wide one
+    methods = {}
+    for name in _TRACKED:
+        method = getattr(cls, name)
+        method = getattr(method, '_unwrapped', method)
+        methods[name] = _wrap(name, method, stats)
+    return methods
+
+
+# ======= per instance =======
+# The instance gets moved to a subclass whose methods are the wrapped
+# ones.  Sets built from it (slices with a step, set algebra results,
+# ...) are made with type(self) so they report to the same stats too.
+
+def instrument(s, stats=None, callback=None):
+    if stats is None:
+        stats = SortedSetStats(callback)
+    base = getattr(type(s), '_instrumented_base', type(s))
+    cls = stats._classes.get(base)
+    if cls is None:
+        namespace = _wrapped_methods(base, stats)
+        namespace['_instrumented_base'] = base
+        namespace['__slots__'] = ()
+        cls = stats._classes[base] = type('Instrumented' + base.__name__, (base,), namespace)
+    s.__class__ = cls
+    return stats
+
+
+def uninstrument(s):
+    s.__class__ = getattr(type(s), '_instrumented_base', type(s))
+
+
+# ======= per process =======
+# Swap the wrapped methods into SortedSet itself, disable() puts the
+# originals back (or removes the wrapper again where the method was
+# only inherited from the Set/Sequence mixins)
+
+_process_stats = None
+_originals = {}
+
+
+def enable(callback=None, stats=None):
+    global _process_stats
+    if _process_stats is not None:
+        disable()
+    _process_stats = stats if stats is not None else SortedSetStats(callback)
+    for name, wrapper in _wrapped_methods(SortedSet, _process_stats).items():
+        _originals[name] = vars(SortedSet).get(name)
+        setattr(SortedSet, name, wrapper)
+    return _process_stats
+
+
+def disable():
+    global _process_stats
+    if _process_stats is None:
+        return
+    for name, original in _originals.items():
+        if original is None:
+            delattr(SortedSet, name)
+        else:
+            setattr(SortedSet, name, original)
+    _originals.clear()
+    _process_stats = None
+
+
+def enabled():
+    return _process_stats is not None
@@ -0,0 +1,384 @@
+import mmap
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Sequence, Set
+from itertools import chain
+from operator import lt
+from struct import Struct
+
+from sorted_set import SortedSet
+
+"""
+A read-only SortedSet that lives in a file instead of in memory.
+
+Loading a huge set means unpickling or re-sorting every item into
+_items at start-up, and every worker process ends up with its own copy.
+Written out as fixed-width records in sorted order, the file itself is
+already a sorted array: memory-map it and bisect straight over the
+mapped bytes.  The OS pages in only what the lookups touch, and every
+process mapping the same file shares the same pages.
+
+    save(SortedSet(...), 'reference.sset')
+    with MappedSortedSet('reference.sset') as s:
+        42 in s, s.index(42), s[10:20], list(s.irange(100, 200))
+
+Two kinds of record:
+    'q'  int64, native byte order
+    's'  bytes of at most `width` bytes, padded with NULs (so a value
+         can't itself end in a NUL, the padding would swallow it)
+
+File layout: a 24 byte header, then the records back to back.
+"""
+
+# magic, kind, byte order, record width, number of records
+_HEADER = Struct('<8sccxxIQ')
+_MAGIC = b'SORTSET1'
+_BYTEORDER = b'<' if sys.byteorder == 'little' else b'>'
+
+# records are written out this many at a time
+_WRITE_BLOCK = 1 << 16
+
+
+class _FixedRecords:
+    # a read-only sequence of the bytes records in a buffer,
+    # just enough for bisect: len() and indexing
+    __slots__ = ('_buffer', '_width')
+
+    def __init__(self, buffer, width):
+        self._buffer = buffer
+        self._width = width
+
+    def __len__(self):
+        return len(self._buffer) // self._width
+
+    def __getitem__(self, index):
+        start = index * self._width
+        return bytes(self._buffer[start:start + self._width]).rstrip(b'\0')
+
+    def release(self):
+        self._buffer.release()
+
+
+def _records(buffer):
+    # header + records in any buffer -> (kind, width, records)
+    if len(buffer) < _HEADER.size:
+        raise ValueError('not a sorted set file: too short for the header')
+    magic, kind, byteorder, width, count = _HEADER.unpack_from(buffer)
+    if magic != _MAGIC:
+        raise ValueError('not a sorted set file: bad magic {!r}'.format(magic))
+    if byteorder != _BYTEORDER:
+        raise ValueError('sorted set file was written on a machine with the other byte order')
+    end = _HEADER.size + count * width
+    if len(buffer) < end:
+        raise ValueError('sorted set file is truncated: expected {} records'.format(count))
+    data = memoryview(buffer)[_HEADER.size:end]
+    if kind == b'q':
+        return 'q', width, data.cast('q')
+    if kind == b's':
+        return 's', width, _FixedRecords(data, width)
+    raise ValueError('unknown record kind {!r}'.format(kind))
+
+
+class _Mapping:
+    # the open file and its mapping, shared by a MappedSortedSet and
+    # all the slices taken from it
+    __slots__ = ('name', 'file', 'map', 'kind', 'width', 'records', 'count')
+
+    def __init__(self, path):
+        self.name = path
+        self.records = None
+        self.file = open(path, 'rb')
+        try:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.kind, self.width, self.records = _records(self.map)
+            self.count = len(self.records)
+        except BaseException:
+            self.file.close()
+            raise
+
+    def close(self):
+        if self.records is None:
+            return
+        # the memoryview has to let go before the mapping can be closed
+        self.records.release()
+        self.records = None
+        self.map.close()
+        self.file.close()
+
+    def __del__(self):
+        # the last set using it is gone (unpickled copies are never
+        # closed by hand), let go of the mapping and the file
+        self.close()
+
+
+class _BufferSortedSet(Sequence, Set):
+    """
+    Read-only SortedSet over the records of a buffer in the save() format
+    """
+    # Where the buffer comes from is up to the subclass: a "source"
+    # is anything with name, kind, width, records, count and close(),
+    # shared by the set and all the slices taken from it
+    __slots__ = ('_source', '_start', '_stop')
+
+    def _attach(self, source):
+        self._source = source
+        self._start = 0
+        self._stop = source.count
+
+    def _slice(self, start, stop):
+        # same buffer, narrower window: nothing is read or copied
+        result = type(self).__new__(type(self))
+        result._source = self._source
+        result._start = start
+        result._stop = stop
+        return result
+
+    @property
+    def _records(self):
+        records = self._source.records
+        if records is None:
+            raise ValueError('I/O operation on a closed {}'.format(type(self).__name__))
+        return records
+
+    @property
+    def kind(self):
+        return self._source.kind
+
+    @property
+    def width(self):
+        return self._source.width
+
+    def close(self):
+        # closes the buffer for every slice taken from this set as well
+        self._source.close()
+
+    def __reduce__(self):
+        # pickles as where the buffer lives, not as the items: the other
+        # side opens (or attaches to) the same one again
+        return _reopen, (type(self), self._source.name, self._start, self._stop)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def to_sorted_set(self):
+        # load it all into memory after all
+        records = self._records
+        if self.kind == 'q':
+            items = array('q')
+            items.frombytes(records[self._start:self._stop].cast('B'))
+        else:
+            items = list(self)
+        return SortedSet._from_sorted(items)
+
+    # the Set mixins build their results with this, and a set computed
+    # from a mapped one lives in memory
+    @classmethod
+    def _from_iterable(cls, iterable):
+        return SortedSet(iterable)
+
+    # ======= the protocols =======
+    # every lookup is a bisect over [_start, _stop) of the records
+
+    def _bisect_left(self, value):
+        return bisect_left(self._records, value, self._start, self._stop)
+
+    def _bisect_right(self, value):
+        return bisect_right(self._records, value, self._start, self._stop)
+
+    def __contains__(self, item):
+        try:
+            index = self._bisect_left(item)
+        except TypeError:
+            # a str in a set of ints, ...
+            return False
+        return index != self._stop and self._records[index] == item
+
+    def __len__(self):
+        return self._stop - self._start
+
+    def __iter__(self):
+        return map(self._records.__getitem__, range(self._start, self._stop))
+
+    def __reversed__(self):
+        return map(self._records.__getitem__, range(self._stop - 1, self._start - 1, -1))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step == 1:
+                return self._slice(self._start + start, self._start + max(start, stop))
+            # any other step isn't a window any more, copy those items
+            return SortedSet(self[i] for i in range(start, stop, step))
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('MappedSortedSet index out of range')
+        return self._records[self._start + index]
+
+    def __repr__(self):
+        text = '{}({!r})'.format(type(self).__name__, self._source.name)
+        if (self._start, self._stop) != (0, self._source.count):
+            text += '[{}:{}]'.format(self._start, self._stop)
+        return text
+
+    def count(self, value):
+        return int(value in self)
+
+    def index(self, value, start=0, stop=None):
+        if value in self:
+            return self._bisect_left(value) - self._start
+        raise ValueError('{} not found'.format(repr(value)))
+
+    # ======= range queries =======
+
+    def bisect_left(self, value):
+        return self._bisect_left(value) - self._start
+
+    def bisect_right(self, value):
+        return self._bisect_right(value) - self._start
+
+    def _range_positions(self, minimum, maximum, inclusive):
+        low_inclusive, high_inclusive = inclusive
+        if minimum is None:
+            start = self._start
+        else:
+            start = self._bisect_left(minimum) if low_inclusive else self._bisect_right(minimum)
+        if maximum is None:
+            stop = self._stop
+        else:
+            stop = self._bisect_right(maximum) if high_inclusive else self._bisect_left(maximum)
+        return start, max(start, stop)
+
+    def irange(self, minimum=None, maximum=None, inclusive=(True, True), reverse=False):
+        # lazy: records are read from the mapping as we go
+        start, stop = self._range_positions(minimum, maximum, inclusive)
+        positions = range(stop - 1, start - 1, -1) if reverse else range(start, stop)
+        return map(self._records.__getitem__, positions)
+
+    def count_range(self, minimum=None, maximum=None, inclusive=(True, True)):
+        start, stop = self._range_positions(minimum, maximum, inclusive)
+        return stop - start
+
+
+def _reopen(cls, name, start, stop):
+    s = cls(name)
+    return s if (start, stop) == (0, len(s)) else s._slice(start, stop)
+
+
+class MappedSortedSet(_BufferSortedSet):
+    """
+    Read-only SortedSet backed by a memory-mapped file written by save()
+    """
+    __slots__ = ()
+
+    def __init__(self, path):
+        self._attach(_Mapping(path))
+
+
+# ======= writing =======
+
+def _int_blocks(items):
+    block = array('q')
+    for item in items:
+        block.append(item)
+        if len(block) == _WRITE_BLOCK:
+            yield block
+            block = array('q')
+    if block:
+        yield block
+
+
+def _bytes_blocks(items, width):
+    block = []
+    for item in items:
+        if len(item) > width:
+            raise ValueError('{!r} is longer than the record width {}'.format(item, width))
+        if item.endswith(b'\0'):
+            raise ValueError('{!r} ends in a NUL byte, which the padding would swallow'.format(item))
+        block.append(item.ljust(width, b'\0'))
+        if len(block) == _WRITE_BLOCK:
+            yield b''.join(block)
+            block = []
+    if block:
+        yield b''.join(block)
+
+
+def _checked(items):
+    # pass items through, making sure they really are sorted and unique
+    items = iter(items)
+    for previous in items:
+        yield previous
+        break
+    for item in items:
+        if not lt(previous, item):
+            raise ValueError('items are not sorted and unique: {!r} then {!r}'.format(previous, item))
+        yield item
+        previous = item
+
+
+def _layout(items, width):
+    # -> kind, record width, array storage to write in one go (or None),
+    # and an iterator over the items
+    if isinstance(items, SortedSet) and items._key is not None:
+        raise ValueError('a SortedSet with a key function is not in value order')
+    storage = items._items if isinstance(items, SortedSet) else None
+    if not (isinstance(storage, array) and storage.typecode == 'q'):
+        storage = None
+
+    iterator = iter(items)
+    first = next(iterator, None)
+    if first is None:
+        kind = 's' if width is not None else 'q'
+    elif isinstance(first, int) and not isinstance(first, bool):
+        kind = 'q'
+    elif isinstance(first, (bytes, bytearray)):
+        kind = 's'
+    else:
+        raise TypeError('can only save ints or bytes, not {}'.format(type(first).__name__))
+
+    if kind == 'q':
+        width = 8
+    elif width is None:
+        if not isinstance(items, (Sequence, SortedSet)):
+            raise ValueError('pass a width to save bytes from an iterator')
+        width = max(map(len, items))
+    if first is not None and kind == 's' and width <= 0:
+        raise ValueError('record width must be positive, not {}'.format(width))
+    values = iter(()) if first is None else chain((first,), iterator)
+    return kind, width, storage, values
+
+
+def _write(f, kind, width, storage, values):
+    # header, records, then the header again now that the count is known
+    count = 0
+    f.write(_HEADER.pack(_MAGIC, kind.encode(), _BYTEORDER, width, 0))
+    if storage is not None:
+        # already int64 in memory, one write
+        f.write(storage)
+        count = len(storage)
+    else:
+        values = _checked(values)
+        blocks = _int_blocks(values) if kind == 'q' else _bytes_blocks(values, width)
+        for block in blocks:
+            f.write(block)
+            count += len(block) if kind == 'q' else len(block) // width
+    f.seek(0)
+    f.write(_HEADER.pack(_MAGIC, kind.encode(), _BYTEORDER, width, count))
+    return count
+
+
+def save(items, path, width=None):
+    """
+    Write a SortedSet (or any iterable of ints or bytes that is already
+    sorted, without duplicates) to path in the MappedSortedSet format.
+    Bytes records need a width, worked out from the items when they
+    are a SortedSet or a sequence.
+    Returns the number of records written.
+    """
+    layout = _layout(items, width)
+    with open(path, 'wb') as f:
+        return _write(f, *layout)
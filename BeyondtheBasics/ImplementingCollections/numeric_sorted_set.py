@@ -0,0 +1,352 @@
+from collections.abc import Sequence, Set
+from math import ceil
+
+import numpy as np
+
+from sorted_set import SortedSet
+
+"""
+SortedSet keeps a list of boxed python objects, that's 8 bytes for the
+pointer plus ~28 bytes for every int object, and every bisect step is a
+full python comparison.
+
+For plain ints and floats a contiguous numpy array holds the same data
+in 8 bytes per element, and numpy can do the searching (searchsorted is
+a bisect) and the set algebra on whole arrays at once.
+
+Same interface as SortedSet, only the storage is different.
+"""
+
+# iterating hands out python scalars a block at a time, so we never
+# build a list of the whole set just to loop over it
+_ITER_BLOCK = 4096
+
+
+def _as_array_input(items):
+    # np.array() only understands arrays and real sequences, a set or a
+    # generator would end up as a single object element
+    if items is None:
+        return ()
+    if isinstance(items, (np.ndarray, list, tuple, range)):
+        return items
+    return list(items)
+
+
+def _checked(array, items):
+    # np.array() turns anything into *some* array: strs into a '<U' array,
+    # mixed types and ints past 64 bits into objects, and ints next to
+    # floats into floats whether they fit in one or not
+    if array.dtype.kind not in 'iuf':
+        raise ValueError('NumericSortedSet holds ints and floats, not {}'.format(array.dtype))
+    if array.dtype.kind == 'f' and isinstance(items, (list, tuple)):
+        for item in items:
+            if isinstance(item, (int, np.integer)) and float(item) != int(item):
+                raise ValueError('{!r} doesn\'t fit in a {} NumericSortedSet'.format(item, array.dtype))
+    return array
+
+
+def _member_mask(values, items):
+    # for every element of values: is it in (sorted) items?
+    # one vectorized bisect for the whole array
+    if not len(items):
+        return np.zeros(len(values), dtype=bool)
+    positions = np.searchsorted(items, values)
+    positions[positions == len(items)] = 0
+    return items[positions] == values
+
+
+def _sorted_unique(array):
+    # array is sorted but may repeat values
+    if len(array) < 2:
+        return array
+    keep = np.empty(len(array), dtype=bool)
+    keep[0] = True
+    np.not_equal(array[1:], array[:-1], out=keep[1:])
+    return array[keep]
+
+
+def _merge(a, b):
+    # a stable sort of two sorted runs is a single merge (timsort
+    # finds the two runs) so this is linear, not n log n
+    merged = np.concatenate((a, b))
+    merged.sort(kind='stable')
+    return merged
+
+
+class NumericSortedSet(Sequence, Set):
+    """
+    SortedSet of ints or floats stored in a numpy array
+    """
+    def __init__(self, items=None, dtype=None):
+        items = _as_array_input(items)
+        array = _checked(np.array(items, dtype=dtype), items)
+        if array.ndim != 1:
+            array = array.reshape(-1)
+        if len(array) > 1 and not (array[1:] > array[:-1]).all():
+            # np.unique sorts and drops duplicates in one go
+            array = np.unique(array)
+        self._items = array
+
+    @classmethod
+    def from_sorted(cls, items, copy=True):
+        # trust the caller: items are already in ascending order
+        items = _as_array_input(items)
+        array = _checked(np.array(items) if copy else np.asarray(items), items)
+        return cls._from_sorted(_sorted_unique(array))
+
+    @classmethod
+    def _from_sorted(cls, array):
+        result = cls.__new__(cls)
+        result._items = array
+        return result
+
+    @property
+    def dtype(self):
+        return self._items.dtype
+
+    def memory_usage(self):
+        return self._items.nbytes
+
+    # ======= the protocols =======
+
+    def __contains__(self, item):
+        items = self._items
+        index = items.searchsorted(item)
+        return bool(index != len(items) and items[index] == item)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        items = self._items
+        for start in range(0, len(items), _ITER_BLOCK):
+            yield from items[start:start + _ITER_BLOCK].tolist()
+
+    def __reversed__(self):
+        items = self._items
+        for stop in range(len(items), 0, -_ITER_BLOCK):
+            yield from reversed(items[max(0, stop - _ITER_BLOCK):stop].tolist())
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            # numpy slices are views, nothing gets copied
+            result = self._items[item]
+            if item.step is not None and item.step < 0:
+                result = result[::-1]
+            return self._from_sorted(result)
+        return self._items[item].item()
+
+    def __repr__(self):
+        return 'NumericSortedSet({})'.format(
+            repr(self._items.tolist()) if len(self._items) else ''
+        )
+
+    def __eq__(self, other):
+        if isinstance(other, NumericSortedSet):
+            return bool(np.array_equal(self._items, other._items))
+        if isinstance(other, SortedSet) and other._key is None:
+            return len(self) == len(other) and self._items.tolist() == list(other._items)
+        return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    def count(self, value):
+        return int(value in self)
+
+    def index(self, value, start=0, stop=None):
+        items = self._items
+        index = int(items.searchsorted(value))
+        if index != len(items) and items[index] == value:
+            return index
+        raise ValueError('{} not found'.format(repr(value)))
+
+    # ======= batch lookups =======
+    # one searchsorted call for the whole batch, results come back as
+    # arrays in the order of the values
+
+    def contains_many(self, values):
+        return _member_mask(np.asarray(_as_array_input(values)), self._items)
+
+    def index_many(self, values):
+        # -1 for the values that are missing
+        values = np.asarray(_as_array_input(values))
+        items = self._items
+        if not len(items):
+            return np.full(len(values), -1, dtype=np.intp)
+        positions = np.searchsorted(items, values)
+        positions[positions == len(items)] = 0
+        return np.where(items[positions] == values, positions, -1)
+
+    # ======= range queries =======
+
+    def bisect_left(self, value):
+        return int(self._items.searchsorted(value, side='left'))
+
+    def bisect_right(self, value):
+        return int(self._items.searchsorted(value, side='right'))
+
+    def _range_positions(self, minimum, maximum, inclusive):
+        low_inclusive, high_inclusive = inclusive
+        items = self._items
+        start = 0 if minimum is None else int(
+            items.searchsorted(minimum, side='left' if low_inclusive else 'right'))
+        stop = len(items) if maximum is None else int(
+            items.searchsorted(maximum, side='right' if high_inclusive else 'left'))
+        return start, max(start, stop)
+
+    def irange(self, minimum=None, maximum=None, inclusive=(True, True), reverse=False):
+        start, stop = self._range_positions(minimum, maximum, inclusive)
+        view = self._from_sorted(self._items[start:stop])
+        return reversed(view) if reverse else iter(view)
+
+    def count_range(self, minimum=None, maximum=None, inclusive=(True, True)):
+        start, stop = self._range_positions(minimum, maximum, inclusive)
+        return stop - start
+
+    # ======= order statistics and neighbours =======
+
+    def rank(self, value):
+        return self.bisect_left(value)
+
+    def floor(self, value):
+        index = self.bisect_right(value)
+        return self[index - 1] if index else None
+
+    def ceiling(self, value):
+        index = self.bisect_left(value)
+        return self[index] if index != len(self._items) else None
+
+    def lower(self, value):
+        index = self.bisect_left(value)
+        return self[index - 1] if index else None
+
+    def higher(self, value):
+        index = self.bisect_right(value)
+        return self[index] if index != len(self._items) else None
+
+    def nearest(self, value):
+        n = len(self._items)
+        if not n:
+            return None
+        index = self.bisect_left(value)
+        if index == n:
+            return self[-1]
+        if index == 0:
+            return self[0]
+        below, above = self[index - 1], self[index]
+        return below if value - below <= above - value else above
+
+    def percentile(self, p):
+        if not 0 <= p <= 100:
+            raise ValueError('percentile must be between 0 and 100, not {!r}'.format(p))
+        if not len(self._items):
+            raise ValueError('percentile of an empty NumericSortedSet')
+        return self[max(0, ceil(p * len(self._items) / 100) - 1)]
+
+    # ======= concatenation and repetition =======
+
+    def __add__(self, other):
+        return self | other
+
+    def __mul__(self, other):
+        return self if other > 0 else self._from_sorted(self._items[:0])
+
+    def __rmul__(self, other):
+        return self * other
+
+    # ======= set algebra =======
+    # everything below works on whole arrays, there is no python loop
+    # over the elements anywhere
+
+    def _operand(self, other):
+        if isinstance(other, NumericSortedSet):
+            return other._items
+        if isinstance(other, SortedSet) and other._key is None:
+            # a SortedSet of anything else (strs, Decimals, ...) goes
+            # through the mixins like any other Set, numpy would quietly
+            # turn both sides into strings or objects
+            try:
+                return _checked(np.array(other._items), other._items)
+            except ValueError:
+                return None
+        return None
+
+    def __and__(self, other):
+        b = self._operand(other)
+        if b is None:
+            return Set.__and__(self, other)
+        a = self._items
+        # bisect the smaller array into the bigger one
+        if len(a) > len(b):
+            a, b = b, a
+        return self._from_sorted(a[_member_mask(a, b)])
+
+    def __or__(self, other):
+        b = self._operand(other)
+        if b is None:
+            return Set.__or__(self, other)
+        return self._from_sorted(_sorted_unique(_merge(self._items, b)))
+
+    def __xor__(self, other):
+        b = self._operand(other)
+        if b is None:
+            return Set.__xor__(self, other)
+        a = self._items
+        return self._from_sorted(_merge(a[~_member_mask(a, b)], b[~_member_mask(b, a)]))
+
+    def __sub__(self, other):
+        b = self._operand(other)
+        if b is None:
+            return Set.__sub__(self, other)
+        a = self._items
+        return self._from_sorted(a[~_member_mask(a, b)])
+
+    def __le__(self, other):
+        b = self._operand(other)
+        if b is None:
+            return Set.__le__(self, other)
+        return len(self._items) <= len(b) and bool(_member_mask(self._items, b).all())
+
+    def __lt__(self, other):
+        b = self._operand(other)
+        if b is None:
+            return Set.__lt__(self, other)
+        return len(self._items) < len(b) and self <= other
+
+    def __ge__(self, other):
+        b = self._operand(other)
+        if b is None:
+            return Set.__ge__(self, other)
+        return len(self._items) >= len(b) and bool(_member_mask(b, self._items).all())
+
+    def __gt__(self, other):
+        b = self._operand(other)
+        if b is None:
+            return Set.__gt__(self, other)
+        return len(self._items) > len(b) and self >= other
+
+    def isdisjoint(self, other):
+        b = self._operand(other)
+        if b is None:
+            return Set.isdisjoint(self, other)
+        return not _member_mask(self._items, b).any()
+
+    def issubset(self, iterable):
+        return self <= NumericSortedSet(iterable)
+
+    def issuperset(self, iterable):
+        return self >= NumericSortedSet(iterable)
+
+    def intersection(self, iterable):
+        return self & NumericSortedSet(iterable)
+
+    def union(self, iterable):
+        return self | NumericSortedSet(iterable)
+
+    def symmetric_difference(self, iterable):
+        return self ^ NumericSortedSet(iterable)
+
+    def difference(self, iterable):
+        return self - NumericSortedSet(iterable)
@@ -0,0 +1,556 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Sequence, Set
+from itertools import chain
+from math import ceil, floor
+
+from sorted_set import (SortedSet, _difference, _intersection, _sorted_unique,
+                        _symmetric_difference, _union)
+
+"""
+Compressed SortedSet for unsigned 32-bit ints, in the style of Roaring
+bitmaps (https://roaringbitmap.org)
+
+Every value is split into its high 16 bits, which pick a "container",
+and its low 16 bits, which are stored in that container.  Each
+container holds up to 65536 values and uses whichever of three
+representations is smallest for what's in it:
+
+    array   sorted array('H') of the low bits     2 bytes per value
+    bitmap  a python int with one bit per value    8 KB flat
+    run     sorted (start, end) pairs of runs      4 bytes per run
+
+So a sparse container costs 2 bytes per value instead of the ~36 of a
+boxed int in a list, a dense one an eighth of a byte, and a long run of
+consecutive ids next to nothing.
+
+Set algebra works container by container: only containers with the
+same high bits ever meet, and two bitmaps combine with a single big-int
+&, |, ^ (which python does a machine word at a time).  The other side
+can hold anything: values that can't be members (negative, too big,
+not ints) just drop out of & and -, and | or ^ with them gives a plain
+SortedSet.
+
+Positions (s[i], index(), bisect) go through a running count of the
+values in all the containers before each one, then a rank/select
+inside that one container.
+"""
+
+_CONTAINER_BITS = 16
+_LOW_MASK = (1 << _CONTAINER_BITS) - 1
+_MAX_VALUE = (1 << 32) - 1
+_BITMAP_BYTES = (1 << _CONTAINER_BITS) // 8
+# above this many values an array container would be bigger than a bitmap
+_ARRAY_MAX = _BITMAP_BYTES // 2
+
+
+def _fits(value):
+    return isinstance(value, int) and 0 <= value <= _MAX_VALUE
+
+
+try:
+    _popcount = int.bit_count
+except AttributeError:
+    # before python 3.10
+    def _popcount(bits):
+        return bin(bits).count('1')
+
+# the positions of the set bits of every byte value
+_BYTE_BITS = tuple(tuple(i for i in range(8) if byte >> i & 1) for byte in range(256))
+
+
+def _lows_from_bits(bits):
+    # set bits of a container bitmap -> sorted list of positions
+    lows = []
+    for offset, byte in enumerate(bits.to_bytes(_BITMAP_BYTES, 'little')):
+        if byte:
+            base = offset << 3
+            lows.extend(base + i for i in _BYTE_BITS[byte])
+    return lows
+
+
+def _bits_from_lows(lows):
+    packed = bytearray(_BITMAP_BYTES)
+    for low in lows:
+        packed[low >> 3] |= 1 << (low & 7)
+    return int.from_bytes(packed, 'little')
+
+
+def _runs_from_lows(lows):
+    # sorted positions -> (starts, ends) of the runs of consecutive ones
+    starts, ends = array('H'), array('H')
+    previous = None
+    for low in lows:
+        if previous is None or low != previous + 1:
+            if previous is not None:
+                ends.append(previous)
+            starts.append(low)
+        previous = low
+    if previous is not None:
+        ends.append(previous)
+    return starts, ends
+
+
+# ======= the three containers =======
+# all of them answer the same questions about their low 16 bit values:
+# len, in, iteration, rank (how many are smaller), select (the i-th),
+# bits() (as a bitmap) and nbytes
+
+class _ArrayContainer:
+    __slots__ = ('values',)
+
+    def __init__(self, values):
+        self.values = values
+
+    def __len__(self):
+        return len(self.values)
+
+    def __contains__(self, low):
+        values = self.values
+        index = bisect_left(values, low)
+        return index != len(values) and values[index] == low
+
+    def __iter__(self):
+        return iter(self.values)
+
+    def __reversed__(self):
+        return reversed(self.values)
+
+    def rank(self, low):
+        return bisect_left(self.values, low)
+
+    def select(self, index):
+        return self.values[index]
+
+    def lows(self):
+        return self.values
+
+    def bits(self):
+        return _bits_from_lows(self.values)
+
+    def nbytes(self):
+        return len(self.values) * self.values.itemsize
+
+
+class _BitmapContainer:
+    __slots__ = ('_bits', '_count')
+
+    def __init__(self, bits, count=None):
+        self._bits = bits
+        self._count = _popcount(bits) if count is None else count
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, low):
+        return self._bits >> low & 1 == 1
+
+    def __iter__(self):
+        return iter(_lows_from_bits(self._bits))
+
+    def __reversed__(self):
+        return reversed(_lows_from_bits(self._bits))
+
+    def rank(self, low):
+        return _popcount(self._bits & ((1 << low) - 1))
+
+    def select(self, index):
+        # binary search for the smallest position with index + 1 bits at
+        # or below it: 16 rounds of big-int masking, no iteration
+        lo, hi = 0, _LOW_MASK
+        while lo < hi:
+            middle = (lo + hi) // 2
+            if self.rank(middle + 1) > index:
+                hi = middle
+            else:
+                lo = middle + 1
+        return lo
+
+    def lows(self):
+        return _lows_from_bits(self._bits)
+
+    def bits(self):
+        return self._bits
+
+    def nbytes(self):
+        return _BITMAP_BYTES
+
+
+class _RunContainer:
+    __slots__ = ('starts', 'ends', '_before')
+
+    def __init__(self, starts, ends):
+        self.starts = starts
+        self.ends = ends
+        # how many values there are in the runs before each run
+        before, total = [], 0
+        for start, end in zip(starts, ends):
+            before.append(total)
+            total += end - start + 1
+        before.append(total)
+        self._before = before
+
+    def __len__(self):
+        return self._before[-1]
+
+    def __contains__(self, low):
+        index = bisect_right(self.starts, low) - 1
+        return index >= 0 and low <= self.ends[index]
+
+    def __iter__(self):
+        return chain.from_iterable(map(range, self.starts, (end + 1 for end in self.ends)))
+
+    def __reversed__(self):
+        return chain.from_iterable(range(end, start - 1, -1)
+                                   for start, end in zip(reversed(self.starts), reversed(self.ends)))
+
+    def rank(self, low):
+        index = bisect_right(self.starts, low) - 1
+        if index < 0:
+            return 0
+        return self._before[index] + min(low, self.ends[index] + 1) - self.starts[index]
+
+    def select(self, index):
+        run = bisect_right(self._before, index) - 1
+        return self.starts[run] + index - self._before[run]
+
+    def lows(self):
+        return list(self)
+
+    def bits(self):
+        bits = 0
+        for start, end in zip(self.starts, self.ends):
+            bits |= ((1 << (end - start + 1)) - 1) << start
+        return bits
+
+    def nbytes(self):
+        return len(self.starts) * 4
+
+
+def _from_lows(lows):
+    # sorted, unique low bits -> the smallest container for them
+    # (None when there aren't any)
+    count = len(lows)
+    if not count:
+        return None
+    starts, ends = _runs_from_lows(lows)
+    if 4 * len(starts) < min(2 * count, _BITMAP_BYTES):
+        return _RunContainer(starts, ends)
+    if count <= _ARRAY_MAX:
+        return _ArrayContainer(array('H', lows))
+    return _BitmapContainer(_bits_from_lows(lows), count)
+
+
+def _from_bits(bits):
+    if not bits:
+        return None
+    count = _popcount(bits)
+    # a run starts at every set bit whose lower neighbour isn't set
+    runs = _popcount(bits & ~(bits << 1))
+    if 4 * runs < min(2 * count, _BITMAP_BYTES):
+        return _RunContainer(*_runs_from_lows(_lows_from_bits(bits)))
+    if count <= _ARRAY_MAX:
+        return _ArrayContainer(array('H', _lows_from_bits(bits)))
+    return _BitmapContainer(bits, count)
+
+
+def _bits_and(a, b):
+    return a & b
+
+
+def _bits_or(a, b):
+    return a | b
+
+
+def _bits_xor(a, b):
+    return a ^ b
+
+
+def _bits_sub(a, b):
+    return a & ~b
+
+
+def _combine(a, b, merge, bits_op):
+    # two containers with the same high bits -> container (or None)
+    if type(a) is _ArrayContainer and type(b) is _ArrayContainer:
+        # two small sorted arrays: the SortedSet merge helpers
+        return _from_lows(merge(a.values, b.values))
+    return _from_bits(bits_op(a.bits(), b.bits()))
+
+
+class RoaringSortedSet(Sequence, Set):
+    """
+    SortedSet of ints in [0, 2**32) stored in compressed containers
+    """
+    __slots__ = ('_highs', '_containers', '_offsets')
+
+    def __init__(self, items=None):
+        values = _sorted_unique(items) if items is not None else []
+        if values and (values[0] < 0 or values[-1] > _MAX_VALUE
+                       or not all(isinstance(value, int) for value in values)):
+            raise ValueError('RoaringSortedSet holds ints from 0 to 2**32 - 1')
+        highs, containers = [], []
+        start = 0
+        while start < len(values):
+            high = values[start] >> _CONTAINER_BITS
+            stop = bisect_left(values, (high + 1) << _CONTAINER_BITS, start)
+            highs.append(high)
+            containers.append(_from_lows([value & _LOW_MASK for value in values[start:stop]]))
+            start = stop
+        self._set(highs, containers)
+
+    @classmethod
+    def _from_containers(cls, highs, containers):
+        result = cls.__new__(cls)
+        result._set(highs, containers)
+        return result
+
+    def _set(self, highs, containers):
+        self._highs = highs
+        self._containers = containers
+        # offsets[i]: how many values there are in the containers before i
+        offsets, total = [], 0
+        for container in containers:
+            offsets.append(total)
+            total += len(container)
+        offsets.append(total)
+        self._offsets = offsets
+
+    def memory_usage(self):
+        # bytes of value storage, containers plus the high bits
+        return sum(container.nbytes() for container in self._containers) + 2 * len(self._highs)
+
+    def _container(self, value):
+        # (position among the containers, container) for value's high bits
+        high = value >> _CONTAINER_BITS
+        index = bisect_left(self._highs, high)
+        if index != len(self._highs) and self._highs[index] == high:
+            return index, self._containers[index]
+        return index, None
+
+    # ======= the protocols =======
+
+    def __contains__(self, item):
+        if not isinstance(item, int) or not 0 <= item <= _MAX_VALUE:
+            return False
+        _, container = self._container(item)
+        return container is not None and item & _LOW_MASK in container
+
+    def __len__(self):
+        return self._offsets[-1]
+
+    def __iter__(self):
+        for high, container in zip(self._highs, self._containers):
+            base = high << _CONTAINER_BITS
+            for low in container:
+                yield base | low
+
+    def __reversed__(self):
+        for high, container in zip(reversed(self._highs), reversed(self._containers)):
+            base = high << _CONTAINER_BITS
+            for low in reversed(container):
+                yield base | low
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            # a slice of a set is still a set: build a new one from the positions
+            return type(self)(map(self.__getitem__, range(*index.indices(len(self)))))
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('RoaringSortedSet index out of range')
+        k = bisect_right(self._offsets, index) - 1
+        low = self._containers[k].select(index - self._offsets[k])
+        return self._highs[k] << _CONTAINER_BITS | low
+
+    def __repr__(self):
+        return 'RoaringSortedSet({})'.format(repr(list(self)) if len(self) else '')
+
+    def __eq__(self, other):
+        if isinstance(other, RoaringSortedSet):
+            return (self._highs == other._highs and
+                    all(len(a) == len(b) and a.bits() == b.bits()
+                        for a, b in zip(self._containers, other._containers)))
+        if isinstance(other, (Set, SortedSet)):
+            return len(self) == len(other) and all(item in self for item in other)
+        return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    def count(self, value):
+        return int(value in self)
+
+    def index(self, value, start=0, stop=None):
+        if value in self:
+            return self.bisect_left(value)
+        raise ValueError('{} not found'.format(repr(value)))
+
+    def bisect_left(self, value):
+        # how many values are smaller than value
+        if value <= 0:
+            return 0
+        if value > _MAX_VALUE:
+            return len(self)
+        # the ints below 2.5 are the ints below 3
+        value = ceil(value)
+        index, container = self._container(value)
+        if container is None:
+            return self._offsets[index]
+        return self._offsets[index] + container.rank(value & _LOW_MASK)
+
+    def bisect_right(self, value):
+        # how many values are at most value: the ones below floor(value) + 1
+        if value < 0:
+            return 0
+        if value >= _MAX_VALUE:
+            return len(self)
+        return self.bisect_left(floor(value) + 1)
+
+    def rank(self, value):
+        return self.bisect_left(value)
+
+    # ======= set algebra =======
+    # walk the two lists of high bits like a merge, combining the
+    # containers the two sides have in common
+
+    def _merge(self, other, merge, bits_op, keep_a, keep_b):
+        highs, containers = [], []
+        a_highs, a_containers = self._highs, self._containers
+        b_highs, b_containers = other._highs, other._containers
+        i = j = 0
+        while i < len(a_highs) or j < len(b_highs):
+            if j == len(b_highs) or (i < len(a_highs) and a_highs[i] < b_highs[j]):
+                high, container = a_highs[i], a_containers[i] if keep_a else None
+                i += 1
+            elif i == len(a_highs) or b_highs[j] < a_highs[i]:
+                high, container = b_highs[j], b_containers[j] if keep_b else None
+                j += 1
+            else:
+                high = a_highs[i]
+                container = _combine(a_containers[i], b_containers[j], merge, bits_op)
+                i += 1
+                j += 1
+            if container is not None:
+                highs.append(high)
+                containers.append(container)
+        return self._from_containers(highs, containers)
+
+    @classmethod
+    def _from_iterable(cls, iterable):
+        # what the Set mixins build their results with: values from the
+        # other side that don't fit in 32 bits make it a plain SortedSet
+        values = _sorted_unique(iterable)
+        if all(map(_fits, values)):
+            return cls(values)
+        return SortedSet.from_sorted(values, copy=False)
+
+    def _operand(self, other, iterable=False):
+        # (the values of other that could be in a RoaringSortedSet as
+        # one, whether other had any others), or None for the mixins.
+        # Values below 0, above 2**32 - 1 or not ints are never members
+        if isinstance(other, RoaringSortedSet):
+            return other, False
+        if isinstance(other, SortedSet) and other._key is None:
+            items = other._items
+            if not items or (isinstance(items, array) and items.typecode == 'q'
+                             and items[0] >= 0 and items[-1] <= _MAX_VALUE):
+                return RoaringSortedSet(items), False
+        elif not iterable:
+            return None
+        values = list(other)
+        fitting = [value for value in values if _fits(value)]
+        return RoaringSortedSet(fitting), len(fitting) != len(values)
+
+    def __and__(self, other):
+        operand = self._operand(other)
+        if operand is None:
+            return Set.__and__(self, other)
+        return self._merge(operand[0], _intersection, _bits_and, False, False)
+
+    def __or__(self, other):
+        operand = self._operand(other)
+        if operand is None or operand[1]:
+            return Set.__or__(self, other)
+        return self._merge(operand[0], _union, _bits_or, True, True)
+
+    def __xor__(self, other):
+        operand = self._operand(other)
+        if operand is None or operand[1]:
+            return Set.__xor__(self, other)
+        return self._merge(operand[0], _symmetric_difference, _bits_xor, True, True)
+
+    def __sub__(self, other):
+        # values of other that can't be members can't take anything away
+        operand = self._operand(other)
+        if operand is None:
+            return Set.__sub__(self, other)
+        return self._merge(operand[0], _difference, _bits_sub, True, False)
+
+    def _subset_of(self, other):
+        # every container of ours has to be inside theirs
+        if len(self) > len(other):
+            return False
+        for high, container in zip(self._highs, self._containers):
+            _, theirs = other._container(high << _CONTAINER_BITS)
+            if theirs is None or len(container) > len(theirs):
+                return False
+            if container.bits() & ~theirs.bits():
+                return False
+        return True
+
+    def _le(self, operand):
+        b, _ = operand
+        return self._subset_of(b)
+
+    def _lt(self, operand):
+        # other's values that aren't ours already make it the bigger set
+        b, more = operand
+        return (more or len(self) < len(b)) and self._subset_of(b)
+
+    def _ge(self, operand):
+        b, more = operand
+        return not more and b._subset_of(self)
+
+    def _gt(self, operand):
+        b, more = operand
+        return not more and len(self) > len(b) and b._subset_of(self)
+
+    def __le__(self, other):
+        operand = self._operand(other)
+        return Set.__le__(self, other) if operand is None else self._le(operand)
+
+    def __lt__(self, other):
+        operand = self._operand(other)
+        return Set.__lt__(self, other) if operand is None else self._lt(operand)
+
+    def __ge__(self, other):
+        operand = self._operand(other)
+        return Set.__ge__(self, other) if operand is None else self._ge(operand)
+
+    def __gt__(self, other):
+        operand = self._operand(other)
+        return Set.__gt__(self, other) if operand is None else self._gt(operand)
+
+    def isdisjoint(self, other):
+        operand = self._operand(other, iterable=True)
+        return not self & operand[0]
+
+    def issubset(self, iterable):
+        return self._le(self._operand(iterable, iterable=True))
+
+    def issuperset(self, iterable):
+        return self._ge(self._operand(iterable, iterable=True))
+
+    def intersection(self, iterable):
+        return self & self._operand(iterable, iterable=True)[0]
+
+    def union(self, iterable):
+        return self | self._from_iterable(iterable)
+
+    def symmetric_difference(self, iterable):
+        return self ^ self._from_iterable(iterable)
+
+    def difference(self, iterable):
+        return self - self._operand(iterable, iterable=True)[0]
@@ -0,0 +1,121 @@
+from multiprocessing import shared_memory
+
+from mapped_sorted_set import _HEADER, _BufferSortedSet, _layout, _records, _write
+from sorted_set import SortedSet
+
+"""
+A read-only SortedSet in shared memory, for fanning one big set out to
+worker processes
+
+Pickling a SortedSet to every worker sends all the items to each one,
+and each keeps its own copy.  SharedSortedSet.create() writes the
+sorted records once into a multiprocessing.shared_memory block (the
+same layout as a MappedSortedSet file).  The set pickles as just the
+name of that block, so a worker attaches in O(1) and bisects straight
+over the shared pages:
+
+    shared = SharedSortedSet.create(big_sorted_set)
+    with ProcessPoolExecutor() as pool:
+        pool.map(work, [shared] * 32)     # work(s): x in s, s.index(x), ...
+    shared.close()
+    shared.unlink()     # once, by the process that created it
+
+Everything else (ints or bytes only, lookups, slices as windows, ...)
+works like MappedSortedSet.
+"""
+
+
+class _BufferWriter:
+    # just enough of a file for _write(): write() and seek() into a buffer
+    __slots__ = ('_buffer', '_position')
+
+    def __init__(self, buffer):
+        self._buffer = buffer
+        self._position = 0
+
+    def write(self, data):
+        data = memoryview(data).cast('B')
+        self._buffer[self._position:self._position + len(data)] = data
+        self._position += len(data)
+
+    def seek(self, position):
+        self._position = position
+
+
+def _attach_memory(name):
+    # python 3.13+ can leave the block alone when this process exits,
+    # before that the resource tracker may warn about it
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+class _SharedBlock:
+    __slots__ = ('memory', 'name', 'kind', 'width', 'records', 'count')
+
+    def __init__(self, memory):
+        self.memory = memory
+        self.name = memory.name
+        self.records = None
+        try:
+            self.kind, self.width, self.records = _records(memory.buf)
+        except BaseException:
+            memory.close()
+            raise
+        self.count = len(self.records)
+
+    def close(self):
+        if self.records is None:
+            return
+        # our views of the buffer have to go before the block can be closed
+        self.records.release()
+        self.records = None
+        self.memory.close()
+
+    def __del__(self):
+        # otherwise SharedMemory.__del__ tries to close the block while
+        # our records still point into it (unpickled copies in workers
+        # are never closed by hand)
+        self.close()
+
+
+class SharedSortedSet(_BufferSortedSet):
+    """
+    Read-only SortedSet whose records live in shared memory
+    """
+    __slots__ = ()
+
+    def __init__(self, name):
+        # attach to a block made by create() in some other process
+        self._attach(_SharedBlock(_attach_memory(name)))
+
+    @classmethod
+    def create(cls, items, width=None, name=None):
+        """
+        New shared memory block holding items (a SortedSet, or anything
+        to build one from) of ints or bytes.  The caller owns the block
+        and has to unlink() it when every process is done with it.
+        """
+        if not isinstance(items, SortedSet):
+            items = SortedSet(items)
+        layout = _layout(items, width)
+        size = _HEADER.size + len(items) * layout[1]
+        memory = shared_memory.SharedMemory(name=name, create=True, size=size)
+        try:
+            _write(_BufferWriter(memory.buf), *layout)
+        except BaseException:
+            memory.close()
+            memory.unlink()
+            raise
+        result = cls.__new__(cls)
+        result._attach(_SharedBlock(memory))
+        return result
+
+    @property
+    def name(self):
+        return self._source.name
+
+    def unlink(self):
+        # destroy the block, processes still attached keep their mapping
+        self._source.memory.unlink()
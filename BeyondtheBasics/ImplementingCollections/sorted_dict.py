@@ -0,0 +1,240 @@
+from bisect import bisect_left, bisect_right
+from collections.abc import ItemsView, KeysView, MutableMapping, Sequence, ValuesView
+
+from sorted_set import _is_strictly_sorted
+
+"""
+SortedDict: a mapping that keeps its keys in order
+
+A SortedSet of keys next to a dict of values means two structures to
+update on every write and a hash lookup per key whenever the values
+are wanted in order.  Here the keys are a sorted list like
+SortedSet._items and the values sit in a second list at the same
+positions, so:
+
+    d[key]              one bisect over the keys, O(log n)
+    d.peekitem(i)       positional, O(1)
+    d.items()           walks the two lists side by side, no lookups
+    d.irange(lo, hi)    two bisects, then a plain slice of the keys
+
+Inserting or deleting a key shifts the tail of both lists along
+(a memmove, fast, but O(n)): fine for indexes that mostly get read or
+appended to in key order, like time series.
+"""
+
+
+class SortedDict(MutableMapping):
+    """
+    Mapping with its keys kept in sorted order
+    """
+    __slots__ = ('_keys', '_values')
+
+    def __init__(self, items=None, **kwargs):
+        # same arguments as dict()
+        merged = dict(items if items is not None else (), **kwargs)
+        keys = list(merged)
+        if not _is_strictly_sorted(keys):
+            keys.sort()
+        self._keys = keys
+        self._values = [merged[key] for key in keys]
+
+    @classmethod
+    def _from_sorted(cls, keys, values):
+        result = cls.__new__(cls)
+        result._keys = keys
+        result._values = values
+        return result
+
+    def copy(self):
+        return self._from_sorted(self._keys[:], self._values[:])
+
+    def _position(self, key):
+        # index of key, or -1
+        keys = self._keys
+        index = bisect_left(keys, key)
+        if index != len(keys) and keys[index] == key:
+            return index
+        return -1
+
+    # ======= the mapping protocol =======
+
+    def __getitem__(self, key):
+        index = self._position(key)
+        if index == -1:
+            raise KeyError(key)
+        return self._values[index]
+
+    def __setitem__(self, key, value):
+        keys = self._keys
+        index = bisect_left(keys, key)
+        if index != len(keys) and keys[index] == key:
+            self._values[index] = value
+        else:
+            keys.insert(index, key)
+            self._values.insert(index, value)
+
+    def __delitem__(self, key):
+        index = self._position(key)
+        if index == -1:
+            raise KeyError(key)
+        del self._keys[index]
+        del self._values[index]
+
+    def __contains__(self, key):
+        return self._position(key) != -1
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __reversed__(self):
+        return reversed(self._keys)
+
+    def __repr__(self):
+        return '{}({{{}}})'.format(type(self).__name__, ', '.join(
+            '{!r}: {!r}'.format(key, value) for key, value in zip(self._keys, self._values)))
+
+    def clear(self):
+        self._keys.clear()
+        self._values.clear()
+
+    # ======= ordered views =======
+    # like dict's views (live, set operations on keys and items) but
+    # they iterate in key order and can be indexed by position
+
+    def keys(self):
+        return SortedKeysView(self)
+
+    def values(self):
+        return SortedValuesView(self)
+
+    def items(self):
+        return SortedItemsView(self)
+
+    # ======= positions =======
+
+    def peekitem(self, index=-1):
+        # the (key, value) pair at a position, the last one by default
+        return self._keys[index], self._values[index]
+
+    def popitem(self, index=-1):
+        # the dict version pops the last inserted pair, here it's by position
+        if not self._keys:
+            raise KeyError('popitem(): dictionary is empty')
+        return self._keys.pop(index), self._values.pop(index)
+
+    def index(self, key):
+        index = self._position(key)
+        if index == -1:
+            raise ValueError('{!r} is not in SortedDict'.format(key))
+        return index
+
+    def bisect_left(self, key):
+        return bisect_left(self._keys, key)
+
+    def bisect_right(self, key):
+        return bisect_right(self._keys, key)
+
+    # ======= range queries =======
+
+    def _range_positions(self, minimum, maximum, inclusive):
+        low_inclusive, high_inclusive = inclusive
+        keys = self._keys
+        if minimum is None:
+            start = 0
+        else:
+            start = bisect_left(keys, minimum) if low_inclusive else bisect_right(keys, minimum)
+        if maximum is None:
+            stop = len(keys)
+        else:
+            stop = bisect_right(keys, maximum) if high_inclusive else bisect_left(keys, maximum)
+        return start, max(start, stop)
+
+    def irange(self, minimum=None, maximum=None, inclusive=(True, True), reverse=False):
+        # keys between minimum and maximum, None means unbounded
+        start, stop = self._range_positions(minimum, maximum, inclusive)
+        keys = self._keys[start:stop]
+        return reversed(keys) if reverse else iter(keys)
+
+    def irange_items(self, minimum=None, maximum=None, inclusive=(True, True), reverse=False):
+        start, stop = self._range_positions(minimum, maximum, inclusive)
+        keys, values = self._keys[start:stop], self._values[start:stop]
+        if reverse:
+            return zip(reversed(keys), reversed(values))
+        return zip(keys, values)
+
+    # ======= neighbours =======
+    # None when there is no such key
+
+    def floor_key(self, key):
+        index = bisect_right(self._keys, key)
+        return self._keys[index - 1] if index else None
+
+    def ceiling_key(self, key):
+        index = bisect_left(self._keys, key)
+        return self._keys[index] if index != len(self._keys) else None
+
+
+class SortedKeysView(KeysView, Sequence):
+    __slots__ = ()
+
+    def __contains__(self, key):
+        return key in self._mapping
+
+    def __iter__(self):
+        return iter(self._mapping._keys)
+
+    def __reversed__(self):
+        return reversed(self._mapping._keys)
+
+    def __getitem__(self, index):
+        return self._mapping._keys[index]
+
+    def index(self, key, start=0, stop=None):
+        return self._mapping.index(key)
+
+    def count(self, key):
+        return int(key in self._mapping)
+
+
+class SortedValuesView(ValuesView, Sequence):
+    __slots__ = ()
+
+    def __iter__(self):
+        return iter(self._mapping._values)
+
+    def __reversed__(self):
+        return reversed(self._mapping._values)
+
+    def __getitem__(self, index):
+        return self._mapping._values[index]
+
+
+class SortedItemsView(ItemsView, Sequence):
+    __slots__ = ()
+
+    def __contains__(self, item):
+        key, value = item
+        index = self._mapping._position(key)
+        return index != -1 and self._mapping._values[index] == value
+
+    def __iter__(self):
+        return zip(self._mapping._keys, self._mapping._values)
+
+    def __reversed__(self):
+        return zip(reversed(self._mapping._keys), reversed(self._mapping._values))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(zip(self._mapping._keys[index], self._mapping._values[index]))
+        return self._mapping.peekitem(index)
+
+    def index(self, item, start=0, stop=None):
+        if item not in self:
+            raise ValueError('{!r} is not in the items'.format(item))
+        return self._mapping.index(item[0])
+
+    def count(self, item):
+        return int(item in self)
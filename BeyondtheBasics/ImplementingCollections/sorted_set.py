@@ -1,6 +1,12 @@
-from bisect import bisect_left
-from collections.abc import Sequence, Set
-from itertools import chain
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import MutableSet, Sequence, Set
+from functools import reduce
+from heapq import merge
+from itertools import accumulate, chain, compress, islice
+from math import ceil
+from operator import eq, index as _as_index, lt, ne, or_, xor
+from sys import getsizeof
 
 """
 In principle, we could already implement
@@ -21,15 +27,809 @@ __getitem__ and __len__, contains, iter, reversed, index and count
 are MIXIN method unless overridden
 """
 
+# =========== CONSTRUCTION HELPERS =======
+# sorted(set(items)) does two full passes over the data even when it
+# arrives already in order (slices, merge results, data loaded from
+# sorted files), and set() only works for hashable items.
+# Sorting then dropping adjacent duplicates needs nothing but <,
+# and an already sorted list is detected in a single linear pass.
+
+def _is_strictly_sorted(items):
+    # every item smaller than the next one, i.e. sorted without duplicates
+    return all(map(lt, items, islice(items, 1, None)))
+
+
+def _unique(items):
+    # drop adjacent duplicates from a sorted list: keep each item that
+    # differs from the one before it (the first one is compared
+    # against a sentinel so it's always kept)
+    return list(compress(items, map(ne, items, chain((object(),), items))))
+
+
+def _sorted_unique(items):
+    items = list(items)
+    if _is_strictly_sorted(items):
+        return items
+    items.sort()
+    return _unique(items)
+
+
+# A list of ints costs a pointer (8 bytes) plus an int object (28+ bytes)
+# per element, an array.array of 64-bit ints just the 8 bytes.  bisect
+# and slicing work on arrays exactly like on lists, so when every item
+# is a plain int (or every item a float) we store them in an array.
+
+_INT64_MIN, _INT64_MAX = -(1 << 63), (1 << 63) - 1
+
+
+def _compact(items):
+    # sorted, unique items -> array when possible, otherwise items as they are
+    if not items or isinstance(items, array):
+        return items
+    kinds = set(map(type, items))
+    if kinds == {int}:
+        if _INT64_MIN <= items[0] and items[-1] <= _INT64_MAX:
+            return array('q', items)
+    elif kinds == {float}:
+        return array('d', items)
+    return items
+
+
+def _merged_storage(items, a, b):
+    # merging two arrays of the same type can only produce items of that
+    # type, so the result goes straight back into an array without
+    # checking every item again
+    if (type(a) is array and type(b) is array and a.typecode == b.typecode
+            and type(items) is not array):
+        return array(a.typecode, items)
+    return items
+
+
+def _inserted(items, index, value):
+    # copy of items with value inserted at index, falling back to a list
+    # when value doesn't belong in the array (a float among ints...)
+    if isinstance(items, array):
+        if type(value) is _ARRAY_TYPES[items.typecode] and (
+                type(value) is float or _INT64_MIN <= value <= _INT64_MAX):
+            return items[:index] + array(items.typecode, (value,)) + items[index:]
+        items = list(items)
+    return items[:index] + [value] + items[index:]
+
+
+_ARRAY_TYPES = {'q': int, 'd': float}
+
+
+def _items_equal(a, b):
+    # list == array is always False, compare element by element instead
+    if type(a) is type(b):
+        return a == b
+    return len(a) == len(b) and all(map(eq, a, b))
+
+
+# With a key function the order comes from the keys but set membership
+# is still decided by ==, just like a plain set of those objects: two
+# records with the same timestamp are different members that happen to
+# sit next to each other.  The keys are computed once and kept in a
+# list parallel to the items, so bisect never calls the key function.
+
+class _Run:
+    # the items of a run of equal keys, to ask "is this one already in
+    # the run" in O(1) instead of scanning the run every time.  Items
+    # that can't be hashed are kept in a list and scanned, as before
+    __slots__ = ('hashed', 'unhashed')
+
+    def __init__(self, items=()):
+        self.hashed = set()
+        self.unhashed = []
+        for item in items:
+            self.add(item)
+
+    def add(self, item):
+        try:
+            self.hashed.add(item)
+        except TypeError:
+            self.unhashed.append(item)
+
+    def __contains__(self, item):
+        try:
+            return item in self.hashed or (bool(self.unhashed) and item in self.unhashed)
+        except TypeError:
+            # an unhashable item could still be equal to a hashable one
+            return item in self.unhashed or any(item == other for other in self.hashed)
+
+
+# runs longer than this get their items looked up through a dict
+_LONG_RUN = 16
+
+
+def _run_positions(keys, items, start):
+    # ({item: position}, whether every item went in) for the run of
+    # equal keys starting at start
+    stop = bisect_right(keys, keys[start], start)
+    positions, complete = {}, True
+    for index in range(start, stop):
+        try:
+            positions.setdefault(items[index], index)
+        except TypeError:
+            complete = False
+    return positions, complete
+
+
+def _run_members(run):
+    # short runs (the usual case) are quicker to scan than to hash
+    return run if len(run) < 8 else _Run(run)
+
+
+def _keyed_unique(keys, items):
+    # drop repeated items, which can only hide inside a run of equal keys
+    unique_keys, unique_items = [], []
+    run = None
+    for key, item in zip(keys, items):
+        if unique_keys and unique_keys[-1] == key:
+            if run is None:
+                # so far the run is just the item before this one
+                run = _Run(unique_items[-1:])
+            if item in run:
+                continue
+            run.add(item)
+        else:
+            run = None
+        unique_keys.append(key)
+        unique_items.append(item)
+    return unique_keys, unique_items
+
+
+def _keyed_sorted_unique(items, key):
+    items = list(items)
+    keys = list(map(key, items))
+    if _is_strictly_sorted(keys):
+        return keys, items
+    if any(map(lt, islice(keys, 1, None), keys)):
+        # sort positions by key rather than (key, item) pairs so the
+        # items themselves never get compared
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        items = [items[i] for i in order]
+        keys = [keys[i] for i in order]
+    return _keyed_unique(keys, items)
+
+
+# =========== MERGE HELPERS =======
+# The Set mixins give us &, |, ^ and - for free, but they are generic:
+# they test every element with __contains__ (a bisect each) and then
+# push the result back through SortedSet(iterable), i.e. set() + sorted()
+# all over again.  Both of our inputs are already sorted lists, so the
+# classic merge step from merge sort does the job in one O(n + m) pass
+# and the output comes out sorted for free.
+#
+# Every helper works on a range [lo, hi) of each list (the whole list
+# by default) so that slice views can be merged without copying them.
+
+# when one side is this many times bigger than the other, stepping
+# through the big list one element at a time is wasteful, so we
+# "gallop" (exponential search + bisect) through it instead
+_GALLOP_RATIO = 8
+
+
+def _gallop(items, value, lo=0, hi=None):
+    # same answer as bisect_left(items, value, lo, hi), but it probes
+    # lo, lo+1, lo+3, lo+7, ... first, so the cost is O(log d) where d is
+    # the distance from lo to the answer rather than O(log n)
+    n = len(items) if hi is None else hi
+    step = 1
+    hi = lo
+    while hi < n and items[hi] < value:
+        lo = hi + 1
+        hi += step
+        step <<= 1
+    return bisect_left(items, value, lo, min(hi, n))
+
+
+def _concat(first, second):
+    # first + second, except that either one may be a list or an array
+    result = list(first)
+    result += second
+    return result
+
+
+def _mix_hash(item):
+    # spread the bits of hash(item) so that XORing lots of them together
+    # doesn't cancel out (the same scrambling frozenset uses)
+    h = hash(item)
+    return ((h ^ (h << 16) ^ 89869747) * 3644798167) & _HASH_MASK
+
+
+_HASH_MASK = (1 << 64) - 1
+
+
+def _iter_range(items, lo, hi):
+    if lo == 0 and hi == len(items):
+        return iter(items)
+    return map(items.__getitem__, range(lo, hi))
+
+
+def _intersection(a, b, a_lo=0, a_hi=None, b_lo=0, b_hi=None):
+    if a_hi is None:
+        a_hi = len(a)
+    if b_hi is None:
+        b_hi = len(b)
+    if a_hi - a_lo > b_hi - b_lo:
+        a, a_lo, a_hi, b, b_lo, b_hi = b, b_lo, b_hi, a, a_lo, a_hi
+    if a_lo >= a_hi or a[a_hi - 1] < b[b_lo] or b[b_hi - 1] < a[a_lo]:
+        return []
+    result = []
+    if b_hi - b_lo > _GALLOP_RATIO * (a_hi - a_lo):
+        # walk the small side, gallop through the big one
+        j = b_lo
+        for x in _iter_range(a, a_lo, a_hi):
+            j = _gallop(b, x, j, b_hi)
+            if j == b_hi:
+                break
+            if b[j] == x:
+                result.append(x)
+                j += 1
+        return result
+    i, j = a_lo, b_lo
+    while i < a_hi and j < b_hi:
+        x, y = a[i], b[j]
+        if x < y:
+            i += 1
+        elif y < x:
+            j += 1
+        else:
+            result.append(x)
+            i += 1
+            j += 1
+    return result
+
+
+def _union(a, b, a_lo=0, a_hi=None, b_lo=0, b_hi=None):
+    if a_hi is None:
+        a_hi = len(a)
+    if b_hi is None:
+        b_hi = len(b)
+    if a_lo >= a_hi:
+        return b[b_lo:b_hi]
+    if b_lo >= b_hi:
+        return a[a_lo:a_hi]
+    # non-overlapping ranges are just a concatenation
+    if a[a_hi - 1] < b[b_lo]:
+        return _concat(a[a_lo:a_hi], b[b_lo:b_hi])
+    if b[b_hi - 1] < a[a_lo]:
+        return _concat(b[b_lo:b_hi], a[a_lo:a_hi])
+    if a_hi - a_lo > b_hi - b_lo:
+        a, a_lo, a_hi, b, b_lo, b_hi = b, b_lo, b_hi, a, a_lo, a_hi
+    result = []
+    if b_hi - b_lo > _GALLOP_RATIO * (a_hi - a_lo):
+        # copy whole runs of the big side with one slice per small element
+        j = b_lo
+        for x in _iter_range(a, a_lo, a_hi):
+            k = _gallop(b, x, j, b_hi)
+            result += b[j:k]
+            j = k
+            if j == b_hi or b[j] != x:
+                result.append(x)
+        result += b[j:b_hi]
+        return result
+    i, j = a_lo, b_lo
+    while i < a_hi and j < b_hi:
+        x, y = a[i], b[j]
+        if x < y:
+            result.append(x)
+            i += 1
+        elif y < x:
+            result.append(y)
+            j += 1
+        else:
+            result.append(x)
+            i += 1
+            j += 1
+    result += a[i:a_hi]
+    result += b[j:b_hi]
+    return result
+
+
+def _difference(a, b, a_lo=0, a_hi=None, b_lo=0, b_hi=None):
+    # a - b, so unlike the others the order of the arguments matters
+    if a_hi is None:
+        a_hi = len(a)
+    if b_hi is None:
+        b_hi = len(b)
+    if (a_lo >= a_hi or b_lo >= b_hi
+            or a[a_hi - 1] < b[b_lo] or b[b_hi - 1] < a[a_lo]):
+        return a[a_lo:a_hi]
+    n, m = a_hi - a_lo, b_hi - b_lo
+    result = []
+    if m > _GALLOP_RATIO * n:
+        j = b_lo
+        for x in _iter_range(a, a_lo, a_hi):
+            j = _gallop(b, x, j, b_hi)
+            if j == b_hi or b[j] != x:
+                result.append(x)
+        return result
+    i = a_lo
+    if n > _GALLOP_RATIO * m:
+        # copy the runs of a between the (few) elements of b
+        for y in _iter_range(b, b_lo, b_hi):
+            k = _gallop(a, y, i, a_hi)
+            result += a[i:k]
+            i = k
+            if i < a_hi and a[i] == y:
+                i += 1
+        result += a[i:a_hi]
+        return result
+    j = b_lo
+    while i < a_hi and j < b_hi:
+        x, y = a[i], b[j]
+        if x < y:
+            result.append(x)
+            i += 1
+        elif y < x:
+            j += 1
+        else:
+            i += 1
+            j += 1
+    result += a[i:a_hi]
+    return result
+
+
+def _symmetric_difference(a, b, a_lo=0, a_hi=None, b_lo=0, b_hi=None):
+    if a_hi is None:
+        a_hi = len(a)
+    if b_hi is None:
+        b_hi = len(b)
+    if a_lo >= a_hi:
+        return b[b_lo:b_hi]
+    if b_lo >= b_hi:
+        return a[a_lo:a_hi]
+    if a[a_hi - 1] < b[b_lo]:
+        return _concat(a[a_lo:a_hi], b[b_lo:b_hi])
+    if b[b_hi - 1] < a[a_lo]:
+        return _concat(b[b_lo:b_hi], a[a_lo:a_hi])
+    if a_hi - a_lo > b_hi - b_lo:
+        a, a_lo, a_hi, b, b_lo, b_hi = b, b_lo, b_hi, a, a_lo, a_hi
+    result = []
+    if b_hi - b_lo > _GALLOP_RATIO * (a_hi - a_lo):
+        j = b_lo
+        for x in _iter_range(a, a_lo, a_hi):
+            k = _gallop(b, x, j, b_hi)
+            result += b[j:k]
+            j = k
+            if j < b_hi and b[j] == x:
+                j += 1
+            else:
+                result.append(x)
+        result += b[j:b_hi]
+        return result
+    i, j = a_lo, b_lo
+    while i < a_hi and j < b_hi:
+        x, y = a[i], b[j]
+        if x < y:
+            result.append(x)
+            i += 1
+        elif y < x:
+            result.append(y)
+            j += 1
+        else:
+            i += 1
+            j += 1
+    result += a[i:a_hi]
+    result += b[j:b_hi]
+    return result
+
+
+def _keyed_merge(a_keys, a_items, b_keys, b_items, keep_a, keep_b, keep_both,
+                 a_lo=0, a_hi=None, b_lo=0, b_hi=None):
+    # One merge for all four operations on sets with a key function.
+    # keep_a / keep_b: keep items found only in a / only in b
+    # keep_both: keep items found in both
+    # Runs of keys that only one side has are copied (or skipped) in one
+    # go, runs of equal keys on both sides are compared item by item.
+    n = len(a_keys) if a_hi is None else a_hi
+    m = len(b_keys) if b_hi is None else b_hi
+    result_keys, result_items = [], []
+    i, j = a_lo, b_lo
+    while i < n and j < m:
+        x, y = a_keys[i], b_keys[j]
+        if x < y:
+            k = _gallop(a_keys, y, i + 1, n)
+            if keep_a:
+                result_keys += a_keys[i:k]
+                result_items += a_items[i:k]
+            i = k
+        elif y < x:
+            k = _gallop(b_keys, x, j + 1, m)
+            if keep_b:
+                result_keys += b_keys[j:k]
+                result_items += b_items[j:k]
+            j = k
+        else:
+            a_end = bisect_right(a_keys, x, i, n)
+            b_end = bisect_right(b_keys, x, j, m)
+            a_run = a_items[i:a_end]
+            b_run = b_items[j:b_end]
+            b_members = _run_members(b_run)
+            for item in a_run:
+                if (keep_both if item in b_members else keep_a):
+                    result_keys.append(x)
+                    result_items.append(item)
+            if keep_b:
+                a_members = _run_members(a_run)
+                for item in b_run:
+                    if item not in a_members:
+                        result_keys.append(x)
+                        result_items.append(item)
+            i, j = a_end, b_end
+    if keep_a:
+        result_keys += a_keys[i:n]
+        result_items += a_items[i:n]
+    if keep_b:
+        result_keys += b_keys[j:m]
+        result_items += b_items[j:m]
+    return result_keys, result_items
+
+
+# =========== LAZY SET ALGEBRA =======
+# s & t, s | t, ... build a whole new SortedSet, which is wasted when
+# the result is only ever looped over once (to write it out, say).
+# These generators merge any number of *sorted* iterables as they are
+# consumed and keep only the current item of each one, so they can be
+# chained without a single intermediate set:
+#     for x in iter_difference(iter_union(a, b, reader), c): ...
+# SortedSets, views, sorted lists, a reader over a sorted file all work.
+# The inputs must be in ascending natural order (no key functions) and
+# nothing checks that they are.
+
+_END = object()
+
+
+def _iter_unique(items):
+    # drop adjacent duplicates from a sorted stream
+    iterator = iter(items)
+    for previous in iterator:
+        yield previous
+        break
+    for item in iterator:
+        if item != previous:
+            yield item
+            previous = item
+
+
+def iter_union(*iterables):
+    return _iter_unique(merge(*iterables))
+
+
+def iter_intersection(*iterables):
+    if not iterables:
+        return
+    iterators = [iter(iterable) for iterable in iterables]
+    try:
+        values = [next(iterator) for iterator in iterators]
+        high = max(values)
+        while True:
+            # "leapfrog": move every iterator up to the highest current
+            # value, the item is common to all once none has to move past it
+            matched = True
+            for k, iterator in enumerate(iterators):
+                value = values[k]
+                while value < high:
+                    value = next(iterator)
+                values[k] = value
+                if high < value:
+                    high = value
+                    matched = False
+            if matched:
+                yield high
+                values = [next(iterator) for iterator in iterators]
+                high = max(values)
+    except StopIteration:
+        # one of them ran out, nothing after this can be common to all
+        return
+
+
+def iter_difference(iterable, *others):
+    exclude = iter_union(*others)
+    y = next(exclude, _END)
+    for x in iterable:
+        while y is not _END and y < x:
+            y = next(exclude, _END)
+        if y is _END or x < y:
+            yield x
+
+
+def iter_symmetric_difference(first, second):
+    first, second = iter(first), iter(second)
+    x, y = next(first, _END), next(second, _END)
+    while x is not _END and y is not _END:
+        if x < y:
+            yield x
+            x = next(first, _END)
+        elif y < x:
+            yield y
+            y = next(second, _END)
+        else:
+            x, y = next(first, _END), next(second, _END)
+    if x is not _END:
+        yield x
+        yield from first
+    if y is not _END:
+        yield y
+        yield from second
+
+
+# ======= persistent chunks =======
+# with_added()/with_removed() mustn't copy all n items for every new
+# set, so the sets they make keep their items in sorted chunks, laid
+# out like MutableSortedSet's:
+#
+#   lists = [[1, 4, 9], [13, 15, 20], [22, 30]]
+#   maxes = [9, 20, 30]
+#
+# except that a chunk never changes once it's made.  A new set copies
+# the one chunk it changes and the list of chunks (n / 512 pointers)
+# and shares every other chunk with the set it came from.
+
+_CHUNK_LOAD = 512
+
+
+class _Chunks:
+    # keys: chunks of keys alongside lists, None without a key function
+    # offsets: how many items come before each chunk, worked out the
+    # first time a position is asked for
+    __slots__ = ('lists', 'keys', 'maxes', 'length', 'offsets')
+
+    def __init__(self, lists, keys, maxes, length):
+        self.lists = lists
+        self.keys = keys
+        self.maxes = maxes
+        self.length = length
+        self.offsets = None
+
+    @classmethod
+    def from_flat(cls, items, keys=None):
+        # slices of an array are arrays, so compact storage stays compact
+        starts = range(0, len(items), _CHUNK_LOAD)
+        lists = [items[i:i + _CHUNK_LOAD] for i in starts]
+        if keys is not None:
+            keys = [keys[i:i + _CHUNK_LOAD] for i in starts]
+        maxes = [chunk[-1] for chunk in (lists if keys is None else keys)]
+        return cls(lists, keys, maxes, len(items))
+
+    def flat(self):
+        # -> (items, keys or None) as one list (or array) each
+        typecodes = {getattr(chunk, 'typecode', None) for chunk in self.lists}
+        if len(typecodes) == 1 and None not in typecodes:
+            items = array(typecodes.pop())
+            for chunk in self.lists:
+                items += chunk
+        else:
+            # a float went into an int chunk somewhere, like _inserted()
+            items = list(chain.from_iterable(self.lists))
+        keys = None if self.keys is None else list(chain.from_iterable(self.keys))
+        return items, keys
+
+    def _find(self, value, key):
+        # (chunk number, position in it) of value, or None
+        maxes, lists = self.maxes, self.lists
+        if key is None:
+            i = bisect_left(maxes, value)
+            if i == len(maxes):
+                return None
+            j = bisect_left(lists[i], value)
+            return (i, j) if lists[i][j] == value else None
+        # items sharing a key can run on into the next chunks
+        query = key(value)
+        i = bisect_left(maxes, query)
+        while i != len(maxes):
+            keys = self.keys[i]
+            j = bisect_left(keys, query)
+            while j != len(keys) and keys[j] == query:
+                if lists[i][j] == value:
+                    return i, j
+                j += 1
+            if j != len(keys):
+                return None
+            i += 1
+        return None
+
+    def _offsets(self):
+        # O(n / 512) once per set of chunks, they never change
+        offsets = self.offsets
+        if offsets is None:
+            offsets = self.offsets = list(accumulate(map(len, self.lists), initial=0))
+        return offsets
+
+    def position(self, value, key):
+        # index of value in the whole set, or -1
+        found = self._find(value, key)
+        if found is None:
+            return -1
+        i, j = found
+        return self._offsets()[i] + j
+
+    def item(self, index):
+        # the item at index in the whole set, like list indexing
+        index = _as_index(index)
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError('SortedSet index out of range')
+        offsets = self._offsets()
+        i = bisect_right(offsets, index) - 1
+        return self.lists[i][index - offsets[i]]
+
+    def _replaced(self, i, lists, keys, delta):
+        # new chunks with chunk i swapped for lists (0, 1 or 2 chunks)
+        new_maxes = [chunk[-1] for chunk in (lists if keys is None else keys)]
+        if self.keys is not None:
+            keys = self.keys[:i] + keys + self.keys[i + 1:]
+        return _Chunks(self.lists[:i] + lists + self.lists[i + 1:], keys,
+                       self.maxes[:i] + new_maxes + self.maxes[i + 1:], self.length + delta)
+
+    def added(self, value, key):
+        # chunks that also hold value, or None when it's already there
+        if self._find(value, key) is not None:
+            return None
+        if not self.lists:
+            keys = None if key is None else [[key(value)]]
+            return _Chunks([[value]], keys, [value if key is None else keys[0][0]], 1)
+        query = value if key is None else key(value)
+        # after any items that share its key, like a stable sort would
+        i = min(bisect_right(self.maxes, query), len(self.maxes) - 1)
+        chunk_keys = self.lists[i] if key is None else self.keys[i]
+        j = bisect_right(chunk_keys, query)
+        lists = [_inserted(self.lists[i], j, value)]
+        keys = None if key is None else [chunk_keys[:j] + [query] + chunk_keys[j:]]
+        if len(lists[0]) > 2 * _CHUNK_LOAD:
+            half = len(lists[0]) // 2
+            lists = [lists[0][:half], lists[0][half:]]
+            if keys is not None:
+                keys = [keys[0][:half], keys[0][half:]]
+        return self._replaced(i, lists, keys, 1)
+
+    def removed(self, value, key):
+        # chunks without value, or None when it isn't there
+        found = self._find(value, key)
+        if found is None:
+            return None
+        i, j = found
+        chunk = self.lists[i][:j] + self.lists[i][j + 1:]
+        lists = [chunk] if chunk else []
+        keys = None
+        if key is not None:
+            keys = [self.keys[i][:j] + self.keys[i][j + 1:]] if chunk else []
+        return self._replaced(i, lists, keys, -1)
+
 
 class SortedSet(Sequence, Set):
     """
     Only unique elements but ordered unlike a set
     """
-    def __init__(self, items=None):
+    # no per-instance __dict__: slices and set algebra results make lots
+    # of small SortedSets, and the dict would often outweigh the items
+    # _chunks: the storage with_added()/with_removed() work on, see below
+    # _runs: positions of the items in long runs of equal keys (_find)
+    __slots__ = ('_items', '_keys', '_key', '_hash_accumulator', '_chunks', '_runs')
+
+    def __init__(self, items=None, key=None, compact=True):
         # Note that sorted() always returns a list, this class acts like a set but
         # is essentially a class that creates a list-like object
-        self._items = sorted(set(items)) if items is not None else []
+        # >> self._items = sorted(set(items)) if items is not None else []
+
+        # key works like sorted(key=...). All the bisecting is done on
+        # _keys, which without a key function is simply the _items list
+        # itself, so the plain case pays nothing for this
+        # compact=False keeps a list even for all-int or all-float items
+        self._key = key
+        self._hash_accumulator = None
+        self._chunks = None
+        if key is None:
+            self._items = _sorted_unique(items) if items is not None else []
+            if compact:
+                self._items = _compact(self._items)
+            self._keys = self._items
+        else:
+            self._keys, self._items = _keyed_sorted_unique(
+                items if items is not None else (), key)
+
+    @classmethod
+    def from_sorted(cls, items, copy=True, key=None):
+        """
+        Build a SortedSet from items that are already in ascending order.
+        Duplicates are dropped in one linear pass, nothing is sorted.
+        With copy=False a list (or array) is adopted as it is, so it must also be
+        duplicate-free and must not be modified afterwards
+        """
+        if key is not None:
+            items = list(items)
+            keys, items = _keyed_unique(list(map(key, items)), items)
+            return cls._from_sorted(items, keys, key)
+        if not copy and isinstance(items, (list, array)):
+            return cls._from_sorted(items)
+        if not isinstance(items, list):
+            items = list(items)
+        return cls._from_sorted(_compact(_unique(items)))
+
+    @classmethod
+    def _from_sorted(cls, items, keys=None, key=None):
+        # the merge helpers already hand us a sorted, duplicate-free list
+        # so there's no point paying for set() and sorted() again in __init__
+        result = cls.__new__(cls)
+        result._items = items
+        result._keys = items if keys is None else keys
+        result._key = key
+        result._hash_accumulator = None
+        result._chunks = None
+        return result
+
+    @classmethod
+    def _from_chunks(cls, chunks, key=None):
+        # a set made by with_added()/with_removed(): _items and _keys are
+        # left unset until something asks for them (see __getattr__)
+        result = cls.__new__(cls)
+        result._chunks = chunks
+        result._key = key
+        result._hash_accumulator = None
+        return result
+
+    def __getattr__(self, name):
+        # only called for attributes that aren't set: _runs until the
+        # first long run is looked up, and _items and _keys of a set
+        # that so far only has its chunks.  Whatever needs the flat
+        # storage gets it put together once
+        if name == '_runs':
+            self._runs = {}
+            return self._runs
+        if name != '_items' and name != '_keys':
+            raise AttributeError("'{}' object has no attribute '{}'".format(type(self).__name__, name))
+        items, keys = self._chunks.flat()
+        self._items = items
+        self._keys = items if keys is None else keys
+        return self._items if name == '_items' else self._keys
+
+    def _unflattened(self):
+        # the chunks of a set that has nothing else yet, so that len(),
+        # in, index(), iteration and indexing can answer from them
+        # without flattening.  None once there is flat storage (it
+        # bisects faster).  The slot is read through its descriptor,
+        # self._items would go to __getattr__ and flatten
+        try:
+            _items_slot(self)
+        except AttributeError:
+            return self._chunks
+        return None
+
+    # the Set mixins build their results with cls(iterable), which
+    # would lose the key function, so build them with ours instead
+    def _from_iterable(self, iterable):
+        return type(self)(iterable, key=self._key)
+
+    def _find(self, item):
+        # position of item when there is a key function, or -1.
+        # Several items can share a key, so look through the whole run.
+        # A long run is scanned once to map its items to their positions,
+        # after that only unhashable items have to be looked for
+        key = self._key(item)
+        keys, items = self._keys, self._items
+        index = bisect_left(keys, key)
+        if index + _LONG_RUN < len(keys) and keys[index + _LONG_RUN] == key:
+            run = self._runs.get(index)
+            if run is None:
+                run = self._runs[index] = _run_positions(keys, items, index)
+            positions, complete = run
+            try:
+                found = positions.get(item)
+            except TypeError:
+                found = None
+                complete = False
+            if found is not None:
+                return found
+            if complete:
+                return -1
+        while index != len(keys) and keys[index] == key:
+            if items[index] == item:
+                return index
+            index += 1
+        return -1
 
     # container protocl "in"
     # without defining the iterable protocol
@@ -41,18 +841,25 @@ class SortedSet(Sequence, Set):
         # that found represents exactly the same result from __getitem__ (return item in self._items)
         #     found = (index != len(self._items) and (self._items[index] == value))
         # because of that, we replace the code in __contains__ to make it more efficient
+        if self._chunks is not None and self._unflattened() is not None:
+            return self._chunks._find(item, self._key) is not None
+        if self._key is not None:
+            return self._find(item) != -1
         index = bisect_left(self._items, item)
         return index != len(self._items) and self._items[index] == item
 
 
     # sized protocol
     def __len__(self):
-        return len(self._items)
+        chunks = self._chunks
+        return len(self._items) if chunks is None else chunks.length
 
     # iterable protocol
     # iterable = object where you can use iter() on
     def __iter__(self):
         # you can also use the generator form
+        if self._chunks is not None and self._unflattened() is not None:
+            return chain.from_iterable(self._chunks.lists)
         return iter(self._items)
 
     # sequence protol
@@ -63,27 +870,70 @@ class SortedSet(Sequence, Set):
     # seq.count(item)
     # concatenation with + and *
     def __getitem__(self, item):
-        result = self._items[item]
         # Tests for seeing what item is containing
         # when a slice is called on it, instead of an index
-        print(item)
-        property(type(item))
+        # >> print(item)
+        # >> property(type(item))
         # > would return things like
         # .slice(2, 4, None)
         # Fslice(10, 9329392392392329329, None)
         # <type slice>
+        # (commented out: a console write on every single access is
+        # far slower than the access itself)
 
         # It's logical that you'd wan't slice object to return
         # SortedSet object instead of generic lists
-        return SortedSet(result) if isinstance(item, slice) else result
+        # >> return SortedSet(result) if isinstance(item, slice) else result
+        if not isinstance(item, slice):
+            if self._chunks is not None and self._unflattened() is not None:
+                return self._chunks.item(item)
+            return self._items[item]
+        start, stop, step = item.indices(len(self._items))
+        if step == 1:
+            # an ordinary slice doesn't copy anything,
+            # it's a window onto our list (see SortedSetView below)
+            return SortedSetView(self, start, max(start, stop))
+        # a slice of a sorted list is still sorted (or reverse sorted
+        # for a negative step) so there's no need to sort it again
+        result = self._items[item]
+        keys = None if self._key is None else self._keys[item]
+        if step < 0:
+            result.reverse()
+            if keys is not None:
+                keys.reverse()
+        return self._from_sorted(result, keys, self._key)
 
     # The string rep of this class for debugging is basically garbage
     # so you'd have to implement this for more info
     def __repr__(self):
+        if self._key is not None:
+            return 'SortedSet({}key={!r})'.format(
+                repr(list(self._items)) + ', ' if self._items else '', self._key
+            )
         return 'SortedSet({})'.format(
-            repr(self._items) if self._items else ''
+            repr(list(self._items)) if self._items else ''
         )
 
+    def memory_usage(self):
+        """
+        Rough bytes used by this set: the object and its storage, plus
+        the element objects a list points to (an array holds the values
+        themselves). Small ints are shared by python, so for those the
+        element figure is an upper bound
+        """
+        items = self._items
+        container = getsizeof(self) + getsizeof(items)
+        if self._keys is not items:
+            container += getsizeof(self._keys)
+        if isinstance(items, array):
+            storage = 'array({!r})'.format(items.typecode)
+            elements = 0
+        else:
+            storage = 'list'
+            elements = sum(map(getsizeof, items))
+        return {'storage': storage, 'container': container,
+                'elements': elements, 'total': container + elements}
+
     # specialize == (eqaulity operator)
     # this is to ovverride the default setting that python
     # == is the same as 'is', i.e. identity test rather than content
@@ -108,12 +958,115 @@ class SortedSet(Sequence, Set):
             # that would return NotImplemented, causing that object to defer to its own __eq__
             # implementation instead of this one
             return NotImplemented
-        return self._items == other._items
+        if self is other:
+            return True
+        if self._hashes_differ(other):
+            return False
+        if self._key is None and other._key is None:
+            return self._same_items(other)
+        # with key functions, items sharing a key may be listed in either
+        # order, and the two sets might not even be ordered the same way
+        return (len(self) == len(other)
+                and all(item in other for item in self._items))
 
     def __ne__(self, other):
         if not isinstance(other, SortedSet):
             return NotImplemented
-        return self._items != other._items
+        if self._hashes_differ(other):
+            return True
+        if self._key is None and other._key is None:
+            return not self._same_items(other)
+        return not self == other
+
+    def _same_items(self, other):
+        # sets made from the same set by with_added()/with_removed()
+        # share most of their chunks, and a shared chunk is equal to
+        # itself without looking inside.  When both sets' chunks end at
+        # the same items, comparing chunk by chunk is enough
+        a, b = self._chunks, other._chunks
+        if a is not None and b is not None:
+            if a.length != b.length:
+                return False
+            if len(a.lists) == len(b.lists) and a.maxes == b.maxes:
+                return all(x is y or _items_equal(x, y) for x, y in zip(a.lists, b.lists))
+        return _items_equal(self._items, other._items)
+
+    # ======= pickling =======
+    # Items go over as they are stored (an array pickles as one block of
+    # bytes) and come back through _from_sorted(), so unpickling never
+    # sorts.  The cached hash is left behind: str and bytes hash
+    # differently in every process.
+
+    def __reduce__(self):
+        keys = None if self._key is None else self._keys
+        return type(self)._from_sorted, (self._items, keys, self._key)
+
+    # ======= hashing =======
+    # A SortedSet never changes, so it can be a dict key or a member of
+    # another set just like a frozenset.  The hash is worked out the
+    # first time somebody asks for it and then kept.
+    # It has to come out the same for equal sets whatever the order of
+    # their items (sets with different key functions can be equal), so
+    # it's an XOR of the scrambled item hashes, which also means
+    # with_added()/with_removed() can update it with a single XOR
+    # instead of rehashing everything.
+
+    def _hash_accumulated(self):
+        accumulator = self._hash_accumulator
+        if accumulator is None:
+            # (iter(self) rather than _items, which would flatten a set
+            # fresh from with_added())
+            accumulator = reduce(xor, map(_mix_hash, self), 0)
+            self._hash_accumulator = accumulator
+        return accumulator
+
+    def __hash__(self):
+        # (the length from the chunks, if there are any, so a set fresh
+        # from with_added() can be a dict key without being flattened)
+        length = len(self._items) if self._chunks is None else self._chunks.length
+        return hash((self._hash_accumulated(), length))
+
+    def _hashes_differ(self, other):
+        # equal sets always have equal hashes, so once both hashes are
+        # known, different ones settle == without looking at the items
+        mine, theirs = self._hash_accumulator, other._hash_accumulator
+        return mine is not None and theirs is not None and mine != theirs
+
+    # ======= persistent updates =======
+    # s.with_added(x) leaves s alone and returns a new set that also has
+    # x.  Both work on the chunks (see _Chunks): the first call cuts this
+    # set's storage into chunks once and keeps them, after that every
+    # update copies one chunk of at most 1024 items plus the list of
+    # chunks, whatever the size of the set, and all the sets derived
+    # from this one share the rest.  A cached hash is carried over.
+    # The new sets answer len(), in, index(), iteration and indexing
+    # from their chunks, only what needs one flat list (slices, set
+    # algebra, range queries) puts it together, once.
+
+    def _chunked(self):
+        chunks = self._chunks
+        if chunks is None:
+            chunks = _Chunks.from_flat(self._items, None if self._key is None else self._keys)
+            self._chunks = chunks
+        return chunks
+
+    def _derived(self, chunks, value):
+        result = self._from_chunks(chunks, self._key)
+        if self._hash_accumulator is not None:
+            try:
+                result._hash_accumulator = self._hash_accumulator ^ _mix_hash(value)
+            except TypeError:
+                # value isn't hashable, so neither is the new set
+                pass
+        return result
+
+    def with_added(self, value):
+        chunks = self._chunked().added(value, self._key)
+        return self if chunks is None else self._derived(chunks, value)
+
+    def with_removed(self, value):
+        chunks = self._chunked().removed(value, self._key)
+        return self if chunks is None else self._derived(chunks, value)
 
     # REVERSED PROTOCOL =======
 
@@ -157,7 +1110,10 @@ class SortedSet(Sequence, Set):
         # >> represents the original less efficient code
 
         # this uses the enchanced __getitem__
-        return int(value in self._items)
+        # >> return int(value in self._items)
+        # careful: `in self._items` is the *list's* __contains__, a linear
+        # scan, `in self` is our bisecting one
+        return int(value in self)
 
     # VID 14: notice that:
     # that found represents exactly the same result from __getitem__
@@ -169,11 +1125,184 @@ class SortedSet(Sequence, Set):
 
     # Vid 14
     def index(self, value, start=0, stop=None):
+        if self._chunks is not None and self._unflattened() is not None:
+            index = self._chunks.position(value, self._key)
+            if index != -1:
+                return index
+            raise ValueError('{} not found'.format(repr(value)))
+        if self._key is not None:
+            index = self._find(value)
+            if index != -1:
+                return index
+            raise ValueError('{} not found'.format(repr(value)))
         index = bisect_left(self._items, value)
         if index != len(self._items) and (self._items[index] == value):
             return index
         raise ValueError('{} not found'.format(repr(value)))
 
+    # ======= batch lookups =======
+    # Testing thousands of values one `in` at a time means thousands of
+    # method calls, each bisecting the whole list from scratch.
+    # Sorting the batch first lets us walk it through the set in one
+    # pass, galloping forward from wherever the previous value landed.
+
+    def _positions(self, values):
+        values = list(values)
+        key = self._key
+        queries = values if key is None else list(map(key, values))
+        keys, items = self._keys, self._items
+        n = len(keys)
+        positions = [-1] * len(values)
+        index = 0
+        for i in sorted(range(len(values)), key=queries.__getitem__):
+            query = queries[i]
+            index = _gallop(keys, query, index)
+            if index == n:
+                break
+            if key is None:
+                if keys[index] == query:
+                    positions[i] = index
+                continue
+            # several items can share a key, look through the whole run
+            value = values[i]
+            j = index
+            while j != n and keys[j] == query:
+                if items[j] == value:
+                    positions[i] = j
+                    break
+                j += 1
+        return positions
+
+    def contains_many(self, values):
+        # [value in self for value in values], in the same order
+        return [position != -1 for position in self._positions(values)]
+
+    def index_many(self, values):
+        # like index() for every value, but -1 (as in str.find)
+        # instead of a ValueError for the ones that are missing
+        return self._positions(values)
+
+    # ======= range queries =======
+    # index() only helps when both ends of the range are in the set,
+    # bisect tells us where a value *would* go, present or not, so two
+    # bisects give us the ends of any value range in O(log n)
+
+    # with a key function these take values and look up their keys,
+    # the *_key variants take keys directly (e.g. a timestamp rather
+    # than a whole record)
+
+    def bisect_left(self, value):
+        # position of the first item >= value
+        return bisect_left(self._keys, value if self._key is None else self._key(value))
+
+    def bisect_right(self, value):
+        # position of the first item > value
+        return bisect_right(self._keys, value if self._key is None else self._key(value))
+
+    def bisect_key_left(self, key):
+        return bisect_left(self._keys, key)
+
+    def bisect_key_right(self, key):
+        return bisect_right(self._keys, key)
+
+    def _range_positions(self, minimum, maximum, inclusive):
+        # minimum and maximum are keys here,
+        # None on either side means "unbounded"
+        low_inclusive, high_inclusive = inclusive
+        items = self._keys
+        if minimum is None:
+            start = 0
+        elif low_inclusive:
+            start = bisect_left(items, minimum)
+        else:
+            start = bisect_right(items, minimum)
+        if maximum is None:
+            stop = len(items)
+        elif high_inclusive:
+            stop = bisect_right(items, maximum)
+        else:
+            stop = bisect_left(items, maximum)
+        return start, max(start, stop)
+
+    def _value_keys(self, minimum, maximum):
+        key = self._key
+        if key is None:
+            return minimum, maximum
+        return (None if minimum is None else key(minimum),
+                None if maximum is None else key(maximum))
+
+    def irange(self, minimum=None, maximum=None, inclusive=(True, True), reverse=False):
+        minimum, maximum = self._value_keys(minimum, maximum)
+        return self.irange_key(minimum, maximum, inclusive, reverse)
+
+    def irange_key(self, minimum=None, maximum=None, inclusive=(True, True), reverse=False):
+        # lazy: nothing is copied, items are fetched by position as we go
+        start, stop = self._range_positions(minimum, maximum, inclusive)
+        positions = range(stop - 1, start - 1, -1) if reverse else range(start, stop)
+        return map(self._items.__getitem__, positions)
+
+    def count_range(self, minimum=None, maximum=None, inclusive=(True, True)):
+        # just the distance between the two bisects, no iteration at all
+        minimum, maximum = self._value_keys(minimum, maximum)
+        start, stop = self._range_positions(minimum, maximum, inclusive)
+        return stop - start
+
+    # ======= order statistics and neighbours =======
+    # index() raises for anything that isn't in the set, but the
+    # position a value *would* have is just a bisect away, and the
+    # neighbours of that position are the closest items on either side.
+    # The neighbour lookups return None when there is no such item
+
+    def rank(self, value):
+        # how many items are smaller than value, present or not
+        return self.bisect_left(value)
+
+    def floor(self, value):
+        # largest item <= value
+        index = self.bisect_right(value)
+        return self._items[index - 1] if index else None
+
+    def ceiling(self, value):
+        # smallest item >= value
+        index = self.bisect_left(value)
+        return self._items[index] if index != len(self._items) else None
+
+    def lower(self, value):
+        # largest item < value
+        index = self.bisect_left(value)
+        return self._items[index - 1] if index else None
+
+    def higher(self, value):
+        # smallest item > value
+        index = self.bisect_right(value)
+        return self._items[index] if index != len(self._items) else None
+
+    def nearest(self, value):
+        # the item closest to value (needs items, or keys, that
+        # support subtraction), ties go to the smaller item
+        keys = self._keys
+        if not keys:
+            return None
+        target = value if self._key is None else self._key(value)
+        index = bisect_left(keys, target)
+        if index == len(keys):
+            return self._items[-1]
+        if index == 0:
+            return self._items[0]
+        below, above = keys[index - 1], keys[index]
+        if abs(target - below) <= abs(above - target):
+            index -= 1
+        return self._items[index]
+
+    def percentile(self, p):
+        # nearest-rank percentile: the smallest item with at least
+        # p percent of the set at or below it (p from 0 to 100)
+        if not 0 <= p <= 100:
+            raise ValueError('percentile must be between 0 and 100, not {!r}'.format(p))
+        if not self._items:
+            raise ValueError('percentile of an empty SortedSet')
+        return self._items[max(0, ceil(p * len(self._items) / 100) - 1)]
+
     # Vid 15
     # No need for this because https://docs.python.org/3.4/library/collections.abc.html
     # >>>> def __reversed__(self):
@@ -186,11 +1315,14 @@ class SortedSet(Sequence, Set):
     # VID 16: concatenation and repitition
     def __add__(self, other):
         # prefer lazy evaluation to simply concatenating them
-        return SortedSet(chain(self._items, other._items))
+        # >> return SortedSet(chain(self._items, other._items))
+        # concatenating two sorted sets is just their union, and the merge
+        # doesn't have to sort anything
+        return self | other
 
     # repitition (number at left)
     def __mul__(self, other):
-        return self if other > 0 else SortedSet()
+        return self if other > 0 else self._from_iterable(())
 
     # reversed multiplication (number at right)\
     def __rmul__(self, other):
@@ -224,30 +1356,743 @@ class SortedSet(Sequence, Set):
     # the same as above: infix = same types only
     # last mixin method: isdisjoint() - tests whether they have nothing in common?
 
+    # The mixin versions of these work on any Set, but they're O(n log n)
+    # for us (see the MERGE HELPERS at the top of the module).  When both
+    # sides are SortedSets we merge the two lists instead, anything else
+    # still goes through the generic mixin.
+    # With key functions both sides have to use the very same function
+    # object, otherwise they aren't in the same order
+    def _can_merge(self, other):
+        return (isinstance(other, (SortedSet, SortedSetView))
+                and other._key is self._key)
+
+    def _span(self):
+        # (keys, items, start, stop) of the range the merge helpers should use
+        return self._keys, self._items, 0, len(self._items)
+
+    def _merge(self, other, merge, keep_a, keep_b, keep_both):
+        a_keys, a_items, a_lo, a_hi = self._span()
+        b_keys, b_items, b_lo, b_hi = other._span()
+        if self._key is None:
+            items = merge(a_items, b_items, a_lo, a_hi, b_lo, b_hi)
+            return self._from_sorted(_merged_storage(items, a_items, b_items))
+        keys, items = _keyed_merge(a_keys, a_items, b_keys, b_items,
+                                   keep_a, keep_b, keep_both, a_lo, a_hi, b_lo, b_hi)
+        return self._from_sorted(items, keys, self._key)
+
+    def __and__(self, other):
+        if not self._can_merge(other):
+            return Set.__and__(self, other)
+        return self._merge(other, _intersection, False, False, True)
+
+    def __or__(self, other):
+        if not self._can_merge(other):
+            return Set.__or__(self, other)
+        return self._merge(other, _union, True, True, True)
+
+    def __xor__(self, other):
+        if not self._can_merge(other):
+            return Set.__xor__(self, other)
+        return self._merge(other, _symmetric_difference, True, True, False)
+
+    def __sub__(self, other):
+        if not self._can_merge(other):
+            return Set.__sub__(self, other)
+        return self._merge(other, _difference, True, False, False)
+
+    # ======= subset, superset, disjoint =======
+    # The mixin <= looks every one of our items up in the other set, and
+    # issubset() used to build a whole SortedSet of its argument first.
+    # Between two sorted sets the lengths and the two ends often settle
+    # it straight away, and otherwise one walk through both (galloping
+    # through the bigger one) stops at the first item that's missing.
+    # Sets with key functions still go through the mixins
+
+    def _can_walk(self, other):
+        return self._key is None and self._can_merge(other)
+
+    def _subset_of(self, other):
+        _, a, a_lo, a_hi = self._span()
+        _, b, b_lo, b_hi = other._span()
+        if a_hi - a_lo > b_hi - b_lo:
+            return False
+        if a_lo == a_hi:
+            return True
+        # our smallest or biggest item is outside their range
+        if a[a_lo] < b[b_lo] or b[b_hi - 1] < a[a_hi - 1]:
+            return False
+        j = b_lo
+        for x in _iter_range(a, a_lo, a_hi):
+            j = _gallop(b, x, j, b_hi)
+            if j == b_hi or b[j] != x:
+                return False
+            j += 1
+        return True
+
+    def _disjoint_from(self, other):
+        _, a, a_lo, a_hi = self._span()
+        _, b, b_lo, b_hi = other._span()
+        if a_lo == a_hi or b_lo == b_hi or a[a_hi - 1] < b[b_lo] or b[b_hi - 1] < a[a_lo]:
+            return True
+        if a_hi - a_lo > b_hi - b_lo:
+            a, a_lo, a_hi, b, b_lo, b_hi = b, b_lo, b_hi, a, a_lo, a_hi
+        j = b_lo
+        for x in _iter_range(a, a_lo, a_hi):
+            j = _gallop(b, x, j, b_hi)
+            if j == b_hi:
+                return True
+            if b[j] == x:
+                return False
+        return True
+
+    def __le__(self, other):
+        if self._can_walk(other):
+            return self._subset_of(other)
+        return Set.__le__(self, other)
+
+    def __lt__(self, other):
+        if self._can_walk(other):
+            return len(self) < len(other) and self._subset_of(other)
+        return Set.__lt__(self, other)
+
+    def __ge__(self, other):
+        if self._can_walk(other):
+            return other._subset_of(self)
+        return Set.__ge__(self, other)
+
+    def __gt__(self, other):
+        if self._can_walk(other):
+            return len(self) > len(other) and other._subset_of(self)
+        return Set.__gt__(self, other)
+
+    def _matches(self, iterable):
+        # for every value of iterable in turn: is it one of our items?
+        # A cursor gallops forward from the last value's position, so a
+        # sorted iterable costs one walk through our items, and when a
+        # value is smaller than the one before the cursor starts over
+        _, items, lo, hi = self._span()
+        j, previous = lo, _END
+        for x in iterable:
+            if previous is not _END and x < previous:
+                j = lo
+            j = _gallop(items, x, j, hi)
+            yield j != hi and items[j] == x
+            previous = x
+
+    def isdisjoint(self, other):
+        if self._can_walk(other):
+            return self._disjoint_from(other)
+        if self._key is not None:
+            return Set.isdisjoint(self, other)
+        return not any(self._matches(other))
+
     # ======== once you import from Set, fails go from 26 to 10
     # the failing methods are the named methods
 
+    # (_from_iterable rather than SortedSet() so the key function carries over)
+
     def issubset(self, iterable):
-        # <= is implemented by the inherited Set
-        return self <= SortedSet(iterable)
+        if self._can_walk(iterable):
+            return self._subset_of(iterable)
+        if self._key is not None:
+            # <= is implemented by the inherited Set
+            return self <= self._from_iterable(iterable)
+        # Walk our items alongside the iterable, assuming it's sorted.
+        # Until it turns out to be, an item it skipped over (it went
+        # past the item without producing it) is only *probably*
+        # missing, so those are noted and the walk carries on
+        _, items, i, hi = self._span()
+        skipped = []
+        iterator = iter(iterable)
+        previous = _END
+        for y in iterator:
+            if previous is not _END and y < previous:
+                # not sorted after all: whatever is still unmatched has
+                # to turn up in the rest of it
+                rest = self._from_iterable(chain((y,), iterator))
+                return all(items[k] in rest for k in chain(skipped, range(i, hi)))
+            while i != hi and items[i] < y:
+                skipped.append(i)
+                i += 1
+            if i != hi and items[i] == y:
+                i += 1
+            if i == hi and not skipped:
+                return True
+            previous = y
+        return not skipped and i == hi
 
     def issuperset(self, iterable):
-        return self >= SortedSet(iterable)
+        if self._can_walk(iterable):
+            return iterable._subset_of(self)
+        if self._key is not None:
+            return self >= self._from_iterable(iterable)
+        # no need for a set of the iterable, every value just has to be ours
+        return all(self._matches(iterable))
 
     def intersection(self, iterable):
-        return self & SortedSet(iterable)
+        return self & self._from_iterable(iterable)
 
     def union(self, iterable):
-        return self | SortedSet(iterable)
+        return self | self._from_iterable(iterable)
 
     def symmetric_difference(self, iterable):
-        return self ^ SortedSet(iterable)
+        return self ^ self._from_iterable(iterable)
 
     def difference(self, iterable):
-        return self - SortedSet(iterable)
+        return self - self._from_iterable(iterable)
+
+    # ======= many sets at once =======
+    # a | b | c | ... builds a whole intermediate set for every |, so
+    # combining n sets copies the growing result n - 1 times.
+    # These take all the sets in one call instead:
+    #     SortedSet.union_all(a, b, c, ...)
+    #     SortedSet.intersection_all(a, b, c, ...)
+    # Anything that isn't a SortedSet (or a view of one) is turned into one first
+
+    @classmethod
+    def _operands(cls, sets):
+        sets = [s if isinstance(s, (SortedSet, SortedSetView)) else cls(s) for s in sets]
+        # the merge helpers compare items, so only plain sets can use them
+        plain = all(s._key is None for s in sets)
+        return sets, plain
+
+    @classmethod
+    def union_all(cls, *sets):
+        sets, plain = cls._operands(sets)
+        if not sets:
+            return cls()
+        if len(sets) == 1:
+            return _standalone(sets[0])
+        if len(sets) == 2 or not plain:
+            return reduce(or_, sets)
+        # one k-way merge of all the sets through a heap, then a single
+        # pass to drop the items that were in more than one of them
+        spans = [s._span() for s in sets]
+        items = _unique(list(merge(*(_iter_range(items, lo, hi)
+                                     for _, items, lo, hi in spans))))
+        typecodes = {getattr(items, 'typecode', None) for _, items, _, _ in spans}
+        if len(typecodes) == 1 and None not in typecodes:
+            # all arrays of the same type, so the result fits one too
+            items = array(typecodes.pop(), items)
+        return cls._from_sorted(items)
+
+    @classmethod
+    def intersection_all(cls, *sets):
+        sets, plain = cls._operands(sets)
+        if not sets:
+            raise TypeError('intersection_all() needs at least one set')
+        # smallest first: the result can't be bigger than the smallest
+        # set, and every later step only has to look up that many items
+        sets.sort(key=len)
+        if len(sets) == 1:
+            return _standalone(sets[0])
+        if not plain:
+            result = sets[0]
+            for s in sets[1:]:
+                if not result:
+                    break
+                result = result & s
+            return _standalone(result)
+        _, first, lo, hi = sets[0]._span()
+        items = first[lo:hi]
+        for s in sets[1:]:
+            if not items:
+                # nothing left, the remaining sets can't add anything back
+                break
+            # _intersection gallops through the (bigger) set
+            _, other, other_lo, other_hi = s._span()
+            items = _intersection(items, other, 0, len(items), other_lo, other_hi)
+        if type(first) is array and type(items) is not array:
+            # a subset of an array's items fits in the same kind of array
+            items = array(first.typecode, items)
+        return cls._from_sorted(items)
+
+
+def _standalone(s):
+    # a SortedSet can be handed back as it is, it never changes,
+    # but a view would keep its (possibly much bigger) parent alive
+    return s.copy() if isinstance(s, SortedSetView) else s
+
 
 # End of Vid 17: Notice that we've constructed an immutable set
 
 # ======= VIDEO 18 IMPORTANT ====
 # If we need a mutable set, inherit from MutableSet instead
 # then you'd have to implement add() and discard()
+
+
+# reads the _items slot without going through __getattr__
+_items_slot = SortedSet._items.__get__
+
+
+class SortedSetView(Sequence, Set):
+    """
+    Read-only window onto a range of positions of a SortedSet
+    """
+    # s[i:j] used to copy the range and then sort the copy all over
+    # again.  A SortedSet never changes, so a slice can simply remember
+    # its parent and where the range starts and stops: O(1) to create
+    # however big the slice is.  copy() makes an independent SortedSet
+    # when one is really needed (e.g. to let go of a huge parent)
+
+    __slots__ = ('_parent', '_start', '_stop')
+
+    def __init__(self, parent, start, stop):
+        self._parent = parent
+        self._start = start
+        self._stop = stop
+
+    @property
+    def _key(self):
+        return self._parent._key
+
+    def _span(self):
+        parent = self._parent
+        return parent._keys, parent._items, self._start, self._stop
+
+    # results of set algebra (and of slices with a step) are new sets
+    def _from_sorted(self, items, keys=None, key=None):
+        return type(self._parent)._from_sorted(items, keys, key)
+
+    def _from_iterable(self, iterable):
+        return type(self._parent)(iterable, key=self._key)
+
+    def copy(self):
+        parent = self._parent
+        items = parent._items[self._start:self._stop]
+        keys = None if parent._key is None else parent._keys[self._start:self._stop]
+        return self._from_sorted(items, keys, parent._key)
+
+    def __reduce__(self):
+        # just our range, not the whole parent
+        return self.copy().__reduce__()
+
+    def _find(self, item):
+        # position of item in the parent, or -1
+        parent = self._parent
+        if parent._key is not None:
+            index = parent._find(item)
+            return index if self._start <= index < self._stop else -1
+        keys, items = parent._keys, parent._items
+        key = item if parent._key is None else parent._key(item)
+        index = bisect_left(keys, key, self._start, self._stop)
+        while index != self._stop and keys[index] == key:
+            if items[index] == item:
+                return index
+            index += 1
+        return -1
+
+    def __contains__(self, item):
+        return self._find(item) != -1
+
+    def __len__(self):
+        return self._stop - self._start
+
+    def __iter__(self):
+        return _iter_range(self._parent._items, self._start, self._stop)
+
+    def __reversed__(self):
+        return map(self._parent._items.__getitem__,
+                   range(self._stop - 1, self._start - 1, -1))
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            start, stop, step = item.indices(len(self))
+            if step == 1:
+                # a view of a view is just a narrower view of the parent
+                return SortedSetView(self._parent, self._start + start,
+                                     self._start + max(start, stop))
+            parent = self._parent
+            positions = range(self._start, self._stop)[item]
+            if step < 0:
+                positions = positions[::-1]
+            items = [parent._items[p] for p in positions]
+            keys = None if parent._key is None else [parent._keys[p] for p in positions]
+            return self._from_sorted(items, keys, parent._key)
+        if item < 0:
+            item += len(self)
+        if not 0 <= item < len(self):
+            raise IndexError('SortedSetView index out of range')
+        return self._parent._items[self._start + item]
+
+    def __repr__(self):
+        return 'SortedSetView({})'.format(repr(list(self)) if len(self) else '')
+
+    def __eq__(self, other):
+        if not isinstance(other, (SortedSet, SortedSetView)):
+            return NotImplemented
+        if len(self) != len(other):
+            return False
+        if self._key is None and other._key is None:
+            return all(map(eq, self, other))
+        return all(item in other for item in self)
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    def count(self, value):
+        return int(value in self)
+
+    def index(self, value, start=0, stop=None):
+        index = self._find(value)
+        if index == -1:
+            raise ValueError('{} not found'.format(repr(value)))
+        return index - self._start
+
+    # SortedSet's operators only ever look at their operands through
+    # _span(), _key and _from_sorted(), so a view can share them as-is
+    _can_merge = SortedSet._can_merge
+    _merge = SortedSet._merge
+    __and__ = SortedSet.__and__
+    __or__ = SortedSet.__or__
+    __xor__ = SortedSet.__xor__
+    __sub__ = SortedSet.__sub__
+    __add__ = SortedSet.__add__
+    __mul__ = SortedSet.__mul__
+    __rmul__ = SortedSet.__rmul__
+    _can_walk = SortedSet._can_walk
+    _subset_of = SortedSet._subset_of
+    _disjoint_from = SortedSet._disjoint_from
+    _matches = SortedSet._matches
+    __le__ = SortedSet.__le__
+    __lt__ = SortedSet.__lt__
+    __ge__ = SortedSet.__ge__
+    __gt__ = SortedSet.__gt__
+    isdisjoint = SortedSet.isdisjoint
+    issubset = SortedSet.issubset
+    issuperset = SortedSet.issuperset
+    intersection = SortedSet.intersection
+    union = SortedSet.union
+    symmetric_difference = SortedSet.symmetric_difference
+    difference = SortedSet.difference
+
+
+class MutableSortedSet(Sequence, MutableSet):
+    """
+    Mutable sibling of SortedSet: add(), discard(), pop() and update()
+    """
+    # Keeping everything in one flat sorted list (like SortedSet does)
+    # would make add() and discard() O(n) because list.insert and del
+    # have to shift everything after the insertion point.
+    # Instead the items live in a list of small sorted lists ("chunks")
+    # with a second list holding the max of every chunk:
+    #
+    #   _lists = [[1, 4, 9], [13, 15, 20], [22, 30]]
+    #   _maxes = [9, 20, 30]
+    #
+    # bisect on _maxes finds the chunk, bisect on the chunk finds the
+    # position, and an insert only ever shifts one short chunk.
+    # Chunks are split when they grow past 2 * load and merged with a
+    # neighbour when they shrink below load / 2.
+
+    __slots__ = ('_lists', '_maxes', '_len', '_index', '_load')
+
+    def __init__(self, items=None, load=1000):
+        self._load = load
+        self._reset(_sorted_unique(items) if items is not None else [])
+
+    @classmethod
+    def _from_sorted(cls, items, load=1000):
+        result = cls.__new__(cls)
+        result._load = load
+        result._reset(items)
+        return result
+
+    def _reset(self, items):
+        # items must already be sorted and unique. The chunks are always
+        # lists, an array (from a compact SortedSet) would refuse a float
+        if not isinstance(items, list):
+            items = list(items)
+        load = self._load
+        self._lists = [items[i:i + load] for i in range(0, len(items), load)]
+        self._maxes = [chunk[-1] for chunk in self._lists]
+        self._len = len(items)
+        # positional index over the chunk lengths, built lazily (see _locate)
+        self._index = None
+
+    def _flat(self):
+        return list(chain.from_iterable(self._lists))
+
+    # ======= positional index =======
+    # To find the i-th item we need to know how many items live in the
+    # chunks before it.  Summing the chunk lengths each time would be
+    # O(n / load), so we keep them in a Fenwick (binary indexed) tree
+    # which gives prefix sums and updates in O(log(number of chunks)).
+    # Splitting or merging chunks shifts every entry, so in that case we
+    # just throw the tree away and rebuild it the next time it's needed.
+
+    def _build_index(self):
+        tree = [0]
+        tree.extend(len(chunk) for chunk in self._lists)
+        size = len(tree)
+        for i in range(1, size):
+            parent = i + (i & -i)
+            if parent < size:
+                tree[parent] += tree[i]
+        self._index = tree
+
+    def _update_index(self, i, delta):
+        tree = self._index
+        if tree is None:
+            return
+        i += 1
+        size = len(tree)
+        while i < size:
+            tree[i] += delta
+            i += i & -i
+
+    def _locate(self, position):
+        # position (0 <= position < len) -> (chunk number, offset in chunk)
+        if self._index is None:
+            self._build_index()
+        tree = self._index
+        size = len(tree)
+        i = 0
+        bit = 1 << (size.bit_length() - 1)
+        while bit:
+            j = i + bit
+            if j < size and tree[j] <= position:
+                i = j
+                position -= tree[j]
+            bit >>= 1
+        return i, position
+
+    def _position(self, i, offset):
+        # (chunk number, offset in chunk) -> position
+        if self._index is None:
+            self._build_index()
+        tree = self._index
+        while i > 0:
+            offset += tree[i]
+            i -= i & -i
+        return offset
+
+    # ======= chunk maintenance =======
+
+    def _split(self, i):
+        chunk = self._lists[i]
+        half = chunk[self._load:]
+        del chunk[self._load:]
+        self._lists.insert(i + 1, half)
+        self._maxes[i] = chunk[-1]
+        self._maxes.insert(i + 1, half[-1])
+        self._index = None
+
+    def _delete(self, i, offset):
+        lists = self._lists
+        chunk = lists[i]
+        value = chunk.pop(offset)
+        self._len -= 1
+        if not chunk:
+            del lists[i]
+            del self._maxes[i]
+            self._index = None
+        elif len(chunk) < self._load // 2 and len(lists) > 1:
+            # merge with the previous chunk (or the next one for chunk 0)
+            i = i - 1 if i else 0
+            lists[i].extend(lists[i + 1])
+            del lists[i + 1]
+            del self._maxes[i + 1]
+            self._maxes[i] = lists[i][-1]
+            self._index = None
+            if len(lists[i]) > 2 * self._load:
+                self._split(i)
+        else:
+            self._maxes[i] = chunk[-1]
+            self._update_index(i, -1)
+        return value
+
+    # ======= the protocols =======
+
+    def __contains__(self, item):
+        maxes = self._maxes
+        i = bisect_left(maxes, item)
+        if i == len(maxes):
+            return False
+        chunk = self._lists[i]
+        return chunk[bisect_left(chunk, item)] == item
+
+    def __len__(self):
+        return self._len
+
+    def __iter__(self):
+        return chain.from_iterable(self._lists)
+
+    def __reversed__(self):
+        return chain.from_iterable(reversed(chunk) for chunk in reversed(self._lists))
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            start, stop, step = item.indices(self._len)
+            if step == 1:
+                result = []
+                if start < stop:
+                    i, offset = self._locate(start)
+                    remaining = stop - start
+                    while remaining:
+                        part = self._lists[i][offset:offset + remaining]
+                        result += part
+                        remaining -= len(part)
+                        i += 1
+                        offset = 0
+            else:
+                result = self._flat()[item]
+                if step < 0:
+                    result.reverse()
+            return self._from_sorted(result, self._load)
+        if item < 0:
+            item += self._len
+        if not 0 <= item < self._len:
+            raise IndexError('MutableSortedSet index out of range')
+        # the ends are by far the most common positions so skip the tree
+        first = self._lists[0]
+        if item < len(first):
+            return first[item]
+        last = self._lists[-1]
+        if item >= self._len - len(last):
+            return last[item - self._len]
+        i, offset = self._locate(item)
+        return self._lists[i][offset]
+
+    def __repr__(self):
+        return 'MutableSortedSet({})'.format(
+            repr(self._flat()) if self._len else ''
+        )
+
+    def __eq__(self, other):
+        if not isinstance(other, (SortedSet, SortedSetView, MutableSortedSet)):
+            return NotImplemented
+        items = _sorted_operand(other)
+        if items is None:
+            return Set.__eq__(self, other)
+        return len(self) == len(other) and _items_equal(self._flat(), items)
+
+    def __ne__(self, other):
+        if not isinstance(other, (SortedSet, SortedSetView, MutableSortedSet)):
+            return NotImplemented
+        return not self == other
+
+    def count(self, value):
+        return int(value in self)
+
+    def index(self, value, start=0, stop=None):
+        maxes = self._maxes
+        i = bisect_left(maxes, value)
+        if i != len(maxes):
+            chunk = self._lists[i]
+            offset = bisect_left(chunk, value)
+            if chunk[offset] == value:
+                return self._position(i, offset)
+        raise ValueError('{} not found'.format(repr(value)))
+
+    # ======= MutableSet =======
+    # the only abstract methods are add() and discard(),
+    # remove(), clear(), |=, &=, ^= and -= then come from the mixins
+
+    def add(self, value):
+        maxes = self._maxes
+        lists = self._lists
+        if not maxes:
+            lists.append([value])
+            maxes.append(value)
+            self._len = 1
+            self._index = None
+            return
+        i = bisect_left(maxes, value)
+        if i == len(maxes):
+            # bigger than everything: append to the last chunk
+            i -= 1
+            chunk = lists[i]
+            chunk.append(value)
+            maxes[i] = value
+        else:
+            chunk = lists[i]
+            offset = bisect_left(chunk, value)
+            if chunk[offset] == value:
+                return
+            chunk.insert(offset, value)
+        self._len += 1
+        if len(chunk) > 2 * self._load:
+            self._split(i)
+        else:
+            self._update_index(i, 1)
+
+    def discard(self, value):
+        maxes = self._maxes
+        i = bisect_left(maxes, value)
+        if i == len(maxes):
+            return
+        chunk = self._lists[i]
+        offset = bisect_left(chunk, value)
+        if chunk[offset] == value:
+            self._delete(i, offset)
+
+    # note that MutableSet.pop() removes an arbitrary element,
+    # ours behaves like list.pop() and takes a position
+    def pop(self, index=-1):
+        if not self._len:
+            raise IndexError('pop from empty MutableSortedSet')
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError('pop index out of range')
+        if index == self._len - 1:
+            i = len(self._lists) - 1
+            return self._delete(i, len(self._lists[i]) - 1)
+        i, offset = self._locate(index)
+        return self._delete(i, offset)
+
+    def clear(self):
+        self._reset([])
+
+    def update(self, *iterables):
+        values = [value for iterable in iterables for value in iterable]
+        # a handful of values: add them one by one,
+        # a big batch: sort it once and merge it in with a single pass
+        if len(values) * 8 < self._len:
+            for value in values:
+                self.add(value)
+        else:
+            self._reset(_union(self._flat(), _sorted_unique(values)))
+
+    # ======= set algebra =======
+    # same idea as in SortedSet: merge the sorted contents when both sides
+    # are sorted sets, otherwise let the mixins deal with it
+
+    def __and__(self, other):
+        items = _sorted_operand(other)
+        if items is None:
+            return MutableSet.__and__(self, other)
+        return self._from_sorted(_intersection(self._flat(), items), self._load)
+
+    def __or__(self, other):
+        items = _sorted_operand(other)
+        if items is None:
+            return MutableSet.__or__(self, other)
+        return self._from_sorted(_union(self._flat(), items), self._load)
+
+    def __xor__(self, other):
+        items = _sorted_operand(other)
+        if items is None:
+            return MutableSet.__xor__(self, other)
+        return self._from_sorted(_symmetric_difference(self._flat(), items), self._load)
+
+    def __sub__(self, other):
+        items = _sorted_operand(other)
+        if items is None:
+            return MutableSet.__sub__(self, other)
+        return self._from_sorted(_difference(self._flat(), items), self._load)
+
+
+def _sorted_operand(s):
+    # the sorted list behind either flavour of sorted set, or None when
+    # s isn't in natural order (not a sorted set, or one with a key function)
+    if isinstance(s, MutableSortedSet):
+        return s._flat()
+    if isinstance(s, SortedSet) and s._key is None:
+        return s._items
+    if isinstance(s, SortedSetView) and s._key is None:
+        _, items, start, stop = s._span()
+        return items[start:stop]
+    return None
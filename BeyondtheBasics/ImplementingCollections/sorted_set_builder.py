@@ -0,0 +1,203 @@
+import os
+import pickle
+import tempfile
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, compress, islice
+from operator import ne
+
+from mapped_sorted_set import MappedSortedSet, save
+from sorted_set import SortedSet, _compact, _sorted_unique, _unique, iter_union
+
+"""
+Building a SortedSet bigger than memory
+
+SortedSet(items) needs the whole input in memory at once, then a sorted
+copy of it, then the stored set: about three times the data at the peak.
+An external merge sort never holds more than one chunk:
+
+    1. read chunk_size items, sort them and drop the duplicates
+    2. spill that run to a temporary file, repeat until the input ends
+    3. k-way merge the runs (heapq.merge reads them back a block at a
+       time), dropping the duplicates that were in different runs
+
+    s = build_sorted_set(huge_iterable, chunk_size=1000000)
+    s = build_sorted_set(huge_iterable, path='big.sset')   # a MappedSortedSet
+
+chunk_size is the knob for memory: at most chunk_size items (plus one
+block per run while merging) are in memory at any time, unless the
+result itself is an in-memory SortedSet.  Each chunk is sorted in
+place and spilled before the next one is read.  Input that fits in a
+single chunk never touches the disk.
+
+build_parallel() is for the other problem, a big input that does fit
+in memory but takes ages to sort on one core.
+"""
+
+CHUNK_SIZE = 1000000
+
+# items per pickle.dump() in a spilled run, and so the read-back block
+_SPILL_BLOCK = 4096
+
+# merging more runs than this at once would mean as many open files,
+# so they are merged in rounds
+FAN_IN = 64
+
+_END = object()
+
+
+def _chunks(iterator, chunk_size):
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+        # let go of it before the next one is read
+        del chunk
+
+
+def _sorted_run(chunk):
+    # chunk sorted in place, its duplicates dropped on the way out
+    # (like sorted_set._unique, but without building a second list)
+    chunk.sort()
+    return compress(chunk, map(ne, chunk, chain((object(),), chunk)))
+
+
+def _spill(items, directory):
+    # write a sorted run out to a new file in directory, return its path
+    fd, path = tempfile.mkstemp(suffix='.run', dir=directory)
+    with open(fd, 'wb') as run:
+        block = []
+        for item in items:
+            block.append(item)
+            if len(block) == _SPILL_BLOCK:
+                pickle.dump(block, run, pickle.HIGHEST_PROTOCOL)
+                block = []
+        if block:
+            pickle.dump(block, run, pickle.HIGHEST_PROTOCOL)
+    return path
+
+
+def _read(path):
+    # a run is only open while it's being merged
+    with open(path, 'rb') as run:
+        while True:
+            try:
+                block = pickle.load(run)
+            except EOFError:
+                return
+            yield from block
+
+
+def _merged(runs, directory, fan_in):
+    # merge in rounds of fan_in runs until they can all be merged at once
+    while len(runs) > fan_in:
+        merged = []
+        for i in range(0, len(runs), fan_in):
+            group = runs[i:i + fan_in]
+            merged.append(_spill(iter_union(*map(_read, group)), directory))
+            for path in group:
+                os.remove(path)
+        runs = merged
+    return iter_union(*map(_read, runs))
+
+
+def build_sorted_set(iterable, chunk_size=CHUNK_SIZE, path=None, width=None,
+                     temp_dir=None, fan_in=FAN_IN):
+    """
+    SortedSet of the items of a (possibly huge) iterable, sorted with
+    at most chunk_size items in memory.
+    With a path the result is written there with mapped_sorted_set.save()
+    (width is passed on for bytes records) and a MappedSortedSet of the
+    file comes back instead.
+    Spilled runs go to a new directory inside temp_dir (the system
+    default when None) which is removed again before this returns.
+    """
+    if chunk_size < 1:
+        raise ValueError('chunk_size must be at least 1, not {!r}'.format(chunk_size))
+    if fan_in < 2:
+        raise ValueError('fan_in must be at least 2, not {!r}'.format(fan_in))
+    with tempfile.TemporaryDirectory(dir=temp_dir) as directory:
+        iterator = iter(iterable)
+        first = list(islice(iterator, chunk_size))
+        # one item past the first chunk tells whether there's any more
+        # without reading a whole second chunk next to it
+        peek = next(iterator, _END)
+        if peek is _END:
+            # it all fit in one chunk, no need for the disk
+            merged = _sorted_run(first)
+        else:
+            runs = [_spill(_sorted_run(first), directory)]
+            del first
+            for chunk in _chunks(chain((peek,), iterator), chunk_size):
+                runs.append(_spill(_sorted_run(chunk), directory))
+                del chunk
+            merged = _merged(runs, directory, fan_in)
+
+        if path is None:
+            merged = list(merged)
+            return SortedSet._from_sorted(_compact(merged))
+        save(merged, path, width)
+    return MappedSortedSet(path)
+
+
+# ======= parallel =======
+# Sorting is the expensive part of building a set, and chunks of the
+# input can be sorted independently: every worker process sorts and
+# dedupes one chunk, and the parent merges the sorted chunks.
+#
+# Chunks of plain ints or floats travel to the workers and back as
+# arrays, which pickle as one block of bytes rather than one object
+# per item.  The merge is a single list.sort() of the chunks put end
+# to end: timsort spots the sorted runs and merges them in C, which
+# beats a heapq.merge through python by a wide margin.
+
+# below this many items starting the worker processes costs more than it saves
+PARALLEL_THRESHOLD = 1000000
+
+
+def _packed(chunk):
+    kinds = set(map(type, chunk))
+    try:
+        if kinds == {int}:
+            return array('q', chunk)
+        if kinds == {float}:
+            return array('d', chunk)
+    except OverflowError:
+        # ints too big for 64 bits
+        pass
+    return chunk
+
+
+def _sort_chunk(chunk):
+    # runs in a worker process
+    return _compact(_sorted_unique(chunk))
+
+
+def build_parallel(items, workers=None, threshold=PARALLEL_THRESHOLD):
+    """
+    SortedSet(items), with the sorting spread over `workers` processes
+    (os.cpu_count() when None).
+    Inputs smaller than threshold are built in this process as usual.
+    """
+    if not isinstance(items, (list, tuple, array, range)):
+        items = list(items)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 2 or len(items) < max(threshold, workers):
+        return SortedSet(items)
+
+    size = -(-len(items) // workers)
+    chunks = (_packed(items[i:i + size]) for i in range(0, len(items), size))
+    with ProcessPoolExecutor(workers) as executor:
+        runs = list(executor.map(_sort_chunk, chunks))
+
+    merged = list(chain.from_iterable(runs))
+    merged.sort()
+    storage = {getattr(run, 'typecode', None) for run in runs}
+    del runs
+    merged = _unique(merged)
+    if len(storage) == 1 and None not in storage:
+        # every run came back as the same kind of array
+        return SortedSet._from_sorted(array(storage.pop(), merged))
+    return SortedSet._from_sorted(_compact(merged))
@@ -0,0 +1,117 @@
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+
+from concurrent_sorted_set import ConcurrentSortedSet
+
+"""
+Stress test for ConcurrentSortedSet: writer threads keep publishing
+new versions while reader threads hammer snapshots and check that
+every snapshot they see is consistent.
+
+    python stress_concurrent_sorted_set.py --readers 1 2 4 8 16 --duration 2
+
+Writers only ever add or remove the pair x and -x together, in one
+batch, so every version ever published is symmetric.  A reader that
+saw x without -x (or a snapshot that wasn't sorted) would have caught
+a half-published write.  Reads per second are reported for each
+reader count, to see whether throughput keeps rising with threads.
+"""
+
+UNIVERSE = 10000
+SAMPLE = 16
+
+
+def _writer(shared, stop, seed, counts):
+    rng = random.Random(seed)
+    writes = 0
+    while not stop.is_set():
+        x = rng.randrange(1, UNIVERSE)
+        with shared.batch() as batch:
+            if rng.random() < 0.5:
+                batch.update((x, -x))
+            else:
+                batch.difference_update((x, -x))
+        writes += 1
+    counts.append(writes)
+
+
+def _reader(shared, stop, seed, counts, errors):
+    rng = random.Random(seed)
+    reads = 0
+    while not stop.is_set():
+        s = shared.snapshot()
+        n = len(s)
+        if n % 2:
+            errors.append('odd length {}'.format(n))
+        for _ in range(SAMPLE):
+            if not n:
+                break
+            x = s[rng.randrange(n)]
+            if -x not in s:
+                errors.append('{} without {}'.format(x, -x))
+        if n and not s[0] < s[n // 2] < s[-1]:
+            errors.append('snapshot out of order')
+        reads += 1
+    counts.append(reads)
+
+
+def stress(readers=4, writers=1, duration=1.0, size=1000, seed=0):
+    """
+    Run the threads for `duration` seconds, return a dict of results
+    (the list of errors is empty when nothing went wrong)
+    """
+    rng = random.Random(seed)
+    initial = set()
+    for x in rng.sample(range(1, UNIVERSE), size // 2):
+        initial.update((x, -x))
+    shared = ConcurrentSortedSet(initial)
+    stop = threading.Event()
+    reads, writes, errors = [], [], []
+    threads = [threading.Thread(target=_writer, args=(shared, stop, seed + i, writes))
+               for i in range(writers)]
+    threads += [threading.Thread(target=_reader, args=(shared, stop, seed + 1000 + i, reads, errors))
+                for i in range(readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return {
+        'readers': readers,
+        'writers': writers,
+        'duration': duration,
+        'reads_per_second': sum(reads) / duration,
+        'writes_per_second': sum(writes) / duration,
+        'versions': shared.version,
+        'errors': errors[:10],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Stress test ConcurrentSortedSet')
+    parser.add_argument('--readers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--writers', type=int, default=1)
+    parser.add_argument('--duration', type=float, default=1.0)
+    parser.add_argument('--size', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    results = []
+    for readers in args.readers:
+        result = stress(readers, args.writers, args.duration, args.size, args.seed)
+        print('{readers:>4} readers {reads_per_second:14.0f} reads/s '
+              '{writes_per_second:10.0f} writes/s {versions:>8} versions'.format(**result),
+              file=sys.stderr)
+        results.append(result)
+    json.dump(results, sys.stdout, indent=2)
+    print()
+    return 1 if any(result['errors'] for result in results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,193 @@
+import pickle
+import random
+import unittest
+from decimal import Decimal
+from fractions import Fraction
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from bloom_filter import BloomFilter
+from filtered_sorted_set import FilteredSortedSet
+from sorted_set import SortedSet
+
+
+class TestBloomFilter(unittest.TestCase):
+
+    def setUp(self):
+        self.rng = random.Random(25)
+
+    def test_no_false_negatives(self):
+        items = [self.rng.randrange(10 ** 12) for _ in range(5000)]
+        bloom = BloomFilter.from_items(items)
+        for item in items:
+            self.assertIn(item, bloom)
+
+    def test_false_positive_rate(self):
+        for error_rate in (0.01, 0.001):
+            bloom = BloomFilter.from_items(range(0, 20000, 2), error_rate)
+            misses = range(1, 200001, 2)
+            positives = sum(miss in bloom for miss in misses)
+            self.assertLess(positives / len(misses), 2 * error_rate)
+
+    def test_equal_values_encode_the_same(self):
+        bloom = BloomFilter.from_items([1, 2.5, 'a', b'a', -0.0])
+        for value in (1, 1.0, True, 2.5, 'a', b'a', bytearray(b'a'), 0, False):
+            self.assertIn(value, bloom)
+
+    def test_other_types_are_maybe(self):
+        bloom = BloomFilter.from_items([1])
+        self.assertIn((3, 4), bloom)
+        self.assertFalse(bloom.saturated())
+
+    def test_other_types_saturate(self):
+        bloom = BloomFilter.from_items([(1, 2), 5])
+        self.assertTrue(bloom.saturated())
+        self.assertIn(3, bloom)
+        bloom = BloomFilter.from_items([1])
+        bloom.add(Decimal('sNaN'))
+        self.assertIn('anything', bloom)
+
+    def test_numbers_of_every_type(self):
+        bloom = BloomFilter.from_items([3, Decimal(1), Fraction(1, 2), 2.5])
+        self.assertFalse(bloom.saturated())
+        for value in (3, 3.0, 1, Decimal('1.0'), 0.5, Fraction(5, 2)):
+            self.assertIn(value, bloom)
+
+    @unittest.skipIf(np is None, 'numpy is not installed')
+    def test_numpy_scalars(self):
+        bloom = BloomFilter.from_items([np.int64(3), np.float64(2.5)])
+        self.assertFalse(bloom.saturated())
+        for value in (3, 3.0, np.int32(3), 2.5, np.float32(2.5)):
+            self.assertIn(value, bloom)
+
+    def test_serialization(self):
+        bloom = BloomFilter.from_items(['x', 'y', 'z'], 0.001)
+        for copy in (BloomFilter.from_bytes(bloom.to_bytes()), pickle.loads(pickle.dumps(bloom))):
+            self.assertEqual(copy.to_bytes(), bloom.to_bytes())
+            self.assertIn('y', copy)
+        with self.assertRaises(ValueError):
+            BloomFilter.from_bytes(b'NOTBLOOM' + bloom.to_bytes()[8:])
+        with self.assertRaises(ValueError):
+            BloomFilter.from_bytes(bloom.to_bytes()[:-1])
+
+    def test_bad_error_rate(self):
+        with self.assertRaises(ValueError):
+            BloomFilter(10, 0)
+        with self.assertRaises(ValueError):
+            BloomFilter(10, 1.5)
+
+
+class TestFilteredSortedSet(unittest.TestCase):
+
+    def setUp(self):
+        self.s = FilteredSortedSet(range(0, 1000, 3))
+
+    def test_lookups(self):
+        plain = SortedSet(range(0, 1000, 3))
+        for value in range(-5, 1005):
+            self.assertEqual(value in self.s, value in plain)
+            self.assertEqual(self.s.count(value), plain.count(value))
+        self.assertNotIn('3', self.s)
+
+    def test_misses_skip_the_bisect(self):
+        s = FilteredSortedSet(range(0, 100000, 2), error_rate=0.001)
+        misses = range(1, 100001, 2)
+        self.assertLess(sum(value in s.filter for value in misses), 100)
+        self.assertFalse(any(value in s for value in misses))
+
+    def test_batch_lookups(self):
+        values = [999, 3, 4, 500, 501, -1, 0]
+        plain = SortedSet(range(0, 1000, 3))
+        self.assertEqual(self.s.contains_many(values), plain.contains_many(values))
+        self.assertEqual(self.s.index_many(values), plain.index_many(values))
+
+    def test_isdisjoint(self):
+        self.assertTrue(self.s.isdisjoint([1, 2, 1000]))
+        self.assertFalse(self.s.isdisjoint(iter([1, 2, 999])))
+        self.assertFalse(self.s.isdisjoint(SortedSet([4, 6])))
+        self.assertTrue(self.s.isdisjoint(SortedSet([4, 5])))
+
+    @unittest.skipIf(np is None, 'numpy is not installed')
+    def test_numpy_items(self):
+        s = FilteredSortedSet(np.arange(0, 1000, 3))
+        self.assertIn(3, s)
+        self.assertEqual(s.contains_many([3, 6, 9, 4]), [True, True, True, False])
+        self.assertFalse(s.isdisjoint([3]))
+
+    def test_decimal_and_fraction_items(self):
+        self.assertIn(1, FilteredSortedSet([Decimal(1)]))
+        self.assertEqual(FilteredSortedSet([Decimal(1), Decimal(3)]).contains_many([1, 2, 3.0]),
+                         [True, False, True])
+        self.assertIn(0.5, FilteredSortedSet([Fraction(1, 2)]))
+        self.assertFalse(FilteredSortedSet([Fraction(1, 2)]).isdisjoint([0.5]))
+
+    def test_unhashable_items_pass_through(self):
+        class Thing:
+            def __init__(self, value):
+                self.value = value
+
+            def __eq__(self, other):
+                return self.value == other
+
+            def __lt__(self, other):
+                return self.value < getattr(other, 'value', other)
+
+            def __gt__(self, other):
+                return self.value > getattr(other, 'value', other)
+
+        s = FilteredSortedSet([Thing(1), Thing(2)])
+        self.assertTrue(s.filter.saturated())
+        self.assertIn(2, s)
+        self.assertNotIn(3, s)
+        s = FilteredSortedSet.with_filter(SortedSet([(1, 2), (3, 4)]))
+        self.assertIn((3, 4), s)
+
+    def test_key_function(self):
+        s = FilteredSortedSet(['b', 'A', 'c'], key=str.lower)
+        self.assertIn('A', s)
+        self.assertNotIn('a', s)
+        self.assertEqual(s.contains_many(['c', 'a', 'b']), [True, False, True])
+
+    def test_results_are_plain_sorted_sets(self):
+        for result in (self.s & SortedSet([3, 4]), self.s[::2]):
+            self.assertIs(type(result), SortedSet)
+        self.assertEqual(FilteredSortedSet([1, 2]), SortedSet([1, 2]))
+
+    def test_persistent_updates(self):
+        added = self.s.with_added(1)
+        self.assertIsInstance(added, FilteredSortedSet)
+        self.assertIn(1, added)
+        self.assertNotIn(1, self.s)
+        removed = added.with_removed(3)
+        self.assertIsInstance(removed, FilteredSortedSet)
+        self.assertNotIn(3, removed)
+        self.assertIs(self.s.with_added(3), self.s)
+
+    def test_with_filter(self):
+        plain = SortedSet(range(100))
+        bloom = BloomFilter.from_bytes(BloomFilter.from_items(plain).to_bytes())
+        s = FilteredSortedSet.with_filter(plain, bloom)
+        self.assertIs(s._items, plain._items)
+        self.assertIs(s.filter, bloom)
+        self.assertIn(99, s)
+        s = FilteredSortedSet.from_sorted([1, 2, 2, 3])
+        self.assertEqual(list(s), [1, 2, 3])
+        self.assertIn(2, s)
+
+    def test_pickle(self):
+        copy = pickle.loads(pickle.dumps(self.s))
+        self.assertIsInstance(copy, FilteredSortedSet)
+        self.assertEqual(copy, self.s)
+        self.assertEqual(copy.filter.to_bytes(), self.s.filter.to_bytes())
+
+    def test_memory_usage(self):
+        usage = self.s.memory_usage()
+        self.assertEqual(usage['filter'], self.s.filter.nbytes())
+        self.assertEqual(usage['total'], usage['container'] + usage['elements'] + usage['filter'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,207 @@
+import random
+import unittest
+from math import log2
+
+from sorted_set import MutableSortedSet, SortedSet, iter_union
+
+"""
+The comments in sorted_set.py promise O(log n) lookups, O(n + m)
+merges and so on.  Timing tests are too noisy to hold anyone to that,
+so these count comparisons instead: every item is a Counted, which
+adds one to a counter each time it's compared.
+
+Each operation is run at several sizes and has to stay within its
+bound (times a small constant) at every one of them, so an operation
+that quietly turns linear (or quadratic) fails at the bigger sizes.
+"""
+
+SIZES = (256, 2048, 16384)
+
+# slack on top of the bound for constant factors
+# (a bisect does log2(n) + 1 comparisons, galloping twice that, ...)
+FACTOR = 4
+
+
+class Counted:
+    comparisons = 0
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other):
+        Counted.comparisons += 1
+        return self.value < other.value
+
+    def __eq__(self, other):
+        Counted.comparisons += 1
+        return isinstance(other, Counted) and self.value == other.value
+
+    def __hash__(self):
+        return hash(self.value)
+
+    def __repr__(self):
+        return 'Counted({!r})'.format(self.value)
+
+
+def comparisons(function, *args):
+    Counted.comparisons = 0
+    function(*args)
+    return Counted.comparisons
+
+
+def counted(values):
+    return [Counted(value) for value in values]
+
+
+def log(n):
+    return log2(n) + 1
+
+
+class ComplexityTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.rng = random.Random(24)
+
+    def assertWithin(self, count, bound, what):
+        self.assertLessEqual(count, FACTOR * bound,
+                             '{}: {} comparisons, bound {:.0f}'.format(what, count, bound))
+
+    def sets(self):
+        # (n, sorted set of 0, 2, 4, ..., probes that hit and miss)
+        for n in SIZES:
+            s = SortedSet(counted(range(0, 2 * n, 2)))
+            probes = counted(self.rng.randrange(2 * n) for _ in range(50))
+            yield n, s, probes
+
+
+class TestLookups(ComplexityTestCase):
+
+    def test_contains(self):
+        for n, s, probes in self.sets():
+            for probe in probes:
+                self.assertWithin(comparisons(s.__contains__, probe), log(n), 'in, n={}'.format(n))
+
+    def test_count(self):
+        for n, s, probes in self.sets():
+            for probe in probes:
+                self.assertWithin(comparisons(s.count, probe), log(n), 'count, n={}'.format(n))
+
+    def test_index(self):
+        for n, s, _ in self.sets():
+            for value in self.rng.sample(list(s), 50):
+                self.assertWithin(comparisons(s.index, value), log(n), 'index, n={}'.format(n))
+
+    def test_neighbours_and_ranges(self):
+        for n, s, probes in self.sets():
+            for probe in probes:
+                for method in (s.floor, s.ceiling, s.lower, s.higher, s.rank):
+                    self.assertWithin(comparisons(method, probe), log(n),
+                                      '{}, n={}'.format(method.__name__, n))
+                self.assertWithin(comparisons(s.count_range, probe, Counted(probe.value + 50)),
+                                  2 * log(n), 'count_range, n={}'.format(n))
+
+    def test_views(self):
+        for n, s, probes in self.sets():
+            self.assertEqual(comparisons(s.__getitem__, slice(n // 4, n // 2)), 0)
+            view = s[n // 4:n // 2]
+            for probe in probes:
+                self.assertWithin(comparisons(view.__contains__, probe), log(n),
+                                  'view in, n={}'.format(n))
+
+    def test_contains_many(self):
+        for n, s, probes in self.sets():
+            k = len(probes)
+            self.assertWithin(comparisons(s.contains_many, probes), k * log(k) + k * log(n),
+                              'contains_many, n={}'.format(n))
+
+    def test_with_added(self):
+        for n, s, probes in self.sets():
+            for probe in probes[:10]:
+                self.assertWithin(comparisons(s.with_added, probe), 2 * log(n),
+                                  'with_added, n={}'.format(n))
+
+    def test_derived_sets(self):
+        # a set fresh from with_added() answers lookups from its chunks
+        for n, s, probes in self.sets():
+            t = s.with_added(Counted(-1))
+            for probe in probes:
+                self.assertWithin(comparisons(t.__contains__, probe), 2 * log(n),
+                                  'in a derived set, n={}'.format(n))
+            hit = Counted(2 * self.rng.randrange(n))
+            self.assertWithin(comparisons(t.index, hit), 2 * log(n),
+                              'index in a derived set, n={}'.format(n))
+
+    def test_mutable(self):
+        for n in SIZES:
+            s = MutableSortedSet(counted(range(0, 2 * n, 2)), load=64)
+            for probe in counted(self.rng.randrange(2 * n) for _ in range(50)):
+                self.assertWithin(comparisons(s.__contains__, probe), log(n),
+                                  'MutableSortedSet in, n={}'.format(n))
+                self.assertWithin(comparisons(s.add, probe), 2 * log(n),
+                                  'MutableSortedSet add, n={}'.format(n))
+
+
+class TestConstruction(ComplexityTestCase):
+
+    def test_sorted_input(self):
+        for n in SIZES:
+            items = counted(range(n))
+            self.assertWithin(comparisons(SortedSet, items), n, 'SortedSet(sorted), n={}'.format(n))
+            self.assertWithin(comparisons(SortedSet.from_sorted, items), n,
+                              'from_sorted, n={}'.format(n))
+
+    def test_random_input(self):
+        for n in SIZES:
+            items = counted(self.rng.randrange(n) for _ in range(n))
+            self.assertWithin(comparisons(SortedSet, items), n * log(n),
+                              'SortedSet(random), n={}'.format(n))
+
+
+class TestSetAlgebra(ComplexityTestCase):
+
+    def pairs(self):
+        for n in SIZES:
+            a = SortedSet(counted(self.rng.sample(range(2 * n), n)))
+            b = SortedSet(counted(self.rng.sample(range(2 * n), n)))
+            yield n, a, b
+
+    def test_merges_are_linear(self):
+        for n, a, b in self.pairs():
+            for operator in ('__and__', '__or__', '__xor__', '__sub__',
+                             '__le__', '__ge__', 'isdisjoint'):
+                self.assertWithin(comparisons(getattr(a, operator), b), 2 * n,
+                                  '{}, n=m={}'.format(operator, n))
+
+    def test_small_against_large_gallops(self):
+        for n in SIZES:
+            big = SortedSet(counted(range(n)))
+            small = SortedSet(counted(self.rng.sample(range(n), 8)))
+            bound = len(small) * 2 * log(n)
+            for operator in ('__and__', '__or__', '__sub__', '__le__', 'isdisjoint'):
+                self.assertWithin(comparisons(getattr(small, operator), big), bound,
+                                  'small {}, n={}'.format(operator, n))
+            self.assertWithin(comparisons(big.__and__, small), bound, 'big &, n={}'.format(n))
+
+    def test_bounds_short_circuit(self):
+        for n in SIZES:
+            low = SortedSet(counted(range(n)))
+            high = SortedSet(counted(range(n, 2 * n)))
+            for operator in ('__and__', '__le__', 'isdisjoint'):
+                self.assertWithin(comparisons(getattr(low, operator), high), 2,
+                                  'disjoint ranges {}, n={}'.format(operator, n))
+
+    def test_many_sets(self):
+        for n in SIZES:
+            sets = [SortedSet(counted(self.rng.sample(range(2 * n), n // 8))) for _ in range(8)]
+            total = sum(map(len, sets))
+            self.assertWithin(comparisons(SortedSet.union_all, *sets), total * log(len(sets)) + total,
+                              'union_all, n={}'.format(n))
+            self.assertWithin(comparisons(SortedSet.intersection_all, *sets), total,
+                              'intersection_all, n={}'.format(n))
+            self.assertWithin(comparisons(lambda: list(iter_union(*sets))),
+                              total * log(len(sets)) + total, 'iter_union, n={}'.format(n))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+
+from concurrent_sorted_set import ConcurrentSortedSet
+from sorted_set import SortedSet
+from stress_concurrent_sorted_set import stress
+
+
+class TestConcurrentSortedSet(unittest.TestCase):
+
+    def test_reads(self):
+        shared = ConcurrentSortedSet([3, 1, 2])
+        self.assertIn(2, shared)
+        self.assertEqual(len(shared), 3)
+        self.assertEqual(list(shared), [1, 2, 3])
+        self.assertEqual(shared[-1], 3)
+        self.assertEqual(repr(shared), 'ConcurrentSortedSet(SortedSet([1, 2, 3]))')
+
+    def test_snapshots_dont_change(self):
+        shared = ConcurrentSortedSet([1, 2, 3])
+        before = shared.snapshot()
+        shared.add(4)
+        shared.discard(1)
+        self.assertEqual(before, SortedSet([1, 2, 3]))
+        self.assertEqual(shared.snapshot(), SortedSet([2, 3, 4]))
+
+    def test_versions(self):
+        shared = ConcurrentSortedSet([1])
+        shared.add(2)
+        shared.add(2)
+        shared.discard(7)
+        self.assertEqual(shared.version, 1)
+        shared.update([5, 6])
+        shared.difference_update([1, 5])
+        self.assertEqual(shared.version, 3)
+        self.assertEqual(list(shared), [2, 6])
+
+    def test_reads_dont_flatten_new_versions(self):
+        # add() publishes a set that shares chunks with the last one,
+        # readers answer from those instead of copying every item
+        shared = ConcurrentSortedSet(range(0, 5000, 2))
+        shared.add(7)
+        self.assertIn(7, shared)
+        self.assertEqual(len(shared), 2501)
+        self.assertEqual(shared[4], 7)
+        self.assertEqual(shared.snapshot().index(7), 4)
+        self.assertEqual(sum(1 for _ in shared), 2501)
+        with self.assertRaises(AttributeError):
+            SortedSet._items.__get__(shared.snapshot())
+
+    def test_batch(self):
+        shared = ConcurrentSortedSet([1, 2, 3])
+        with shared.batch() as batch:
+            batch.add(10)
+            batch.discard(1)
+            batch.add(1)
+            batch.discard(3)
+            # nothing is published until the end of the block
+            self.assertEqual(list(shared), [1, 2, 3])
+        self.assertEqual(list(shared), [1, 2, 10])
+        self.assertEqual(shared.version, 1)
+
+    def test_failed_batch_publishes_nothing(self):
+        shared = ConcurrentSortedSet([1])
+        with self.assertRaises(RuntimeError):
+            with shared.batch() as batch:
+                batch.add(2)
+                raise RuntimeError
+        self.assertEqual(list(shared), [1])
+
+    def test_replace_and_key(self):
+        shared = ConcurrentSortedSet(['b', 'A'], key=str.lower)
+        shared.add('c')
+        self.assertEqual(list(shared), ['A', 'b', 'c'])
+        shared.replace(['Z', 'y'])
+        self.assertEqual(list(shared), ['y', 'Z'])
+
+    def test_stress(self):
+        result = stress(readers=4, writers=2, duration=0.2, size=200)
+        self.assertEqual(result['errors'], [])
+        self.assertGreater(result['versions'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,165 @@
+import unittest
+
+import instrumentation
+from instrumentation import (SortedSetStats, disable, enable, enabled,
+                             instrument, uninstrument)
+from sorted_set import SortedSet
+
+
+class TestPerInstance(unittest.TestCase):
+
+    def setUp(self):
+        self.s = SortedSet([1, 4, 9, 13, 15])
+        self.stats = instrument(self.s)
+
+    def test_counts_calls(self):
+        9 in self.s
+        10 in self.s
+        self.s[0]
+        self.s.index(13)
+        counters = self.stats.as_dict()
+        self.assertEqual(counters['__contains__']['calls'], 2)
+        self.assertEqual(counters['__getitem__']['calls'], 1)
+        self.assertEqual(counters['index']['calls'], 1)
+        self.assertGreater(counters['__contains__']['comparisons'], 0)
+        self.assertGreaterEqual(counters['__contains__']['time'], 0.0)
+
+    def test_results_still_correct(self):
+        self.assertTrue(9 in self.s)
+        self.assertEqual(self.s.count(4), 1)
+        self.assertEqual(self.s & SortedSet([4, 5]), SortedSet([4]))
+        # iterators are read once, and still reach the real call whole
+        self.assertEqual(self.s.union(iter([2, 3])), SortedSet([1, 2, 3, 4, 9, 13, 15]))
+        self.assertEqual(self.s.contains_many(iter([4, 5])), [True, False])
+
+    def test_comparisons_are_counted(self):
+        s = SortedSet(range(1000))
+        stats = instrument(s)
+        500 in s
+        s & SortedSet([3, 700])
+        s.index(999)
+        s[10:20]
+        counters = stats.as_dict()
+        # one bisect, not a bound on it
+        self.assertGreater(counters['__contains__']['comparisons'], 0)
+        self.assertLessEqual(counters['__contains__']['comparisons'], (1000).bit_length() + 1)
+        # galloping, nowhere near n + m
+        self.assertLess(counters['__and__']['comparisons'], 50)
+        self.assertGreater(counters['index']['comparisons'], 0)
+        self.assertEqual(counters['__getitem__']['comparisons'], 0)
+
+    def test_key_functions(self):
+        s = SortedSet(['b', 'A', 'c'], key=str.lower)
+        stats = instrument(s)
+        self.assertIn('A', s)
+        self.assertNotIn('a', s)
+        self.assertEqual(list(s | SortedSet(['B', 'd'], key=str.lower)), ['A', 'b', 'B', 'c', 'd'])
+        counters = stats.as_dict()
+        self.assertGreater(counters['__contains__']['comparisons'], 0)
+        self.assertGreater(counters['__or__']['comparisons'], 0)
+
+    def test_set_operations_and_construction(self):
+        result = self.s | SortedSet([2, 3])
+        counters = self.stats.as_dict()
+        self.assertEqual(counters['__or__']['calls'], 1)
+        self.assertEqual(counters['__or__']['bytes_copied'],
+                         len(result) * instrumentation._POINTER_SIZE)
+        # results report to the same stats
+        result.union([100])
+        counters = self.stats.as_dict()
+        self.assertEqual(counters['union']['calls'], 1)
+        self.assertEqual(counters['__init__']['calls'], 1)
+
+    def test_other_instances_untouched(self):
+        other = SortedSet([1, 2])
+        1 in other
+        self.assertNotIn('__contains__', self.stats.as_dict())
+        self.assertIs(type(other), SortedSet)
+
+    def test_callback(self):
+        calls = []
+        s = SortedSet([1, 2, 3])
+        instrument(s, callback=lambda name, elapsed, counters: calls.append(name))
+        2 in s
+        s.count(3)
+        self.assertEqual(calls[0], '__contains__')
+        self.assertIn('count', calls)
+
+    def test_shared_stats(self):
+        t = SortedSet([7])
+        instrument(t, stats=self.stats)
+        7 in t
+        1 in self.s
+        self.assertEqual(self.stats.as_dict()['__contains__']['calls'], 2)
+
+    def test_uninstrument(self):
+        uninstrument(self.s)
+        self.assertIs(type(self.s), SortedSet)
+        1 in self.s
+        self.assertEqual(self.stats.as_dict(), {})
+
+    def test_reset(self):
+        1 in self.s
+        self.stats.reset()
+        self.assertEqual(self.stats.as_dict(), {})
+
+    def test_still_a_sorted_set(self):
+        self.assertIsInstance(self.s, SortedSet)
+        self.assertEqual(self.s, SortedSet([1, 4, 9, 13, 15]))
+
+
+class TestPerProcess(unittest.TestCase):
+
+    def tearDown(self):
+        disable()
+
+    def test_enable_disable(self):
+        original = SortedSet.__contains__
+        original_le = SortedSet.__le__
+        stats = enable()
+        self.assertTrue(enabled())
+        s = SortedSet([3, 1, 2])
+        2 in s
+        s - SortedSet([1])
+        counters = stats.as_dict()
+        self.assertEqual(counters['__init__']['calls'], 2)
+        self.assertEqual(counters['__contains__']['calls'], 1)
+        self.assertEqual(counters['__sub__']['calls'], 1)
+        disable()
+        self.assertFalse(enabled())
+        self.assertIs(SortedSet.__contains__, original)
+        self.assertIs(SortedSet.__le__, original_le)
+
+    def test_presorted_construction(self):
+        stats = enable()
+        SortedSet(range(1000))
+        # the strictly-sorted check, and no sort after it
+        self.assertEqual(stats.as_dict()['__init__']['comparisons'], 999)
+
+    def test_with_instrumented_instances(self):
+        stats = enable()
+        t = SortedSet(range(10))
+        mine = instrument(t)
+        3 in t
+        # one wrapper deep, counted once in each
+        self.assertEqual(mine.as_dict()['__contains__']['calls'], 1)
+        self.assertEqual(stats.as_dict()['__contains__']['calls'], 1)
+        disable()
+        u = SortedSet([1])
+        instrument(u, stats=mine)
+        enable(stats=stats)
+        1 in u
+        self.assertEqual(mine.as_dict()['__contains__']['calls'], 2)
+        self.assertEqual(stats.as_dict()['__contains__']['calls'], 2)
+        disable()
+        5 in t
+        self.assertEqual(mine.as_dict()['__contains__']['calls'], 3)
+        self.assertEqual(stats.as_dict()['__contains__']['calls'], 2)
+
+    def test_stats_object(self):
+        stats = SortedSetStats()
+        self.assertIs(enable(stats=stats), stats)
+
+
+if __name__ == '__main__':
+    unittest.main()
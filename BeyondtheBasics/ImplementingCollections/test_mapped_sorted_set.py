@@ -0,0 +1,184 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from collections.abc import Sequence, Set
+
+from mapped_sorted_set import MappedSortedSet, save
+from sorted_set import SortedSet
+
+
+class MappedTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def mapped(self, items, **kwargs):
+        path = os.path.join(self.directory, 'set{}.sset'.format(len(os.listdir(self.directory))))
+        save(items, path, **kwargs)
+        s = MappedSortedSet(path)
+        self.addCleanup(s.close)
+        return s
+
+
+class TestIntRecords(MappedTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.s = self.mapped(SortedSet([7, 2, 1, 3, 20, -5]))
+
+    def test_iteration(self):
+        self.assertEqual(list(self.s), [-5, 1, 2, 3, 7, 20])
+        self.assertEqual(list(reversed(self.s)), [20, 7, 3, 2, 1, -5])
+        self.assertEqual(len(self.s), 6)
+        self.assertEqual(self.s.kind, 'q')
+
+    def test_contains(self):
+        self.assertIn(7, self.s)
+        self.assertNotIn(8, self.s)
+        self.assertNotIn('7', self.s)
+
+    def test_index_and_count(self):
+        self.assertEqual(self.s.index(3), 3)
+        self.assertEqual(self.s.count(3), 1)
+        self.assertEqual(self.s.count(4), 0)
+        with self.assertRaises(ValueError):
+            self.s.index(4)
+
+    def test_indexing(self):
+        self.assertEqual(self.s[0], -5)
+        self.assertEqual(self.s[-1], 20)
+        with self.assertRaises(IndexError):
+            self.s[6]
+
+    def test_slices_share_the_mapping(self):
+        middle = self.s[1:5]
+        self.assertIsInstance(middle, MappedSortedSet)
+        self.assertIs(middle._source, self.s._source)
+        self.assertEqual(list(middle), [1, 2, 3, 7])
+        self.assertIn(1, middle)
+        self.assertNotIn(-5, middle)
+        self.assertEqual(middle.index(7), 3)
+        self.assertEqual(list(middle[1:-1]), [2, 3])
+        self.assertEqual(list(self.s[4:2]), [])
+
+    def test_stepped_slice(self):
+        self.assertEqual(self.s[::2], SortedSet([-5, 2, 7]))
+
+    def test_range_queries(self):
+        self.assertEqual(list(self.s.irange(0, 7)), [1, 2, 3, 7])
+        self.assertEqual(list(self.s.irange(1, 7, inclusive=(False, False))), [2, 3])
+        self.assertEqual(list(self.s.irange(maximum=2, reverse=True)), [2, 1, -5])
+        self.assertEqual(self.s.count_range(2, 100), 4)
+        self.assertEqual(self.s.bisect_left(3), 3)
+        self.assertEqual(self.s.bisect_right(3), 4)
+        self.assertEqual(list(self.s[1:4].irange(0)), [1, 2, 3])
+
+    def test_equality_and_algebra(self):
+        self.assertEqual(self.s, SortedSet([-5, 1, 2, 3, 7, 20]))
+        self.assertEqual(SortedSet([-5, 1, 2, 3, 7, 20]), self.s)
+        self.assertEqual(self.s & SortedSet([2, 4, 20]), SortedSet([2, 20]))
+
+    def test_to_sorted_set(self):
+        self.assertEqual(self.s.to_sorted_set(), SortedSet([-5, 1, 2, 3, 7, 20]))
+        self.assertEqual(self.s[2:4].to_sorted_set(), SortedSet([2, 3]))
+
+    def test_protocols(self):
+        self.assertTrue(issubclass(MappedSortedSet, Sequence))
+        self.assertTrue(issubclass(MappedSortedSet, Set))
+
+
+class TestBytesRecords(MappedTestCase):
+
+    def test_round_trip(self):
+        s = self.mapped(SortedSet([b'pear', b'apple', b'fig', b'']))
+        self.assertEqual(s.kind, 's')
+        self.assertEqual(s.width, 5)
+        self.assertEqual(list(s), [b'', b'apple', b'fig', b'pear'])
+        self.assertIn(b'fig', s)
+        self.assertNotIn(b'fi', s)
+        self.assertNotIn(1, s)
+        self.assertEqual(s.index(b'pear'), 3)
+        self.assertEqual(list(s.irange(b'b', b'g')), [b'fig'])
+
+    def test_width_from_iterator(self):
+        s = self.mapped(iter([b'a', b'b']), width=4)
+        self.assertEqual(list(s), [b'a', b'b'])
+        with self.assertRaises(ValueError):
+            self.mapped(iter([b'a', b'b']))
+
+    def test_rejected_values(self):
+        with self.assertRaises(ValueError):
+            self.mapped([b'a', b'toolong'], width=3)
+        with self.assertRaises(ValueError):
+            self.mapped([b'a\0'])
+
+
+class TestSave(MappedTestCase):
+
+    def test_empty(self):
+        s = self.mapped(SortedSet())
+        self.assertEqual(len(s), 0)
+        self.assertNotIn(1, s)
+
+    def test_sorted_iterable(self):
+        s = self.mapped(x * x for x in range(1000))
+        self.assertEqual(len(s), 1000)
+        self.assertIn(998001, s)
+
+    def test_unsorted_rejected(self):
+        with self.assertRaises(ValueError):
+            self.mapped([1, 3, 2])
+        with self.assertRaises(ValueError):
+            self.mapped([1, 1])
+
+    def test_unsupported(self):
+        with self.assertRaises(TypeError):
+            self.mapped(['a', 'b'])
+        with self.assertRaises(ValueError):
+            self.mapped(SortedSet([1, 2], key=abs))
+
+    def test_list_storage(self):
+        s = self.mapped(SortedSet([1, 2, 3], compact=False))
+        self.assertEqual(list(s), [1, 2, 3])
+
+    def test_not_a_sorted_set_file(self):
+        path = os.path.join(self.directory, 'junk')
+        with open(path, 'wb') as f:
+            f.write(b'hello, this is not a sorted set')
+        with self.assertRaises(ValueError):
+            MappedSortedSet(path)
+
+    def test_dropped_copies_let_go(self):
+        # an unpickled copy is never closed by hand, collecting it has
+        # to close its file and mapping without a ResourceWarning
+        path = os.path.join(self.directory, 'dropped.sset')
+        save(range(10), path)
+        script = (
+            'import gc, pickle, sys\n'
+            'from mapped_sorted_set import MappedSortedSet\n'
+            's = MappedSortedSet(sys.argv[1])\n'
+            'copy = pickle.loads(pickle.dumps(s[2:5]))\n'
+            'assert 3 in copy\n'
+            'del copy\n'
+            'gc.collect()\n'
+            's.close()\n'
+        )
+        result = subprocess.run([sys.executable, '-W', 'error', '-c', script, path],
+                                cwd=os.path.dirname(os.path.abspath(__file__)),
+                                capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stderr, '')
+
+    def test_closed(self):
+        s = self.mapped([1, 2, 3])
+        s.close()
+        with self.assertRaises(ValueError):
+            2 in s
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,192 @@
+import random
+import unittest
+from collections.abc import Sequence, Set
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from sorted_set import SortedSet
+
+if np is not None:
+    from numeric_sorted_set import NumericSortedSet
+
+
+@unittest.skipIf(np is None, 'numpy is not installed')
+class TestConstruction(unittest.TestCase):
+
+    def test_empty(self):
+        self.assertEqual(len(NumericSortedSet()), 0)
+        self.assertEqual(len(NumericSortedSet([])), 0)
+
+    def test_unsorted_with_duplicates(self):
+        s = NumericSortedSet([7, 2, 1, 3, 1, 20])
+        self.assertEqual(list(s), [1, 2, 3, 7, 20])
+
+    def test_from_iterable(self):
+        s = NumericSortedSet(x for x in (6, 8, 1, 10))
+        self.assertEqual(list(s), [1, 6, 8, 10])
+
+    def test_from_set(self):
+        self.assertEqual(list(NumericSortedSet({3, 1, 2})), [1, 2, 3])
+
+    def test_from_array(self):
+        s = NumericSortedSet(np.array([3, 1, 2, 3], dtype=np.int32))
+        self.assertEqual(s.dtype, np.int32)
+        self.assertEqual(list(s), [1, 2, 3])
+
+    def test_floats(self):
+        s = NumericSortedSet([2.5, 0.5, 2.5])
+        self.assertEqual(list(s), [0.5, 2.5])
+
+    def test_from_sorted(self):
+        s = NumericSortedSet.from_sorted([1, 1, 2, 5])
+        self.assertEqual(list(s), [1, 2, 5])
+
+    def test_only_numbers(self):
+        for items in (['a', 'b'], [1, None], [2 ** 63 + 5, 1], [2 ** 70], [0.5, 2 ** 60 + 1]):
+            with self.assertRaises(ValueError):
+                NumericSortedSet(items)
+            with self.assertRaises(ValueError):
+                NumericSortedSet.from_sorted(items)
+        # one int too big for int64 still fits in a uint64
+        self.assertIn(2 ** 63 + 5, NumericSortedSet([2 ** 63 + 5]))
+        self.assertEqual(list(NumericSortedSet([2, 0.5])), [0.5, 2.0])
+
+    def test_memory_usage(self):
+        s = NumericSortedSet(range(100), dtype=np.int64)
+        self.assertEqual(s.memory_usage(), 800)
+
+
+@unittest.skipIf(np is None, 'numpy is not installed')
+class TestProtocols(unittest.TestCase):
+
+    def setUp(self):
+        self.s = NumericSortedSet([1, 4, 9, 13, 15])
+
+    def test_contains(self):
+        self.assertTrue(9 in self.s)
+        self.assertFalse(10 in self.s)
+        self.assertFalse(100 in self.s)
+        self.assertIs(9 in self.s, True)
+
+    def test_indexing(self):
+        self.assertEqual(self.s[0], 1)
+        self.assertEqual(self.s[-1], 15)
+        self.assertIsInstance(self.s[0], int)
+        with self.assertRaises(IndexError):
+            self.s[5]
+
+    def test_slicing(self):
+        self.assertEqual(self.s[:3], NumericSortedSet([1, 4, 9]))
+        self.assertEqual(self.s[10:], NumericSortedSet())
+        self.assertEqual(self.s[::-2], NumericSortedSet([1, 9, 15]))
+
+    def test_reversed(self):
+        self.assertEqual(list(reversed(self.s)), [15, 13, 9, 4, 1])
+
+    def test_index_count(self):
+        self.assertEqual(self.s.index(13), 3)
+        with self.assertRaises(ValueError):
+            self.s.index(2)
+        self.assertEqual(self.s.count(13), 1)
+        self.assertEqual(self.s.count(2), 0)
+
+    def test_ranges(self):
+        self.assertEqual(self.s.bisect_left(9), 2)
+        self.assertEqual(self.s.bisect_right(9), 3)
+        self.assertEqual(list(self.s.irange(2, 14)), [4, 9, 13])
+        self.assertEqual(list(self.s.irange(2, 14, reverse=True)), [13, 9, 4])
+        self.assertEqual(self.s.count_range(4, 13, inclusive=(False, True)), 2)
+
+    def test_batch_lookups(self):
+        values = [15, 2, 4, 100, 1, 0]
+        self.assertEqual(self.s.contains_many(values).tolist(),
+                         [True, False, True, False, True, False])
+        self.assertEqual(self.s.index_many(values).tolist(), [4, -1, 1, -1, 0, -1])
+        self.assertEqual(NumericSortedSet().index_many([1]).tolist(), [-1])
+
+    def test_neighbours(self):
+        self.assertEqual(self.s.rank(10), 3)
+        self.assertEqual(self.s.floor(10), 9)
+        self.assertEqual(self.s.ceiling(10), 13)
+        self.assertEqual(self.s.lower(9), 4)
+        self.assertEqual(self.s.higher(9), 13)
+        self.assertIsNone(self.s.higher(15))
+        self.assertEqual(self.s.nearest(12), 13)
+        self.assertEqual(self.s.percentile(50), 9)
+
+    def test_repr(self):
+        self.assertEqual(repr(NumericSortedSet()), 'NumericSortedSet()')
+        self.assertEqual(repr(self.s), 'NumericSortedSet([1, 4, 9, 13, 15])')
+
+    def test_equality(self):
+        self.assertTrue(self.s == NumericSortedSet([15, 13, 9, 4, 1]))
+        self.assertTrue(self.s == SortedSet([1, 4, 9, 13, 15]))
+        self.assertTrue(SortedSet([1, 4, 9, 13, 15]) == self.s)
+        self.assertTrue(self.s != NumericSortedSet([1]))
+        self.assertFalse(self.s == [1, 4, 9, 13, 15])
+
+    def test_concatenation_repetition(self):
+        self.assertEqual(self.s + NumericSortedSet([2, 4]), NumericSortedSet([1, 2, 4, 9, 13, 15]))
+        self.assertEqual(self.s * 0, NumericSortedSet())
+        self.assertEqual(3 * self.s, self.s)
+
+    def test_protocols(self):
+        self.assertTrue(issubclass(NumericSortedSet, Sequence))
+        self.assertTrue(issubclass(NumericSortedSet, Set))
+
+
+@unittest.skipIf(np is None, 'numpy is not installed')
+class TestSetAlgebra(unittest.TestCase):
+
+    def test_against_builtin_set(self):
+        rng = random.Random(3)
+        for _ in range(50):
+            a = [rng.randrange(200) for _ in range(rng.randrange(100))]
+            b = [rng.randrange(200) for _ in range(rng.randrange(100))]
+            s, t = NumericSortedSet(a), NumericSortedSet(b)
+            self.assertEqual(list(s & t), sorted(set(a) & set(b)))
+            self.assertEqual(list(s | t), sorted(set(a) | set(b)))
+            self.assertEqual(list(s ^ t), sorted(set(a) ^ set(b)))
+            self.assertEqual(list(s - t), sorted(set(a) - set(b)))
+            self.assertEqual(s <= t, set(a) <= set(b))
+            self.assertEqual(s < t, set(a) < set(b))
+            self.assertEqual(s >= t, set(a) >= set(b))
+            self.assertEqual(s > t, set(a) > set(b))
+            self.assertEqual(s.isdisjoint(t), set(a).isdisjoint(b))
+
+    def test_with_sorted_set(self):
+        s = NumericSortedSet([1, 2, 3])
+        self.assertEqual(s & SortedSet([2, 3, 4]), NumericSortedSet([2, 3]))
+
+    def test_named_methods(self):
+        s = NumericSortedSet([1, 2, 3])
+        self.assertTrue(s.issubset([1, 2, 3, 4]))
+        self.assertTrue(s.issuperset([1, 2]))
+        self.assertEqual(s.intersection([2, 3, 4]), NumericSortedSet([2, 3]))
+        self.assertEqual(s.union([2, 3, 4]), NumericSortedSet([1, 2, 3, 4]))
+        self.assertEqual(s.symmetric_difference([2, 3, 4]), NumericSortedSet([1, 4]))
+        self.assertEqual(s.difference([2, 3, 4]), NumericSortedSet([1]))
+        self.assertFalse(s.isdisjoint([3, 4, 5]))
+
+    def test_mixed_type_operand(self):
+        s = NumericSortedSet([1, 2])
+        words = SortedSet(['a'])
+        with self.assertRaises(ValueError):
+            s | words
+        with self.assertRaises(TypeError):
+            s - words
+        self.assertTrue(s.isdisjoint(words))
+        self.assertNotEqual(s, words)
+        self.assertEqual(s | SortedSet([2.5]), NumericSortedSet([1, 2, 2.5]))
+
+    def test_other_set_types(self):
+        s = NumericSortedSet([1, 2, 3])
+        self.assertEqual(s & frozenset([2, 3, 4]), NumericSortedSet([2, 3]))
+        self.assertTrue(s <= frozenset([1, 2, 3]))
+
+
+if __name__ == '__main__':
+    unittest.main()
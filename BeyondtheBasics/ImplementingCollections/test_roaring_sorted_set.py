@@ -0,0 +1,169 @@
+import random
+import unittest
+from collections.abc import Sequence, Set
+
+from roaring_sorted_set import (RoaringSortedSet, _ArrayContainer, _BitmapContainer,
+                                _RunContainer)
+from sorted_set import SortedSet
+
+rng = random.Random(22)
+
+
+def _mixed_values():
+    # one sparse container, one dense, one long run, spread over the 32 bits
+    sparse = rng.sample(range(0, 1 << 16), 300)
+    dense = [(5 << 16) + x for x in rng.sample(range(1 << 16), 30000)]
+    run = range((9 << 16) + 100, (10 << 16) + 500)
+    top = [(1 << 32) - 1, (1 << 32) - 3]
+    return sparse + dense + list(run) + top
+
+
+class TestConstruction(unittest.TestCase):
+
+    def test_empty(self):
+        s = RoaringSortedSet()
+        self.assertEqual(len(s), 0)
+        self.assertEqual(list(s), [])
+        self.assertEqual(repr(s), 'RoaringSortedSet()')
+
+    def test_unsorted_with_duplicates(self):
+        s = RoaringSortedSet([7, 2, 1, 3, 1, 20])
+        self.assertEqual(list(s), [1, 2, 3, 7, 20])
+        self.assertEqual(repr(s), 'RoaringSortedSet([1, 2, 3, 7, 20])')
+
+    def test_out_of_range(self):
+        with self.assertRaises(ValueError):
+            RoaringSortedSet([-1])
+        with self.assertRaises(ValueError):
+            RoaringSortedSet([1 << 32])
+        with self.assertRaises(ValueError):
+            RoaringSortedSet([1.5])
+
+    def test_container_choice(self):
+        values = _mixed_values()
+        s = RoaringSortedSet(values)
+        kinds = [type(container) for container in s._containers]
+        self.assertEqual(kinds[0], _ArrayContainer)
+        self.assertEqual(kinds[1], _BitmapContainer)
+        self.assertEqual(kinds[2:4], [_RunContainer, _RunContainer])
+        self.assertEqual(list(s), sorted(set(values)))
+
+    def test_memory(self):
+        values = list(range(1000000, 1400000)) + rng.sample(range(1 << 32), 1000)
+        s = RoaringSortedSet(values)
+        boxed = SortedSet(values, compact=False).memory_usage()['total']
+        self.assertLess(s.memory_usage() * 50, boxed)
+
+    def test_protocols(self):
+        self.assertTrue(issubclass(RoaringSortedSet, Sequence))
+        self.assertTrue(issubclass(RoaringSortedSet, Set))
+
+
+class TestQueries(unittest.TestCase):
+
+    def setUp(self):
+        self.values = sorted(set(_mixed_values()))
+        self.s = RoaringSortedSet(self.values)
+
+    def test_contains(self):
+        for value in rng.sample(self.values, 200):
+            self.assertIn(value, self.s)
+        members = set(self.values)
+        for value in rng.sample(range(11 << 16), 200):
+            self.assertEqual(value in self.s, value in members)
+        self.assertNotIn(-1, self.s)
+        self.assertNotIn('a', self.s)
+        self.assertNotIn(1 << 40, self.s)
+
+    def test_positions(self):
+        for index in rng.sample(range(len(self.values)), 300) + [0, -1]:
+            self.assertEqual(self.s[index], self.values[index])
+        for value in rng.sample(self.values, 300):
+            self.assertEqual(self.s.index(value), self.values.index(value))
+            self.assertEqual(self.s.count(value), 1)
+        with self.assertRaises(IndexError):
+            self.s[len(self.values)]
+        with self.assertRaises(ValueError):
+            self.s.index((3 << 16) + 1)
+
+    def test_bisect(self):
+        from bisect import bisect_left, bisect_right
+        for value in rng.sample(range(11 << 16), 200) + [0, (1 << 32) - 2, 1 << 33]:
+            self.assertEqual(self.s.bisect_left(value), bisect_left(self.values, value))
+            self.assertEqual(self.s.bisect_right(value), bisect_right(self.values, value))
+        for value in (2.5, -0.5, 70000.5, (1 << 32) - 2.5, float('inf'), float('-inf')):
+            self.assertEqual(self.s.bisect_left(value), bisect_left(self.values, value))
+            self.assertEqual(self.s.bisect_right(value), bisect_right(self.values, value))
+
+    def test_reversed_and_slices(self):
+        self.assertEqual(list(reversed(self.s)), self.values[::-1])
+        self.assertEqual(list(self.s[10:20]), self.values[10:20])
+        self.assertEqual(list(self.s[::1000]), self.values[::1000])
+
+
+class TestSetAlgebra(unittest.TestCase):
+
+    def test_against_sets(self):
+        for _ in range(5):
+            a, b = set(_mixed_values()), set(_mixed_values())
+            s, t = RoaringSortedSet(a), RoaringSortedSet(b)
+            self.assertEqual(list(s & t), sorted(a & b))
+            self.assertEqual(list(s | t), sorted(a | b))
+            self.assertEqual(list(s ^ t), sorted(a ^ b))
+            self.assertEqual(list(s - t), sorted(a - b))
+            self.assertEqual(s <= t, a <= b)
+            self.assertTrue(s & t <= s)
+            self.assertTrue(s | t >= t)
+            self.assertTrue((s - t).isdisjoint(t))
+
+    def test_empty_containers_dropped(self):
+        s = RoaringSortedSet([1, 2, 70000])
+        result = s - RoaringSortedSet([1, 2])
+        self.assertEqual(result._highs, [1])
+        self.assertEqual(list(result), [70000])
+
+    def test_equality(self):
+        s = RoaringSortedSet([1, 5, 70000])
+        self.assertEqual(s, RoaringSortedSet([70000, 5, 1]))
+        self.assertNotEqual(s, RoaringSortedSet([1, 5]))
+        self.assertEqual(s, SortedSet([1, 5, 70000]))
+        self.assertEqual(SortedSet([1, 5, 70000]), s)
+        self.assertEqual(s, {1, 5, 70000})
+
+    def test_with_sorted_set(self):
+        s = RoaringSortedSet([1, 2, 3])
+        self.assertEqual(s & SortedSet([2, 3, 4]), RoaringSortedSet([2, 3]))
+        self.assertEqual(s | {9}, {1, 2, 3, 9})
+        self.assertTrue(s.issubset(range(10)))
+        self.assertEqual(s.difference([1]), RoaringSortedSet([2, 3]))
+
+    def test_values_that_cant_be_members(self):
+        r = RoaringSortedSet([1, 5, 7])
+        self.assertEqual(r & SortedSet([-1, 5]), RoaringSortedSet([5]))
+        self.assertEqual(r.intersection([5, 2 ** 40]), RoaringSortedSet([5]))
+        self.assertEqual(r - SortedSet([-1, 5]), RoaringSortedSet([1, 7]))
+        self.assertEqual(r.difference(['a', 7]), RoaringSortedSet([1, 5]))
+        self.assertTrue(r <= SortedSet([-1, 1, 5, 7]))
+        self.assertTrue(r < SortedSet([-1, 1, 5, 7]))
+        self.assertFalse(r < SortedSet([-1, 1, 5]))
+        self.assertTrue(r.issubset([-1, 1, 5, 7]))
+        self.assertFalse(r >= SortedSet([-1, 1]))
+        self.assertFalse(r > SortedSet([-1, 1]))
+        self.assertFalse(r.issuperset([1, 2 ** 40]))
+        self.assertTrue(r.issuperset([1, 5]))
+        self.assertTrue(r.isdisjoint(SortedSet(['a'])))
+        self.assertFalse(r.isdisjoint([-1, 7]))
+
+    def test_unions_with_values_that_dont_fit(self):
+        r = RoaringSortedSet([1, 5])
+        union = r | SortedSet([-1, 5])
+        self.assertIs(type(union), SortedSet)
+        self.assertEqual(union, SortedSet([-1, 1, 5]))
+        self.assertEqual(r.union([2 ** 40]), SortedSet([1, 5, 2 ** 40]))
+        self.assertEqual(r ^ SortedSet([-1, 5]), SortedSet([-1, 1]))
+        self.assertEqual(r.symmetric_difference([5, 2.5]), SortedSet([1, 2.5]))
+        self.assertIs(type(r | SortedSet([2])), RoaringSortedSet)
+
+
+if __name__ == '__main__':
+    unittest.main()
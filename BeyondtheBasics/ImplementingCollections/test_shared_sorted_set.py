@@ -0,0 +1,80 @@
+import os
+import pickle
+import subprocess
+import sys
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+from shared_sorted_set import SharedSortedSet
+from sorted_set import SortedSet
+
+
+def _lookups(s):
+    # runs in a worker process
+    return len(s), 40 in s, 41 in s, s.index(40), list(s[:3])
+
+
+class TestSharedSortedSet(unittest.TestCase):
+
+    def setUp(self):
+        self.s = SharedSortedSet.create(SortedSet(range(0, 1000, 2)))
+        self.addCleanup(self.s.unlink)
+        self.addCleanup(self.s.close)
+
+    def test_lookups(self):
+        self.assertEqual(len(self.s), 500)
+        self.assertIn(40, self.s)
+        self.assertNotIn(41, self.s)
+        self.assertEqual(self.s.index(40), 20)
+        self.assertEqual(list(self.s.irange(10, 16)), [10, 12, 14, 16])
+        self.assertEqual(self.s, SortedSet(range(0, 1000, 2)))
+
+    def test_attach_by_name(self):
+        other = SharedSortedSet(self.s.name)
+        self.addCleanup(other.close)
+        self.assertEqual(list(other[:3]), [0, 2, 4])
+
+    def test_pickles_as_the_name(self):
+        data = pickle.dumps(self.s)
+        self.assertLess(len(data), 200)
+        other = pickle.loads(data)
+        self.addCleanup(other.close)
+        self.assertEqual(other, self.s)
+        window = pickle.loads(pickle.dumps(self.s[10:20]))
+        self.addCleanup(window.close)
+        self.assertEqual(list(window), list(range(20, 40, 2)))
+
+    def test_from_unsorted_items(self):
+        s = SharedSortedSet.create([b'pear', b'fig', b'apple', b'fig'])
+        self.addCleanup(s.unlink)
+        self.addCleanup(s.close)
+        self.assertEqual(list(s), [b'apple', b'fig', b'pear'])
+
+    def test_workers(self):
+        with ProcessPoolExecutor(2) as pool:
+            results = list(pool.map(_lookups, [self.s] * 3))
+        self.assertEqual(results, [(500, True, False, 20, [0, 2, 4])] * 3)
+
+    def test_dropped_copies_let_go(self):
+        # copies that are never closed, like the ones in workers, have
+        # to release the block quietly when they're collected
+        script = (
+            'import gc, pickle\n'
+            'from shared_sorted_set import SharedSortedSet\n'
+            's = SharedSortedSet.create(range(10))\n'
+            'copy = pickle.loads(pickle.dumps(s[2:5]))\n'
+            'assert 3 in copy\n'
+            'del copy\n'
+            'gc.collect()\n'
+            's.close()\n'
+            's.unlink()\n'
+        )
+        result = subprocess.run([sys.executable, '-W', 'error', '-c', script],
+                                cwd=os.path.dirname(os.path.abspath(__file__)),
+                                capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stderr, '')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import random
+import unittest
+from collections.abc import KeysView, MutableMapping, Sequence
+
+from sorted_dict import SortedDict
+
+
+class TestSortedDict(unittest.TestCase):
+
+    def setUp(self):
+        self.d = SortedDict({5: 'e', 1: 'a', 3: 'c'})
+
+    def test_construction(self):
+        self.assertEqual(list(self.d), [1, 3, 5])
+        self.assertEqual(list(SortedDict([(2, 'b'), (1, 'a'), (2, 'B')]).items()),
+                         [(1, 'a'), (2, 'B')])
+        self.assertEqual(list(SortedDict(b=2, a=1)), ['a', 'b'])
+        self.assertEqual(len(SortedDict()), 0)
+
+    def test_lookup(self):
+        self.assertEqual(self.d[3], 'c')
+        self.assertIn(5, self.d)
+        self.assertNotIn(4, self.d)
+        self.assertEqual(self.d.get(4, 'x'), 'x')
+        with self.assertRaises(KeyError):
+            self.d[4]
+
+    def test_set_and_delete(self):
+        self.d[4] = 'd'
+        self.d[1] = 'A'
+        del self.d[5]
+        self.assertEqual(list(self.d.items()), [(1, 'A'), (3, 'c'), (4, 'd')])
+        with self.assertRaises(KeyError):
+            del self.d[5]
+        self.assertEqual(self.d.pop(3), 'c')
+        self.assertEqual(self.d.setdefault(0, 'z'), 'z')
+        self.assertEqual(list(self.d), [0, 1, 4])
+
+    def test_views(self):
+        keys, values, items = self.d.keys(), self.d.values(), self.d.items()
+        self.assertIsInstance(keys, KeysView)
+        self.assertIsInstance(keys, Sequence)
+        self.assertEqual(keys[1], 3)
+        self.assertEqual(values[-1], 'e')
+        self.assertEqual(items[0], (1, 'a'))
+        self.assertEqual(items[1:], [(3, 'c'), (5, 'e')])
+        self.assertEqual(list(reversed(items)), [(5, 'e'), (3, 'c'), (1, 'a')])
+        self.assertIn((3, 'c'), items)
+        self.assertNotIn((3, 'x'), items)
+        self.assertEqual(keys.index(5), 2)
+        self.assertEqual(keys & {1, 2, 3}, {1, 3})
+        # views are live
+        self.d[2] = 'b'
+        self.assertEqual(list(keys), [1, 2, 3, 5])
+        self.assertEqual(list(values), ['a', 'b', 'c', 'e'])
+
+    def test_positions(self):
+        self.assertEqual(self.d.peekitem(), (5, 'e'))
+        self.assertEqual(self.d.peekitem(0), (1, 'a'))
+        self.assertEqual(self.d.index(3), 1)
+        self.assertEqual(self.d.bisect_left(4), 2)
+        self.assertEqual(self.d.bisect_right(3), 2)
+        self.assertEqual(self.d.popitem(0), (1, 'a'))
+        self.assertEqual(self.d.popitem(), (5, 'e'))
+        self.assertEqual(self.d.popitem(), (3, 'c'))
+        with self.assertRaises(KeyError):
+            self.d.popitem()
+        with self.assertRaises(ValueError):
+            self.d.index(3)
+
+    def test_ranges(self):
+        d = SortedDict((t, t * 10) for t in range(0, 100, 5))
+        self.assertEqual(list(d.irange(12, 30)), [15, 20, 25, 30])
+        self.assertEqual(list(d.irange(15, 30, inclusive=(False, False))), [20, 25])
+        self.assertEqual(list(d.irange(maximum=10, reverse=True)), [10, 5, 0])
+        self.assertEqual(list(d.irange_items(90)), [(90, 900), (95, 950)])
+        self.assertEqual(list(d.irange_items(0, 5, reverse=True)), [(5, 50), (0, 0)])
+        self.assertEqual(d.floor_key(12), 10)
+        self.assertEqual(d.ceiling_key(12), 15)
+        self.assertIsNone(d.floor_key(-1))
+        self.assertIsNone(d.ceiling_key(96))
+
+    def test_repr_eq_copy(self):
+        self.assertEqual(repr(self.d), "SortedDict({1: 'a', 3: 'c', 5: 'e'})")
+        self.assertEqual(self.d, {1: 'a', 3: 'c', 5: 'e'})
+        copy = self.d.copy()
+        copy[7] = 'g'
+        self.assertNotIn(7, self.d)
+
+    def test_against_dict(self):
+        rng = random.Random(21)
+        d, reference = SortedDict(), {}
+        for _ in range(2000):
+            key = rng.randrange(100)
+            if rng.random() < 0.6:
+                d[key] = reference[key] = rng.random()
+            else:
+                d.pop(key, None)
+                reference.pop(key, None)
+        self.assertEqual(list(d.items()), sorted(reference.items()))
+
+    def test_protocols(self):
+        self.assertTrue(issubclass(SortedDict, MutableMapping))
+
+
+if __name__ == '__main__':
+    unittest.main()
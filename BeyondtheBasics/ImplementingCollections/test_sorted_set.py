@@ -1,8 +1,16 @@
+import io
+import pickle
+import random
+from array import array
 import unittest
 from collections.abc import (Container, Sized,
-                             Iterable, Sequence, Set)
+                             Iterable, MutableSet, Sequence, Set)
+from contextlib import redirect_stdout
+from functools import reduce
+from operator import and_, or_
 
-from sorted_set import SortedSet
+from sorted_set import (MutableSortedSet, SortedSet, SortedSetView, iter_difference,
+                        iter_intersection, iter_symmetric_difference, iter_union)
 
 
 class TestConstruction(unittest.TestCase):
@@ -457,6 +465,70 @@ class TestSetOperationsMethods(unittest.TestCase):
         t = [3, 4, 5]
         self.assertFalse(s.isdisjoint(t))
 
+
+class TestMergeSetAlgebra(unittest.TestCase):
+    """
+    The operators now merge the two sorted lists instead of
+    going through the Set mixins, so check them against the builtin set
+    """
+
+    def check_all(self, a, b):
+        s, t = SortedSet(a), SortedSet(b)
+        self.assertEqual(list(s & t), sorted(set(a) & set(b)))
+        self.assertEqual(list(s | t), sorted(set(a) | set(b)))
+        self.assertEqual(list(s ^ t), sorted(set(a) ^ set(b)))
+        self.assertEqual(list(s - t), sorted(set(a) - set(b)))
+        self.assertEqual(list(t - s), sorted(set(b) - set(a)))
+
+    def test_empty(self):
+        self.check_all([], [])
+        self.check_all([1, 2, 3], [])
+        self.check_all([], [1, 2, 3])
+
+    def test_disjoint_ranges(self):
+        self.check_all([1, 2, 3], [7, 8, 9])
+        self.check_all([7, 8, 9], [1, 2, 3])
+
+    def test_interleaved(self):
+        self.check_all([1, 3, 5, 7], [2, 3, 4, 7, 8])
+
+    def test_identical(self):
+        self.check_all([1, 2, 3], [1, 2, 3])
+
+    # one side much bigger than the other takes the galloping path
+    def test_galloping(self):
+        big = list(range(0, 1000, 3))
+        for small in ([-1], [0], [999], [1000], [5, 6, 300, 301, 998]):
+            self.check_all(small, big)
+            self.check_all(big, small)
+
+    def test_random(self):
+        rng = random.Random(42)
+        for _ in range(50):
+            a = [rng.randrange(200) for _ in range(rng.randrange(100))]
+            b = [rng.randrange(200) for _ in range(rng.randrange(100))]
+            self.check_all(a, b)
+
+    def test_result_type(self):
+        s = SortedSet([1, 2, 3]) | SortedSet([3, 4])
+        self.assertIsInstance(s, SortedSet)
+        self.assertEqual(s, SortedSet([1, 2, 3, 4]))
+
+    # the mixin still handles anything that isn't a SortedSet
+    def test_other_set_types(self):
+        s = SortedSet([1, 2, 3])
+        self.assertEqual(s & frozenset([2, 3, 4]), SortedSet([2, 3]))
+        self.assertEqual(s - frozenset([2]), SortedSet([1, 3]))
+
+    def test_operands_unchanged(self):
+        s = SortedSet([1, 2, 3])
+        t = SortedSet([3, 4, 5])
+        s | t
+        s ^ t
+        self.assertEqual(list(s), [1, 2, 3])
+        self.assertEqual(list(t), [3, 4, 5])
+
+
 # Vid 17: Finally, ascertain that we've implemented the set protocol
 
 
@@ -465,5 +537,1031 @@ class TestSetProtocol(unittest.TestCase):
     def test_protocol(self):
         self.assertTrue(issubclass(SortedSet, Set))
 
+class TestBatchLookups(unittest.TestCase):
+
+    def setUp(self):
+        self.s = SortedSet([1, 4, 9, 13, 15])
+
+    def test_contains_many(self):
+        self.assertEqual(self.s.contains_many([15, 2, 4, 100, 1, 0]),
+                         [True, False, True, False, True, False])
+
+    def test_index_many(self):
+        self.assertEqual(self.s.index_many([13, 2, 1, 15, 16]), [3, -1, 0, 4, -1])
+
+    def test_repeated_values(self):
+        self.assertEqual(self.s.index_many([9, 9, 3, 9]), [2, 2, -1, 2])
+
+    def test_empty(self):
+        self.assertEqual(self.s.contains_many([]), [])
+        self.assertEqual(SortedSet().index_many([1, 2]), [-1, -1])
+
+    def test_generator(self):
+        self.assertEqual(self.s.contains_many(x for x in (4, 5)), [True, False])
+
+    def test_random(self):
+        rng = random.Random(11)
+        s = SortedSet(rng.randrange(1000) for _ in range(300))
+        values = [rng.randrange(1100) for _ in range(500)]
+        self.assertEqual(s.contains_many(values), [v in s for v in values])
+        self.assertEqual(s.index_many(values),
+                         [s.index(v) if v in s else -1 for v in values])
+
+    def test_with_key(self):
+        s = SortedSet([-3, 1, 2, -2], key=abs)
+        self.assertEqual(s.contains_many([2, 3, -2, -1]), [True, False, True, False])
+        self.assertEqual(s.index_many([-3, 1]), [3, 0])
+
+
+class TestRangeQueries(unittest.TestCase):
+
+    def setUp(self):
+        self.s = SortedSet([1, 4, 9, 13, 15])
+
+    def test_bisect_present(self):
+        self.assertEqual(self.s.bisect_left(9), 2)
+        self.assertEqual(self.s.bisect_right(9), 3)
+
+    def test_bisect_absent(self):
+        self.assertEqual(self.s.bisect_left(10), 3)
+        self.assertEqual(self.s.bisect_right(10), 3)
+        self.assertEqual(self.s.bisect_left(0), 0)
+        self.assertEqual(self.s.bisect_right(100), 5)
+
+    def test_irange_inclusive(self):
+        self.assertEqual(list(self.s.irange(4, 13)), [4, 9, 13])
+
+    def test_irange_endpoints_absent(self):
+        self.assertEqual(list(self.s.irange(2, 14)), [4, 9, 13])
+
+    def test_irange_exclusive(self):
+        self.assertEqual(list(self.s.irange(4, 13, inclusive=(False, False))), [9])
+        self.assertEqual(list(self.s.irange(4, 13, inclusive=(True, False))), [4, 9])
+
+    def test_irange_unbounded(self):
+        self.assertEqual(list(self.s.irange(maximum=9)), [1, 4, 9])
+        self.assertEqual(list(self.s.irange(minimum=10)), [13, 15])
+        self.assertEqual(list(self.s.irange()), [1, 4, 9, 13, 15])
+
+    def test_irange_reverse(self):
+        self.assertEqual(list(self.s.irange(2, 14, reverse=True)), [13, 9, 4])
+
+    def test_irange_empty(self):
+        self.assertEqual(list(self.s.irange(10, 12)), [])
+        self.assertEqual(list(self.s.irange(13, 4)), [])
+
+    def test_irange_is_lazy(self):
+        r = self.s.irange(4, 13)
+        self.assertEqual(next(r), 4)
+        self.assertEqual(next(r), 9)
+
+    def test_count_range(self):
+        self.assertEqual(self.s.count_range(2, 14), 3)
+        self.assertEqual(self.s.count_range(4, 13, inclusive=(False, True)), 2)
+        self.assertEqual(self.s.count_range(10, 12), 0)
+        self.assertEqual(self.s.count_range(15, 1), 0)
+        self.assertEqual(self.s.count_range(), 5)
+
+
+class TestFromSorted(unittest.TestCase):
+
+    def test_from_sorted(self):
+        s = SortedSet.from_sorted([1, 2, 2, 3, 5, 5])
+        self.assertEqual(list(s), [1, 2, 3, 5])
+        self.assertIsInstance(s, SortedSet)
+
+    def test_from_sorted_iterable(self):
+        s = SortedSet.from_sorted(iter(range(5)))
+        self.assertEqual(list(s), [0, 1, 2, 3, 4])
+
+    def test_from_sorted_copies_by_default(self):
+        items = [1, 2, 3]
+        s = SortedSet.from_sorted(items)
+        items.append(0)
+        self.assertEqual(list(s), [1, 2, 3])
+
+    def test_from_sorted_adopts_without_copy(self):
+        items = [1, 2, 3]
+        s = SortedSet.from_sorted(items, copy=False)
+        self.assertIs(s._items, items)
+
+    def test_from_sorted_empty(self):
+        self.assertEqual(SortedSet.from_sorted([]), SortedSet())
+
+    def test_init_sorted_input(self):
+        items = [1, 2, 3]
+        s = SortedSet(items)
+        items.append(0)
+        self.assertEqual(list(s), [1, 2, 3])
+
+    # no set() means items only need to be orderable
+    def test_unhashable_items(self):
+        s = SortedSet([[3], [1], [2], [1]])
+        self.assertEqual(list(s), [[1], [2], [3]])
+        self.assertIn([2], s)
+
+    def test_reversed_slice(self):
+        s = SortedSet([1, 4, 9, 13, 15])
+        self.assertEqual(s[::-2], SortedSet([1, 9, 15]))
+
+
+class Event:
+    """
+    A record ordered by its timestamp, equal when all fields are equal
+    """
+    def __init__(self, ts, name):
+        self.ts = ts
+        self.name = name
+
+    def __eq__(self, other):
+        return (self.ts, self.name) == (other.ts, other.name)
+
+    def __hash__(self):
+        return hash((self.ts, self.name))
+
+    def __repr__(self):
+        return 'Event({!r}, {!r})'.format(self.ts, self.name)
+
+
+class CountingKey:
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, event):
+        self.calls += 1
+        return event.ts
+
+
+class TestKeyFunction(unittest.TestCase):
+
+    def setUp(self):
+        self.key = CountingKey()
+        self.events = [Event(5, 'e'), Event(1, 'a'), Event(3, 'c'),
+                       Event(3, 'x'), Event(1, 'a')]
+        self.s = SortedSet(self.events, key=self.key)
+
+    def test_order(self):
+        self.assertEqual([e.ts for e in self.s], [1, 3, 3, 5])
+
+    # equal keys are not equal items, only real duplicates are dropped
+    def test_duplicates(self):
+        self.assertEqual(len(self.s), 4)
+        self.assertIn(Event(3, 'c'), self.s)
+        self.assertIn(Event(3, 'x'), self.s)
+
+    def test_key_called_once_per_element(self):
+        self.assertEqual(self.key.calls, len(self.events))
+        self.key.calls = 0
+        Event(3, 'x') in self.s
+        self.s.index(Event(5, 'e'))
+        self.s.count(Event(1, 'a'))
+        self.assertEqual(self.key.calls, 3)
+
+    def test_contains(self):
+        self.assertNotIn(Event(3, 'y'), self.s)
+        self.assertNotIn(Event(4, 'c'), self.s)
+
+    def test_index(self):
+        self.assertEqual(self.s.index(Event(5, 'e')), 3)
+        self.assertIn(self.s.index(Event(3, 'x')), (1, 2))
+        with self.assertRaises(ValueError):
+            self.s.index(Event(3, 'y'))
+
+    def test_count(self):
+        self.assertEqual(self.s.count(Event(3, 'c')), 1)
+        self.assertEqual(self.s.count(Event(3, 'y')), 0)
+
+    def test_slice_keeps_key(self):
+        t = self.s[1:3]
+        self.assertEqual(len(t), 2)
+        self.assertIn(Event(3, 'x'), t)
+        self.assertIs(t._key, self.key)
+
+    def test_set_algebra(self):
+        t = SortedSet([Event(3, 'x'), Event(3, 'y'), Event(9, 'z')], key=self.key)
+        self.assertEqual(set(self.s & t), {Event(3, 'x')})
+        self.assertEqual(set(self.s | t), set(self.events) | set(t))
+        self.assertEqual(set(self.s - t), {Event(1, 'a'), Event(3, 'c'), Event(5, 'e')})
+        self.assertEqual(set(self.s ^ t),
+                         {Event(1, 'a'), Event(3, 'c'), Event(5, 'e'), Event(3, 'y'), Event(9, 'z')})
+        self.assertEqual([e.ts for e in self.s | t], [1, 3, 3, 3, 5, 9])
+
+    def test_named_methods_keep_key(self):
+        u = self.s.union([Event(0, 'z')])
+        self.assertEqual(u[0], Event(0, 'z'))
+        self.assertTrue(self.s.issuperset([Event(3, 'c')]))
+
+    def test_equality_ignores_run_order(self):
+        t = SortedSet([Event(3, 'x'), Event(3, 'c'), Event(1, 'a'), Event(5, 'e')], key=self.key)
+        self.assertTrue(self.s == t)
+        self.assertFalse(self.s != t)
+
+    def test_value_ranges(self):
+        self.assertEqual(self.s.count_range(Event(2, ''), Event(4, '')), 2)
+        self.assertEqual(self.s.bisect_left(Event(3, '')), 1)
+        self.assertEqual(self.s.bisect_key_right(3), 3)
+        self.assertEqual([e.name for e in self.s.irange_key(2, 5)], ['c', 'x', 'e'])
+
+    def test_from_sorted(self):
+        t = SortedSet.from_sorted([Event(1, 'a'), Event(1, 'a'), Event(2, 'b')], key=self.key)
+        self.assertEqual(list(t), [Event(1, 'a'), Event(2, 'b')])
+
+    def test_long_runs(self):
+        # thousands of items per key: dedup, merges and lookups must not
+        # compare every item of a run with every other one
+        s = SortedSet(list(range(4000)) * 2, key=lambda x: x % 4)
+        self.assertEqual(len(s), 4000)
+        t = SortedSet(range(2000, 6000), key=s._key)
+        self.assertEqual(len(s | t), 6000)
+        self.assertEqual(set(s & t), set(range(2000, 4000)))
+        self.assertEqual(set(s - t), set(range(2000)))
+        self.assertEqual(len(s ^ t), 4000)
+        # different key functions go through the mixins, i.e. lookups
+        other = SortedSet(range(2000, 6000), key=lambda x: x % 4)
+        self.assertEqual(set(s & other), set(range(2000, 4000)))
+        self.assertIn(3999, s)
+        self.assertNotIn(4001, s)
+        self.assertEqual(s[s.index(2001)], 2001)
+        self.assertIn(2001, s[1000:2000])
+        self.assertNotIn(2001, s[:1000])
+
+    def test_long_runs_unhashable(self):
+        key = lambda item: item[0] % 2
+        items = [[i] for i in range(100)] + [[i] for i in range(50)]
+        s = SortedSet(items, key=key)
+        self.assertEqual(len(s), 100)
+        self.assertIn([41], s)
+        self.assertNotIn([101], s)
+        mixed = SortedSet([(i,) for i in range(40)] + [[i] for i in range(40, 80)], key=key)
+        self.assertIn([41], mixed)
+        self.assertIn((3,), mixed)
+        self.assertNotIn([3], mixed)
+        self.assertEqual(len(mixed | SortedSet([[41], (3,), [200]], key=key)), 81)
+
+    def test_repr(self):
+        self.assertEqual(repr(SortedSet([], key=abs)), 'SortedSet(key=<built-in function abs>)')
+        self.assertEqual(repr(SortedSet([-2, 1], key=abs)),
+                         'SortedSet([1, -2], key=<built-in function abs>)')
+
+
+class TestNeighbourQueries(unittest.TestCase):
+
+    def setUp(self):
+        self.s = SortedSet([10, 20, 30, 40])
+
+    def test_rank(self):
+        self.assertEqual(self.s.rank(5), 0)
+        self.assertEqual(self.s.rank(20), 1)
+        self.assertEqual(self.s.rank(25), 2)
+        self.assertEqual(self.s.rank(99), 4)
+
+    def test_floor_ceiling(self):
+        self.assertEqual(self.s.floor(25), 20)
+        self.assertEqual(self.s.floor(20), 20)
+        self.assertIsNone(self.s.floor(5))
+        self.assertEqual(self.s.ceiling(25), 30)
+        self.assertEqual(self.s.ceiling(30), 30)
+        self.assertIsNone(self.s.ceiling(41))
+
+    def test_lower_higher(self):
+        self.assertEqual(self.s.lower(20), 10)
+        self.assertIsNone(self.s.lower(10))
+        self.assertEqual(self.s.higher(20), 30)
+        self.assertIsNone(self.s.higher(40))
+
+    def test_nearest(self):
+        self.assertEqual(self.s.nearest(22), 20)
+        self.assertEqual(self.s.nearest(28), 30)
+        self.assertEqual(self.s.nearest(25), 20)
+        self.assertEqual(self.s.nearest(-100), 10)
+        self.assertEqual(self.s.nearest(100), 40)
+        self.assertEqual(self.s.nearest(30), 30)
+        self.assertIsNone(SortedSet().nearest(1))
+
+    def test_percentile(self):
+        self.assertEqual(self.s.percentile(0), 10)
+        self.assertEqual(self.s.percentile(25), 10)
+        self.assertEqual(self.s.percentile(26), 20)
+        self.assertEqual(self.s.percentile(50), 20)
+        self.assertEqual(self.s.percentile(100), 40)
+
+    def test_percentile_errors(self):
+        with self.assertRaises(ValueError):
+            self.s.percentile(101)
+        with self.assertRaises(ValueError):
+            SortedSet().percentile(50)
+
+    def test_with_key(self):
+        s = SortedSet([Event(10, 'a'), Event(20, 'b')], key=lambda e: e.ts)
+        self.assertEqual(s.nearest(Event(16, '')), Event(20, 'b'))
+        self.assertEqual(s.floor(Event(15, '')), Event(10, 'a'))
+        self.assertEqual(s.rank(Event(15, '')), 1)
+
+
+class TestSliceViews(unittest.TestCase):
+
+    def setUp(self):
+        self.s = SortedSet(range(0, 100, 10))
+        self.v = self.s[2:6]
+
+    def test_slice_is_view(self):
+        self.assertIsInstance(self.v, SortedSetView)
+        self.assertIs(self.v._parent, self.s)
+
+    def test_len_iter(self):
+        self.assertEqual(len(self.v), 4)
+        self.assertEqual(list(self.v), [20, 30, 40, 50])
+        self.assertEqual(list(reversed(self.v)), [50, 40, 30, 20])
+
+    def test_indexing(self):
+        self.assertEqual(self.v[0], 20)
+        self.assertEqual(self.v[-1], 50)
+        with self.assertRaises(IndexError):
+            self.v[4]
+        with self.assertRaises(IndexError):
+            self.v[-5]
+
+    def test_contains(self):
+        self.assertIn(30, self.v)
+        self.assertNotIn(10, self.v)
+        self.assertNotIn(60, self.v)
+        self.assertNotIn(35, self.v)
+
+    def test_index_count(self):
+        self.assertEqual(self.v.index(40), 2)
+        with self.assertRaises(ValueError):
+            self.v.index(60)
+        self.assertEqual(self.v.count(20), 1)
+        self.assertEqual(self.v.count(0), 0)
+
+    def test_further_slicing(self):
+        w = self.v[1:3]
+        self.assertIsInstance(w, SortedSetView)
+        self.assertIs(w._parent, self.s)
+        self.assertEqual(list(w), [30, 40])
+        self.assertEqual(list(self.v[::-2]), [30, 50])
+        self.assertEqual(len(self.v[10:]), 0)
+
+    def test_equality(self):
+        self.assertTrue(self.v == SortedSet([20, 30, 40, 50]))
+        self.assertTrue(SortedSet([20, 30, 40, 50]) == self.v)
+        self.assertTrue(self.v == self.s[2:6])
+        self.assertTrue(self.v != self.s[2:7])
+        self.assertFalse(self.v == [20, 30, 40, 50])
+
+    def test_set_algebra(self):
+        t = SortedSet([0, 30, 50, 70])
+        self.assertEqual(self.v & t, SortedSet([30, 50]))
+        self.assertEqual(self.v | t, SortedSet([0, 20, 30, 40, 50, 70]))
+        self.assertEqual(self.v ^ t, SortedSet([0, 20, 40, 70]))
+        self.assertEqual(self.v - t, SortedSet([20, 40]))
+        self.assertEqual(t - self.v, SortedSet([0, 70]))
+        self.assertEqual(self.v & self.s[4:], SortedSet([40, 50]))
+        self.assertIsInstance(self.v & t, SortedSet)
+
+    def test_relations(self):
+        self.assertTrue(self.v <= self.s)
+        self.assertTrue(self.v.issubset(range(100)))
+        self.assertTrue(self.v.isdisjoint([0, 90]))
+
+    def test_copy(self):
+        c = self.v.copy()
+        self.assertIsInstance(c, SortedSet)
+        self.assertEqual(c, SortedSet([20, 30, 40, 50]))
+
+    def test_repr(self):
+        self.assertEqual(repr(self.v), 'SortedSetView([20, 30, 40, 50])')
+        self.assertEqual(repr(self.s[5:5]), 'SortedSetView()')
+
+    def test_with_key(self):
+        s = SortedSet([-3, 1, 2, -4], key=abs)
+        v = s[1:3]
+        self.assertEqual(list(v), [2, -3])
+        self.assertIn(-3, v)
+        self.assertNotIn(3, v)
+        self.assertEqual(list(v | SortedSet([5], key=abs)), [2, -3, 5])
+
+    def test_no_print(self):
+        out = io.StringIO()
+        with redirect_stdout(out):
+            self.s[3]
+            self.s[1:4]
+        self.assertEqual(out.getvalue(), '')
+
+
+class TestCompactStorage(unittest.TestCase):
+
+    def test_no_instance_dict(self):
+        s = SortedSet([1, 2, 3])
+        self.assertFalse(hasattr(s, '__dict__'))
+        with self.assertRaises(AttributeError):
+            s.extra = 1
+        self.assertFalse(hasattr(s[1:], '__dict__'))
+
+    def test_ints_use_array(self):
+        s = SortedSet([3, 1, 2])
+        self.assertIsInstance(s._items, array)
+        self.assertEqual(s._items.typecode, 'q')
+        self.assertEqual(s.memory_usage()['storage'], "array('q')")
+
+    def test_floats_use_array(self):
+        s = SortedSet([2.5, 0.5])
+        self.assertEqual(s._items.typecode, 'd')
+        self.assertEqual(list(s), [0.5, 2.5])
+
+    def test_mixed_types_use_list(self):
+        self.assertIsInstance(SortedSet([1, 2.5])._items, list)
+        self.assertIsInstance(SortedSet([True, 2])._items, list)
+        self.assertIsInstance(SortedSet(['a', 'b'])._items, list)
+        self.assertIsInstance(SortedSet([1, 1 << 64])._items, list)
+
+    def test_opt_out(self):
+        s = SortedSet([1, 2, 3], compact=False)
+        self.assertIsInstance(s._items, list)
+        self.assertEqual(s, SortedSet([1, 2, 3]))
+
+    def test_behaves_the_same(self):
+        s = SortedSet([1, 4, 9, 13, 15])
+        self.assertEqual(repr(s), 'SortedSet([1, 4, 9, 13, 15])')
+        self.assertIn(9, s)
+        self.assertNotIn(9.5, s)
+        self.assertEqual(s.index(13), 3)
+        self.assertEqual(s[-1], 15)
+        self.assertEqual(s[::-1], s)
+        self.assertEqual(list(s.irange(2, 14)), [4, 9, 13])
+
+    def test_set_algebra_keeps_arrays(self):
+        s, t = SortedSet([1, 2, 3]), SortedSet([3, 4])
+        for result in (s & t, s | t, s ^ t, s - t):
+            self.assertIsInstance(result._items, array)
+
+    def test_mixed_storage_algebra(self):
+        ints = SortedSet([1, 2, 3])
+        mixed = SortedSet([2.5, 3, 10])
+        self.assertEqual(list(ints | mixed), [1, 2, 2.5, 3, 10])
+        self.assertEqual(list(ints & mixed), [3])
+        self.assertEqual(list(SortedSet([0.5]) | ints), [0.5, 1, 2, 3])
+        self.assertEqual(list(ints ^ SortedSet([0.5, 9.5])), [0.5, 1, 2, 3, 9.5])
+
+    def test_equal_across_storage(self):
+        self.assertTrue(SortedSet([1, 2]) == SortedSet([1, 2], compact=False))
+        self.assertFalse(SortedSet([1, 2]) != SortedSet([1, 2], compact=False))
+        self.assertTrue(MutableSortedSet([1, 2]) == SortedSet([1, 2]))
+
+    def test_mutable_set_from_compact(self):
+        s = MutableSortedSet([1, 2]) | SortedSet([5])
+        s.add(2.5)
+        self.assertEqual(list(s), [1, 2, 2.5, 5])
+
+    def test_memory_usage(self):
+        compact = SortedSet(range(1000, 2000)).memory_usage()
+        boxed = SortedSet(range(1000, 2000), compact=False).memory_usage()
+        self.assertEqual(compact['elements'], 0)
+        self.assertEqual(boxed['storage'], 'list')
+        self.assertLess(compact['total'], boxed['total'])
+
+
+class TestMutableSortedSet(unittest.TestCase):
+    """
+    load=4 keeps the chunks tiny so that a few dozen
+    items already exercise splitting and merging
+    """
+
+    def test_construction(self):
+        s = MutableSortedSet([7, 2, 1, 3, 1, 20], load=4)
+        self.assertEqual(list(s), [1, 2, 3, 7, 20])
+        self.assertEqual(len(s), 5)
+
+    def test_default_empty(self):
+        s = MutableSortedSet()
+        self.assertEqual(len(s), 0)
+        self.assertEqual(repr(s), 'MutableSortedSet()')
+
+    def test_add(self):
+        s = MutableSortedSet(load=4)
+        for value in [5, 1, 9, 5, 3]:
+            s.add(value)
+        self.assertEqual(list(s), [1, 3, 5, 9])
+        self.assertIn(9, s)
+        self.assertNotIn(4, s)
+
+    def test_discard(self):
+        s = MutableSortedSet([1, 2, 3], load=4)
+        s.discard(2)
+        s.discard(42)
+        self.assertEqual(list(s), [1, 3])
+
+    def test_remove_missing(self):
+        s = MutableSortedSet([1, 2, 3])
+        with self.assertRaises(KeyError):
+            s.remove(4)
+
+    def test_pop(self):
+        s = MutableSortedSet(range(10), load=4)
+        self.assertEqual(s.pop(), 9)
+        self.assertEqual(s.pop(0), 0)
+        self.assertEqual(s.pop(3), 4)
+        self.assertEqual(list(s), [1, 2, 3, 5, 6, 7, 8])
+
+    def test_pop_empty(self):
+        with self.assertRaises(IndexError):
+            MutableSortedSet().pop()
+
+    def test_update(self):
+        s = MutableSortedSet([1, 5], load=4)
+        s.update([3, 4], range(10, 20))
+        self.assertEqual(list(s), [1, 3, 4, 5] + list(range(10, 20)))
+
+    def test_indexing(self):
+        s = MutableSortedSet(range(0, 100, 2), load=4)
+        for i in range(-50, 50):
+            self.assertEqual(s[i], list(range(0, 100, 2))[i])
+        with self.assertRaises(IndexError):
+            s[50]
+
+    def test_index(self):
+        s = MutableSortedSet(range(0, 100, 2), load=4)
+        self.assertEqual(s.index(42), 21)
+        with self.assertRaises(ValueError):
+            s.index(43)
+
+    def test_slice(self):
+        s = MutableSortedSet(range(20), load=4)
+        self.assertEqual(s[3:11], MutableSortedSet(range(3, 11)))
+        self.assertEqual(s[::-5], MutableSortedSet([4, 9, 14, 19]))
+        self.assertEqual(s[30:], MutableSortedSet())
+
+    def test_reversed(self):
+        s = MutableSortedSet(range(10), load=4)
+        self.assertEqual(list(reversed(s)), list(range(9, -1, -1)))
+
+    def test_equality_with_sorted_set(self):
+        self.assertTrue(MutableSortedSet([3, 1, 2]) == SortedSet([1, 2, 3]))
+        self.assertTrue(SortedSet([1, 2, 3]) == MutableSortedSet([3, 1, 2]))
+        self.assertTrue(MutableSortedSet([1]) != SortedSet([1, 2]))
+        self.assertFalse(MutableSortedSet([1, 2]) == [1, 2])
+
+    def test_equality_with_views(self):
+        view = SortedSet([0, 1, 2, 3, 4])[1:4]
+        self.assertTrue(MutableSortedSet([1, 2, 3]) == view)
+        self.assertTrue(view == MutableSortedSet([3, 2, 1]))
+        self.assertFalse(MutableSortedSet([1, 2, 3]) != view)
+        self.assertTrue(view != MutableSortedSet([1, 2]))
+        self.assertTrue(MutableSortedSet([1, 2, 4]) != view)
+        s = MutableSortedSet([2, 3, 9])
+        self.assertEqual(list(s & view), [2, 3])
+        self.assertEqual(list(s - view), [9])
+
+    def test_set_algebra(self):
+        s = MutableSortedSet([1, 2, 3])
+        t = SortedSet([2, 3, 4])
+        self.assertEqual(s & t, SortedSet([2, 3]))
+        self.assertEqual(s | t, SortedSet([1, 2, 3, 4]))
+        self.assertEqual(s ^ t, SortedSet([1, 4]))
+        self.assertEqual(s - t, SortedSet([1]))
+        self.assertIsInstance(s | t, MutableSortedSet)
+
+    def test_in_place_operators(self):
+        s = MutableSortedSet([1, 2, 3])
+        s |= {4}
+        s -= {1}
+        self.assertEqual(list(s), [2, 3, 4])
+
+    def test_not_hashable(self):
+        with self.assertRaises(TypeError):
+            hash(MutableSortedSet())
+
+    def test_random_operations(self):
+        rng = random.Random(7)
+        s = MutableSortedSet(load=4)
+        reference = set()
+        for _ in range(2000):
+            value = rng.randrange(300)
+            action = rng.random()
+            if action < 0.5:
+                s.add(value)
+                reference.add(value)
+            elif action < 0.8:
+                s.discard(value)
+                reference.discard(value)
+            elif reference:
+                position = rng.randrange(len(reference))
+                self.assertEqual(s.pop(position), sorted(reference)[position])
+                reference.remove(sorted(reference)[position])
+            expected = sorted(reference)
+            self.assertEqual(len(s), len(expected))
+            if expected:
+                position = rng.randrange(len(expected))
+                self.assertEqual(s[position], expected[position])
+                self.assertEqual(s.index(expected[position]), position)
+        self.assertEqual(list(s), sorted(reference))
+
+    def test_protocols(self):
+        self.assertTrue(issubclass(MutableSortedSet, MutableSet))
+        self.assertTrue(issubclass(MutableSortedSet, Sequence))
+
+
+class TestHashing(unittest.TestCase):
+
+    def test_usable_as_key(self):
+        d = {SortedSet([3, 1, 2]): 'a'}
+        self.assertEqual(d[SortedSet([1, 2, 3])], 'a')
+        self.assertEqual(len({SortedSet([1, 2]), SortedSet([2, 1]), SortedSet([1])}), 2)
+
+    def test_equal_sets_hash_equal(self):
+        self.assertEqual(hash(SortedSet([1, 2, 3])), hash(SortedSet([1, 2, 3], compact=False)))
+        self.assertEqual(hash(SortedSet()), hash(SortedSet([])))
+        words = ['pear', 'Apple', 'fig']
+        self.assertEqual(hash(SortedSet(words)), hash(SortedSet(words, key=str.lower)))
+
+    def test_hash_is_cached(self):
+        s = SortedSet([1, 2, 3])
+        self.assertIsNone(s._hash_accumulator)
+        h = hash(s)
+        self.assertIsNotNone(s._hash_accumulator)
+        self.assertEqual(hash(s), h)
+
+    def test_unhashable_items(self):
+        with self.assertRaises(TypeError):
+            hash(SortedSet([[1], [2]]))
+
+    def test_views_unhashable(self):
+        with self.assertRaises(TypeError):
+            hash(SortedSet([1, 2, 3])[1:])
+
+    def test_different_hashes_short_circuit_eq(self):
+        s, t = SortedSet([1, 2, 3]), SortedSet([1, 2, 4])
+        hash(s), hash(t)
+        self.assertFalse(s == t)
+        self.assertTrue(s != t)
+        self.assertTrue(s == s)
+        self.assertFalse(s != SortedSet([1, 2, 3]))
+
+    def test_with_added(self):
+        s = SortedSet([1, 5, 9])
+        t = s.with_added(4)
+        self.assertEqual(list(t), [1, 4, 5, 9])
+        self.assertEqual(list(s), [1, 5, 9])
+        self.assertIs(s.with_added(5), s)
+        self.assertIsInstance(t._items, array)
+
+    def test_with_added_changes_storage(self):
+        s = SortedSet([1, 5])
+        self.assertEqual(list(s.with_added(2.5)), [1, 2.5, 5])
+        self.assertIsInstance(s.with_added(2.5)._items, list)
+        self.assertEqual(list(s.with_added(1 << 70)), [1, 5, 1 << 70])
+
+    def test_with_removed(self):
+        s = SortedSet([1, 5, 9])
+        self.assertEqual(list(s.with_removed(5)), [1, 9])
+        self.assertEqual(list(s), [1, 5, 9])
+        self.assertIs(s.with_removed(4), s)
+        self.assertIs(s.with_removed(10), s)
+        self.assertEqual(s.with_removed(1).with_removed(5).with_removed(9), SortedSet())
+
+    def test_updates_carry_the_hash(self):
+        s = SortedSet(range(0, 100, 3))
+        hash(s)
+        added = s.with_added(50)
+        self.assertIsNotNone(added._hash_accumulator)
+        self.assertEqual(hash(added), hash(SortedSet(list(s) + [50])))
+        removed = s.with_removed(33)
+        self.assertEqual(hash(removed), hash(SortedSet(x for x in s if x != 33)))
+
+    def test_with_added_keyed(self):
+        s = SortedSet(['pear', 'Apple'], key=str.lower)
+        t = s.with_added('fig').with_added('apple')
+        self.assertEqual(list(t), ['Apple', 'apple', 'fig', 'pear'])
+        self.assertIs(t.with_added('Apple'), t)
+        self.assertEqual(list(t.with_removed('Apple')), ['apple', 'fig', 'pear'])
+        self.assertIs(t.with_removed('APPLE'), t)
+        self.assertEqual(t.with_removed('fig').bisect_key_left('p'), 2)
+
+
+class TestPersistentUpdates(unittest.TestCase):
+
+    def setUp(self):
+        self.s = SortedSet(range(0, 20000, 2))
+
+    def test_updates_share_chunks(self):
+        t = self.s.with_added(5)
+        u = t.with_removed(10000)
+        shared = set(map(id, self.s._chunks.lists))
+        self.assertEqual(len(shared - set(map(id, t._chunks.lists))), 1)
+        self.assertEqual(len(shared - set(map(id, u._chunks.lists))), 2)
+        self.assertEqual(list(u), sorted(set(range(0, 20000, 2)) - {10000} | {5}))
+
+    def test_flat_storage_only_when_needed(self):
+        hash(self.s)
+        t = self.s.with_added(5).with_added(7)
+        self.assertEqual(hash(t), hash(SortedSet(list(self.s) + [5, 7])))
+        with self.assertRaises(AttributeError):
+            # the slot itself, without going through __getattr__
+            SortedSet._items.__get__(t)
+        self.assertIn(7, t)
+        self.assertIsInstance(t._items, array)
+        self.assertEqual(len(t), 10002)
+
+    def test_reads_from_chunks(self):
+        t = self.s.with_added(5).with_removed(0)
+        expected = sorted(set(range(0, 20000, 2)) - {0} | {5})
+        self.assertEqual(len(t), len(expected))
+        self.assertIn(5, t)
+        self.assertNotIn(0, t)
+        self.assertEqual(t.count(6), 1)
+        self.assertEqual(t.index(5), 2)
+        self.assertEqual(t.index(19998), len(expected) - 1)
+        with self.assertRaises(ValueError):
+            t.index(3)
+        self.assertEqual([t[0], t[2], t[600], t[-1]], [2, 5, expected[600], 19998])
+        with self.assertRaises(IndexError):
+            t[len(expected)]
+        self.assertEqual(list(t), expected)
+        self.assertEqual(hash(t), hash(SortedSet(expected)))
+        with self.assertRaises(AttributeError):
+            SortedSet._items.__get__(t)
+        keyed = SortedSet(range(3000), key=lambda x: -x).with_added(-1)
+        self.assertEqual(keyed.index(-1), 3000)
+        self.assertEqual(keyed[0], 2999)
+        with self.assertRaises(AttributeError):
+            SortedSet._items.__get__(keyed)
+
+    def test_equal_through_shared_chunks(self):
+        a = self.s.with_added(5).with_added(7)
+        b = self.s.with_added(7).with_added(5)
+        self.assertEqual(a, b)
+        self.assertNotEqual(a, self.s.with_added(5).with_added(9))
+        self.assertNotEqual(a, self.s)
+        self.assertEqual(self.s.with_removed(4).with_added(4), self.s)
+
+    def test_chunks_split_and_empty(self):
+        s = SortedSet()
+        for value in range(3000):
+            s = s.with_added(value)
+        self.assertEqual(list(s), list(range(3000)))
+        self.assertTrue(all(len(chunk) <= 1024 for chunk in s._chunks.lists))
+        for value in range(3000):
+            s = s.with_removed(value)
+        self.assertEqual(s, SortedSet())
+        self.assertEqual(s._chunks.lists, [])
+
+    def test_keyed_runs_across_chunks(self):
+        s = SortedSet(range(3000), key=lambda x: x // 2000)
+        self.assertGreater(len(s._chunked().lists), 2)
+        self.assertIs(s.with_added(1999), s)
+        t = s.with_removed(1999).with_added(5000).with_added(-1)
+        self.assertNotIn(1999, t)
+        self.assertEqual(list(t), [-1] + list(range(1999)) + list(range(2000, 3000)) + [5000])
+        self.assertEqual(t, SortedSet(list(t), key=lambda x: x // 2000))
+
+    def test_random_updates(self):
+        rng = random.Random(13)
+        s, reference = SortedSet(range(0, 5000, 3)), set(range(0, 5000, 3))
+        for _ in range(3000):
+            value = rng.randrange(5000)
+            if rng.random() < 0.5:
+                s, reference = s.with_added(value), reference | {value}
+            else:
+                s, reference = s.with_removed(value), reference - {value}
+        self.assertEqual(list(s), sorted(reference))
+        self.assertEqual(s.index(max(reference)), len(reference) - 1)
+
+
+class TestManySets(unittest.TestCase):
+
+    def test_union_all(self):
+        rng = random.Random(16)
+        sets = [SortedSet(rng.sample(range(200), 40)) for _ in range(12)]
+        expected = sorted(set().union(*sets))
+        result = SortedSet.union_all(*sets)
+        self.assertEqual(list(result), expected)
+        self.assertIsInstance(result._items, array)
+
+    def test_intersection_all(self):
+        rng = random.Random(16)
+        common = {5, 50, 150}
+        sets = [SortedSet(set(rng.sample(range(200), 100)) | common) for _ in range(10)]
+        expected = sorted(set(sets[0]).intersection(*sets[1:]))
+        result = SortedSet.intersection_all(*sets)
+        self.assertEqual(list(result), expected)
+        self.assertTrue(common <= set(result))
+        self.assertIsInstance(result._items, array)
+
+    def test_no_sets(self):
+        self.assertEqual(SortedSet.union_all(), SortedSet())
+        with self.assertRaises(TypeError):
+            SortedSet.intersection_all()
+
+    def test_single_set(self):
+        s = SortedSet([1, 2, 3])
+        self.assertIs(SortedSet.union_all(s), s)
+        self.assertIs(SortedSet.intersection_all(s), s)
+        view = s[1:]
+        self.assertIs(type(SortedSet.union_all(view)), SortedSet)
+        self.assertEqual(SortedSet.intersection_all(view), SortedSet([2, 3]))
+
+    def test_mixed_operands(self):
+        s = SortedSet([1, 2, 3, 4, 5, 6])
+        result = SortedSet.union_all(s[4:], [9, 0], {7}, SortedSet([2.5]))
+        self.assertEqual(list(result), [0, 2.5, 5, 6, 7, 9])
+        self.assertEqual(SortedSet.intersection_all(s, s[1:], [2, 3, 9], (3, 2)), SortedSet([2, 3]))
+
+    def test_empty_short_circuits(self):
+        # the empty set comes first, or the result empties out early
+        self.assertEqual(SortedSet.intersection_all(SortedSet([1, 2]), SortedSet(), SortedSet([1])),
+                         SortedSet())
+        self.assertEqual(SortedSet.intersection_all(SortedSet([1]), SortedSet([2]), SortedSet([1, 2])),
+                         SortedSet())
+
+    def test_keyed(self):
+        a = SortedSet(['pear', 'Apple', 'fig'], key=str.lower)
+        b = SortedSet(['apple', 'fig', 'kiwi'], key=str.lower)
+        c = SortedSet(['fig', 'Apple'], key=str.lower)
+        self.assertEqual(list(SortedSet.union_all(a, b, c)), ['Apple', 'apple', 'fig', 'kiwi', 'pear'])
+        self.assertEqual(list(SortedSet.intersection_all(a, b, c)), ['fig'])
+
+    def test_same_as_pairwise(self):
+        rng = random.Random(16)
+        for _ in range(20):
+            sets = [SortedSet(rng.sample(range(60), rng.randrange(30))) for _ in range(rng.randrange(1, 6))]
+            self.assertEqual(SortedSet.union_all(*sets), reduce(or_, sets))
+            self.assertEqual(SortedSet.intersection_all(*sets), reduce(and_, sets))
+
+
+class TestLazySetAlgebra(unittest.TestCase):
+
+    def test_union(self):
+        self.assertEqual(list(iter_union(SortedSet([1, 4, 9]), [2, 4, 10], iter([0, 9]))),
+                         [0, 1, 2, 4, 9, 10])
+        self.assertEqual(list(iter_union()), [])
+        self.assertEqual(list(iter_union([], [3])), [3])
+
+    def test_intersection(self):
+        self.assertEqual(list(iter_intersection([1, 3, 5, 7, 9], SortedSet([3, 4, 5, 9]), iter([0, 3, 9, 12]))),
+                         [3, 9])
+        self.assertEqual(list(iter_intersection()), [])
+        self.assertEqual(list(iter_intersection([1, 2], [])), [])
+        self.assertEqual(list(iter_intersection([1, 2, 3])), [1, 2, 3])
+
+    def test_difference(self):
+        self.assertEqual(list(iter_difference(range(10), [2, 3], iter([3, 7, 20]))), [0, 1, 4, 5, 6, 8, 9])
+        self.assertEqual(list(iter_difference([1, 2])), [1, 2])
+        self.assertEqual(list(iter_difference([], [1])), [])
+
+    def test_symmetric_difference(self):
+        self.assertEqual(list(iter_symmetric_difference([1, 2, 3, 8], iter([2, 3, 4, 9, 10]))),
+                         [1, 4, 8, 9, 10])
+        self.assertEqual(list(iter_symmetric_difference([], [1])), [1])
+
+    def test_lazy(self):
+        def numbers():
+            n = 0
+            while True:
+                yield n
+                n += 1
+        # infinite inputs are fine as long as only a few results are taken
+        evens = (2 * n for n in numbers())
+        threes = (3 * n for n in numbers())
+        pipeline = iter_difference(iter_intersection(evens, threes), [0, 12])
+        self.assertEqual([next(pipeline) for _ in range(3)], [6, 18, 24])
+
+    def test_same_as_sets(self):
+        rng = random.Random(18)
+        for _ in range(50):
+            sets = [SortedSet(rng.sample(range(40), rng.randrange(20))) for _ in range(3)]
+            a, b, c = sets
+            self.assertEqual(list(iter_union(a, b, c)), list(a | b | c))
+            self.assertEqual(list(iter_intersection(a, b, c)), list(a & b & c))
+            self.assertEqual(list(iter_difference(a, b, c)), list(a - b - c))
+            self.assertEqual(list(iter_symmetric_difference(a, b)), list(a ^ b))
+
+
+class TestMergeComparisons(unittest.TestCase):
+
+    def test_operators(self):
+        s = SortedSet([2, 4, 6])
+        self.assertTrue(s <= SortedSet([1, 2, 3, 4, 5, 6]))
+        self.assertTrue(s <= s)
+        self.assertFalse(s < s)
+        self.assertTrue(s < SortedSet([2, 4, 6, 8]))
+        self.assertFalse(s <= SortedSet([2, 3, 5, 6]))
+        self.assertTrue(SortedSet([1, 2, 3, 4, 5, 6]) >= s)
+        self.assertTrue(SortedSet([2, 4, 6, 8]) > s)
+        self.assertFalse(s > s)
+        self.assertTrue(SortedSet() <= s)
+        self.assertFalse(s <= SortedSet())
+
+    def test_bounds_and_views(self):
+        s = SortedSet(range(10))
+        self.assertFalse(SortedSet([-1, 5]) <= s)
+        self.assertFalse(SortedSet([5, 10]) <= s)
+        self.assertTrue(s[2:5] <= s)
+        self.assertTrue(s[2:5] < s[1:6])
+        self.assertTrue(s >= s[3:])
+        self.assertFalse(s[3:] >= s)
+
+    def test_isdisjoint(self):
+        s = SortedSet([1, 5, 9])
+        self.assertTrue(s.isdisjoint(SortedSet([10, 20])))
+        self.assertTrue(s.isdisjoint(SortedSet([2, 3, 4, 6])))
+        self.assertFalse(s.isdisjoint(SortedSet([0, 9])))
+        self.assertTrue(s.isdisjoint(SortedSet()))
+        self.assertTrue(s.isdisjoint([0, 2, 10]))
+        self.assertFalse(s.isdisjoint([10, 0, 5]))
+        self.assertFalse(s[1:].isdisjoint({9}))
+
+    def test_issubset_sorted_iterable(self):
+        s = SortedSet([2, 4, 6])
+        self.assertTrue(s.issubset([1, 2, 3, 4, 5, 6, 7]))
+        self.assertTrue(s.issubset(iter([2, 4, 6])))
+        self.assertFalse(s.issubset([1, 2, 3, 4, 5]))
+        self.assertFalse(s.issubset([]))
+        self.assertTrue(SortedSet().issubset([]))
+
+    def test_issubset_unsorted_iterable(self):
+        s = SortedSet([2, 4, 6])
+        self.assertTrue(s.issubset([6, 2, 4]))
+        self.assertTrue(s.issubset([1, 3, 5, 6, 4, 2]))
+        self.assertFalse(s.issubset([4, 6, 1, 7]))
+        self.assertTrue(s.issubset({2, 4, 6, 8}))
+
+    def test_issubset_stops_early(self):
+        def values():
+            yield from (1, 2, 3)
+            raise AssertionError('read too far')
+        self.assertTrue(SortedSet([1, 2]).issubset(values()))
+
+    def test_issuperset(self):
+        s = SortedSet([2, 4, 6])
+        self.assertTrue(s.issuperset([2, 6]))
+        self.assertTrue(s.issuperset(iter([6, 2, 4, 4])))
+        self.assertFalse(s.issuperset([2, 3]))
+        self.assertTrue(s.issuperset(SortedSet([4])))
+
+    def test_other_sets(self):
+        s = SortedSet([1, 2])
+        self.assertTrue(s <= frozenset([1, 2, 3]))
+        self.assertTrue(s >= {1})
+        self.assertTrue(s.isdisjoint(frozenset([3])))
+
+    def test_keyed(self):
+        s = SortedSet(['Apple', 'fig'], key=str.lower)
+        self.assertTrue(s.issubset(['fig', 'pear', 'Apple']))
+        self.assertFalse(s.issubset(['apple', 'fig']))
+        self.assertTrue(s <= SortedSet(['fig', 'Apple', 'kiwi'], key=str.lower))
+        self.assertFalse(s.isdisjoint(['fig']))
+
+    def test_same_as_sets(self):
+        rng = random.Random(19)
+        for _ in range(200):
+            a = rng.sample(range(12), rng.randrange(6))
+            b = rng.sample(range(12), rng.randrange(10))
+            s, t = SortedSet(a), SortedSet(b)
+            self.assertEqual(s <= t, set(a) <= set(b))
+            self.assertEqual(s < t, set(a) < set(b))
+            self.assertEqual(s >= t, set(a) >= set(b))
+            self.assertEqual(s > t, set(a) > set(b))
+            self.assertEqual(s.isdisjoint(t), set(a).isdisjoint(b))
+            self.assertEqual(s.issubset(b), set(a).issubset(b))
+            self.assertEqual(s.issubset(sorted(b)), set(a).issubset(b))
+            self.assertEqual(s.issuperset(b), set(a).issuperset(b))
+            self.assertEqual(s.isdisjoint(b), set(a).isdisjoint(b))
+
+
+class TestPickling(unittest.TestCase):
+
+    def test_round_trip(self):
+        for s in (SortedSet([3, 1, 2]), SortedSet(['b', 'a']), SortedSet([2.5, 1.5]),
+                  SortedSet(['pear', 'Apple'], key=str.lower), SortedSet()):
+            copy = pickle.loads(pickle.dumps(s))
+            self.assertEqual(copy, s)
+            self.assertEqual(list(copy), list(s))
+            self.assertIs(copy._key, s._key)
+
+    def test_no_sorting(self):
+        s = SortedSet([1, 2, 3])
+        function, args = s.__reduce__()
+        self.assertEqual(function, SortedSet._from_sorted)
+        self.assertIs(args[0], s._items)
+
+    def test_storage_kept(self):
+        copy = pickle.loads(pickle.dumps(SortedSet(range(100))))
+        self.assertEqual(copy._items.typecode, 'q')
+        self.assertIs(copy._keys, copy._items)
+
+    def test_hash_not_carried_over(self):
+        s = SortedSet(['a', 'b'])
+        hash(s)
+        self.assertIsNone(pickle.loads(pickle.dumps(s))._hash_accumulator)
+
+    def test_view_pickles_its_range(self):
+        s = SortedSet(range(1000))
+        copy = pickle.loads(pickle.dumps(s[10:13]))
+        self.assertIs(type(copy), SortedSet)
+        self.assertEqual(list(copy), [10, 11, 12])
+        self.assertLess(len(pickle.dumps(s[10:13])), len(pickle.dumps(s)) // 10)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,129 @@
+import os
+import random
+import shutil
+import tempfile
+import unittest
+import weakref
+
+from mapped_sorted_set import MappedSortedSet
+from sorted_set import SortedSet
+from sorted_set_builder import build_parallel, build_sorted_set
+
+rng = random.Random(15)
+
+
+class Tracked:
+    # items that know how many of them are still alive
+    alive = weakref.WeakSet()
+
+    def __init__(self, value):
+        self.value = value
+        Tracked.alive.add(self)
+
+    def __lt__(self, other):
+        return self.value < other.value
+
+    def __eq__(self, other):
+        return isinstance(other, Tracked) and self.value == other.value
+
+    def __hash__(self):
+        return hash(self.value)
+
+    def __reduce__(self):
+        return Tracked, (self.value,)
+
+
+class TestBuildSortedSet(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def test_empty(self):
+        self.assertEqual(build_sorted_set([]), SortedSet())
+        self.assertEqual(build_sorted_set(iter([]), chunk_size=3), SortedSet())
+
+    def test_single_chunk(self):
+        s = build_sorted_set([5, 1, 3, 1], chunk_size=10, temp_dir=self.directory)
+        self.assertEqual(s, SortedSet([1, 3, 5]))
+
+    def test_spilled_runs(self):
+        items = [rng.randrange(500) for _ in range(2000)]
+        s = build_sorted_set(iter(items), chunk_size=37, temp_dir=self.directory)
+        self.assertEqual(list(s), sorted(set(items)))
+        self.assertEqual(s._items.typecode, 'q')
+
+    def test_merge_rounds(self):
+        # 100 runs merged 3 at a time
+        items = [rng.randrange(300) for _ in range(1000)]
+        s = build_sorted_set(items, chunk_size=10, fan_in=3, temp_dir=self.directory)
+        self.assertEqual(list(s), sorted(set(items)))
+
+    def test_any_orderable_items(self):
+        words = ['pear', 'apple', 'fig', 'apple', 'kiwi', 'fig', 'date']
+        s = build_sorted_set(words, chunk_size=2, temp_dir=self.directory)
+        self.assertEqual(list(s), ['apple', 'date', 'fig', 'kiwi', 'pear'])
+
+    def test_one_chunk_in_memory(self):
+        values = [rng.randrange(300) for _ in range(1000)]
+        peak = 0
+
+        def items():
+            nonlocal peak
+            for value in values:
+                peak = max(peak, len(Tracked.alive))
+                yield Tracked(value)
+
+        s = build_sorted_set(items(), chunk_size=100, temp_dir=self.directory)
+        self.assertEqual([item.value for item in s], sorted(set(values)))
+        # the chunk being read, and the one item peeked past the first
+        self.assertLessEqual(peak, 101)
+
+    def test_temporary_files_removed(self):
+        build_sorted_set(range(100, 0, -1), chunk_size=7, temp_dir=self.directory)
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_to_file(self):
+        path = os.path.join(self.directory, 'out.sset')
+        items = [rng.randrange(10 ** 12) for _ in range(1000)]
+        s = build_sorted_set(items, chunk_size=100, path=path)
+        self.addCleanup(s.close)
+        self.assertIsInstance(s, MappedSortedSet)
+        self.assertEqual(list(s), sorted(set(items)))
+
+    def test_bytes_to_file(self):
+        path = os.path.join(self.directory, 'out.sset')
+        s = build_sorted_set([b'b', b'a', b'c', b'a'], chunk_size=2, path=path, width=1)
+        self.addCleanup(s.close)
+        self.assertEqual(list(s), [b'a', b'b', b'c'])
+
+    def test_bad_arguments(self):
+        with self.assertRaises(ValueError):
+            build_sorted_set([1], chunk_size=0)
+        with self.assertRaises(ValueError):
+            build_sorted_set([1], fan_in=1)
+
+
+class TestBuildParallel(unittest.TestCase):
+
+    def test_parallel(self):
+        items = [rng.randrange(5000) for _ in range(20000)]
+        s = build_parallel(items, workers=3, threshold=100)
+        self.assertEqual(list(s), sorted(set(items)))
+        self.assertEqual(s._items.typecode, 'q')
+
+    def test_mixed_items(self):
+        items = [rng.choice((1, 2.5, 7, 1 << 70)) for _ in range(1000)] + [3]
+        s = build_parallel(iter(items), workers=2, threshold=10)
+        self.assertEqual(list(s), [1, 2.5, 3, 7, 1 << 70])
+        self.assertIsInstance(s._items, list)
+
+    def test_small_input_is_serial(self):
+        self.assertEqual(build_parallel([3, 1, 2, 3], workers=4), SortedSet([1, 2, 3]))
+        self.assertEqual(build_parallel([], workers=4, threshold=0), SortedSet())
+        self.assertEqual(build_parallel(range(10, 0, -1), workers=1, threshold=0),
+                         SortedSet(range(1, 11)))
+
+
+if __name__ == '__main__':
+    unittest.main()